@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import gc
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Message, Update
+from dishka import AsyncContainer, FromDishka
+from dishka.integrations.aiogram import setup_dishka
+
+from hueta_bot.infrastructure.persistence.persistence_config import (
+    MemoryStorageConfig,
+    SQLiteConfig
+)
+from hueta_bot.main.config import BotConfig, BotTokenConfig
+from hueta_bot.main.config_watcher import BotConfigHolder
+from hueta_bot.main.di import setup_bot_container
+from hueta_bot.presentation.middlewares import setup_container
+
+from benchmarks.load_test import make_callback_update, make_message_update
+
+
+BOT_TOKEN = "42:DI-OVERHEAD"
+USER_ID = 1000
+
+
+async def handle_plain_message(message: Message) -> None:
+    pass
+
+
+async def handle_injected_message(
+    message: Message,
+    config: FromDishka[BotConfig]
+) -> None:
+    pass
+
+
+async def handle_button(callback_query: CallbackQuery) -> None:
+    pass
+
+
+def setup_none(container: AsyncContainer, dispatcher: Dispatcher) -> None:
+    pass
+
+
+def setup_auto_inject(
+    container: AsyncContainer,
+    dispatcher: Dispatcher,
+) -> None:
+    setup_dishka(container=container, router=dispatcher, auto_inject=True)
+
+
+SETUPS: dict[str, Callable[[AsyncContainer, Dispatcher], None]] = {
+    "none": setup_none,
+    "setup_dishka": setup_auto_inject,
+    "setup_container": setup_container,
+}
+
+
+class Case(NamedTuple):
+    name: str
+    update: Update
+
+
+def make_cases() -> list[Case]:
+    message = make_message_update(1, USER_ID, "plain")["message"]
+    return [
+        Case(
+            "plain message",
+            Update.model_validate(make_message_update(1, USER_ID, "plain"))
+        ),
+        Case(
+            "injected message",
+            Update.model_validate(
+                make_message_update(2, USER_ID, "injected")
+            )
+        ),
+        Case(
+            "button press",
+            Update.model_validate(
+                make_callback_update(3, USER_ID, message, "button")
+            )
+        ),
+    ]
+
+
+def build_dispatcher() -> Dispatcher:
+    # handlers are rebuilt for every setup, auto_inject patches them
+    router = Router(name="di_overhead")
+    router.message.register(handle_plain_message, F.text == "plain")
+    router.message.register(handle_injected_message, F.text == "injected")
+    router.callback_query.register(handle_button, F.data == "button")
+
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    return dispatcher
+
+
+class Setup(NamedTuple):
+    name: str
+    container: AsyncContainer
+    dispatcher: Dispatcher
+
+
+async def feed(setup: Setup, bot: Bot, update: Update, repeat: int) -> float:
+    started = time.perf_counter_ns()
+    for _ in range(repeat):
+        await setup.dispatcher.feed_update(bot, update)
+    return (time.perf_counter_ns() - started) / repeat
+
+
+async def measure(
+    setups: list[Setup],
+    bot: Bot,
+    update: Update,
+    repeat: int,
+    rounds: int,
+    warmup: int,
+) -> dict[str, list[float]]:
+    for setup in setups:
+        await feed(setup, bot, update, warmup)
+
+    # setups take turns every round, so drift hits all of them alike
+    timings: dict[str, list[float]] = {setup.name: [] for setup in setups}
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            for setup in setups:
+                timings[setup.name].append(
+                    await feed(setup, bot, update, repeat)
+                )
+    finally:
+        gc.enable()
+    return timings
+
+
+async def main(repeat: int, rounds: int, warmup: int) -> None:
+    # handlers make no requests, the bot is never connected
+    bot = Bot(token=BOT_TOKEN)
+
+    with tempfile.TemporaryDirectory() as directory:
+        bot_config = BotConfig(
+            bots=(BotTokenConfig(name="di_overhead", token=BOT_TOKEN),),
+            storage=MemoryStorageConfig(),
+            db=SQLiteConfig(
+                connector="aiosqlite",
+                path=str(Path(directory) / "bot.sqlite3")
+            ),
+            logging_config_path=""
+        )
+
+        setups = []
+        for name, setup_di in SETUPS.items():
+            container = setup_bot_container(BotConfigHolder(bot_config))
+            dispatcher = build_dispatcher()
+            setup_di(container, dispatcher)
+            setups.append(Setup(name, container, dispatcher))
+
+        print(
+            f"{'case':<18} {'setup':<16} {'us min':>8} {'us median':>10} "
+            f"{'overhead us':>12}"
+        )
+        for case in make_cases():
+            # without a container the injected handler cannot run
+            case_setups = [
+                setup for setup in setups
+                if setup.name != "none" or case.name != "injected message"
+            ]
+            timings = await measure(
+                case_setups,
+                bot,
+                case.update,
+                repeat,
+                rounds,
+                warmup
+            )
+
+            # relative to no injection, or to dishka for the injected case
+            baseline = min(timings[case_setups[0].name])
+            for name, setup_timings in timings.items():
+                best = min(setup_timings)
+                print(
+                    f"{case.name:<18} {name:<16} {best / 1e3:>8.1f} "
+                    f"{statistics.median(setup_timings) / 1e3:>10.1f} "
+                    f"{(best - baseline) / 1e3:>12.1f}"
+                )
+
+        for setup in setups:
+            await setup.container.close()
+
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Per update cost of the dependency injection setup"
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=30,
+        help="timed rounds per case, min and median are reported"
+    )
+    parser.add_argument("--warmup", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.repeat, args.rounds, args.warmup))
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from typing import Any, Optional
+
+from aiohttp import web
+
+
+BOT_USER = {
+    "id": 123456,
+    "is_bot": True,
+    "first_name": "Hueta",
+    "username": "hueta_bot",
+}
+
+MESSAGE_METHODS = frozenset({
+    "sendMessage",
+    "sendPhoto",
+    "sendDocument",
+    "editMessageText",
+    "editMessageCaption",
+    "editMessageMedia",
+    "editMessageReplyMarkup",
+})
+
+
+class FakeBotAPI:
+    # answers bot api calls with plausible objects, nothing is delivered
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.url: Optional[str] = None
+
+        self._message_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        app.router.add_get("/stats", self._handle_stats)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = dict(await request.post())
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        return web.json_response({
+            "ok": True,
+            "result": self._make_result(method, params),
+        })
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.calls))
+
+    def _make_result(self, method: str, params: dict[str, Any]) -> Any:
+        if method == "getMe":
+            return BOT_USER
+        if method not in MESSAGE_METHODS:
+            return True
+
+        chat_id = int(params.get("chat_id", 0))
+        message: dict[str, Any] = {
+            "message_id": int(
+                params.get("message_id") or next(self._message_ids)
+            ),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+        if "reply_markup" in params:
+            message["reply_markup"] = json.loads(params["reply_markup"])
+        return message
+
+
+async def serve(host: str, port: int, latency: float) -> None:
+    api = FakeBotAPI(latency=latency)
+    url = await api.start(host, port)
+    print(f"fake bot api on {url}, stats on {url}/stats")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Telegram Bot API"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="seconds added to every call"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.latency))
@@ -0,0 +1,576 @@
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import resource
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType
+)
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.filters import Command
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
+from aiogram.methods import TelegramMethod
+from aiogram.types import Message
+from aiogram_dialog import (
+    Dialog,
+    DialogManager,
+    StartMode,
+    Window,
+    setup_dialogs
+)
+from aiogram_dialog.widgets.kbd import ScrollingGroup, Select
+from aiogram_dialog.widgets.text import Const, Format
+
+from hueta_bot.infrastructure.capture.update_capture import UpdateCapture
+from hueta_bot.infrastructure.persistence.persistence_config import (
+    MemoryStorageConfig,
+    SQLiteConfig
+)
+from hueta_bot.infrastructure.runtime.json_codec import (
+    JsonCodec,
+    make_json_codec
+)
+from hueta_bot.infrastructure.runtime.runtime_config import JsonCodecType
+from hueta_bot.main.bot import create_bot
+from hueta_bot.main.config import BotConfig, BotTokenConfig
+from hueta_bot.main.config_watcher import BotConfigHolder
+from hueta_bot.main.di import setup_bot_container
+from hueta_bot.presentation.dialogs.widgets import (
+    MultiselectCalendar,
+    PaginationMode,
+    PaginationPager
+)
+from hueta_bot.presentation.handlers import setup_handlers
+from hueta_bot.presentation.middlewares import (
+    setup_container,
+    setup_middlewares
+)
+
+from benchmarks.fake_bot_api import FakeBotAPI
+
+
+BOT_TOKEN = "123456:load-test"
+
+TODAY = date.today()
+ITEM_DATES = [TODAY - timedelta(days=day * 3) for day in range(300)]
+ITEMS = [f"item {number}" for number in range(500)]
+
+PERCENTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+
+
+class LoadTestSG(StatesGroup):
+    main = State()
+
+
+async def get_load_test_data(**kwargs: Any) -> dict[str, Any]:
+    return {"dates": ITEM_DATES, "items": ITEMS}
+
+
+load_test_dialog = Dialog(
+    Window(
+        Const("Load test"),
+        MultiselectCalendar(
+            id="calendar",
+            item_id_getter=lambda item: item,
+            items="dates"
+        ),
+        ScrollingGroup(
+            Select(
+                Format("{item}"),
+                id="item",
+                item_id_getter=lambda item: item,
+                items="items"
+            ),
+            id="scroll",
+            width=2,
+            height=4,
+            hide_pager=True
+        ),
+        PaginationPager(
+            "scroll",
+            mode=PaginationMode.NORMAL,
+            width=5,
+            show_edges=True,
+            jump=10
+        ),
+        state=LoadTestSG.main,
+        getter=get_load_test_data
+    )
+)
+
+
+async def start_load_test(
+    message: Message,
+    dialog_manager: DialogManager
+) -> None:
+    await dialog_manager.start(LoadTestSG.main, mode=StartMode.RESET_STACK)
+
+
+class CallRecorder(BaseRequestMiddleware):
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+        # the last keyboard each chat got, the users click on it
+        self.messages: dict[int, dict[str, Any]] = {}
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[Any],
+        bot: Bot,
+        method: TelegramMethod[Any],
+    ) -> Any:
+        self.calls[method.__api_method__] += 1
+        result = await make_request(bot, method)
+        if isinstance(result, Message) and result.reply_markup is not None:
+            self.messages[result.chat.id] = result.model_dump(
+                mode="json",
+                exclude_none=True,
+                by_alias=True
+            )
+        return result
+
+
+def make_storage(
+    storage_type: str,
+    redis_url: Optional[str],
+    json_codec: JsonCodec,
+) -> tuple[BaseStorage, BaseEventIsolation]:
+    if storage_type == "memory":
+        return MemoryStorage(), SimpleEventIsolation()
+
+    from aiogram.fsm.storage.redis import (
+        DefaultKeyBuilder,
+        RedisEventIsolation
+    )
+
+    from hueta_bot.infrastructure.persistence.redis_storage import (
+        SerializingRedisStorage
+    )
+    from hueta_bot.infrastructure.persistence.storage_serializer import (
+        StorageSerializer
+    )
+
+    events_isolation: BaseEventIsolation
+    if redis_url is not None:
+        from redis.asyncio import Redis
+
+        redis = Redis.from_url(redis_url)
+        events_isolation = RedisEventIsolation(redis=redis)
+    else:
+        try:
+            from fakeredis.aioredis import FakeRedis
+        except ImportError:
+            raise SystemExit(
+                "redis storage needs --redis-url or fakeredis installed"
+            ) from None
+        redis = FakeRedis()
+        # redis locks are released by a lua script that fakeredis only
+        # runs with lupa installed, the storage is in process anyway
+        events_isolation = SimpleEventIsolation()
+
+    storage = SerializingRedisStorage(
+        redis=redis,
+        serializer=StorageSerializer(json_codec=json_codec),
+        key_builder=DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+    )
+    return storage, events_isolation
+
+
+def make_message_update(
+    update_id: int,
+    user_id: int,
+    text: str,
+) -> dict[str, Any]:
+    user = {
+        "id": user_id,
+        "is_bot": False,
+        "first_name": f"user {user_id}",
+        "language_code": "ru",
+    }
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": user,
+            "text": text,
+        },
+    }
+
+
+def make_callback_update(
+    update_id: int,
+    user_id: int,
+    message: dict[str, Any],
+    data: str,
+) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {
+                "id": user_id,
+                "is_bot": False,
+                "first_name": f"user {user_id}",
+                "language_code": "ru",
+            },
+            "chat_instance": str(user_id),
+            "message": message,
+            "data": data,
+        },
+    }
+
+
+def get_rss() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak rss in kilobytes on linux, the closest portable value
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values: list[float], rank: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(rank * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Harness:
+    # the bot wired as in main(), pointed at a fake api
+    def __init__(
+        self,
+        storage_type: str = "memory",
+        redis_url: Optional[str] = None,
+        json_codec: Optional[JsonCodec] = None,
+        api_url: Optional[str] = None,
+        api_latency: float = 0.0,
+        capture: Optional[UpdateCapture] = None,
+    ) -> None:
+        self.storage_type = storage_type
+        self.redis_url = redis_url
+        self.json_codec = json_codec or make_json_codec()
+        self.api_url = api_url
+        self.api_latency = api_latency
+        self.capture = capture
+
+        self.recorder = CallRecorder()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+
+    async def start(self) -> None:
+        self._api: Optional[FakeBotAPI] = None
+        if self.api_url is None:
+            self._api = FakeBotAPI(latency=self.api_latency)
+            self.api_url = await self._api.start()
+
+        self._directory = tempfile.TemporaryDirectory()
+        bot_config = BotConfig(
+            bots=(BotTokenConfig(name="load_test", token=BOT_TOKEN),),
+            storage=MemoryStorageConfig(),
+            db=SQLiteConfig(
+                connector="aiosqlite",
+                path=str(Path(self._directory.name) / "bot.sqlite3")
+            ),
+            logging_config_path=""
+        )
+
+        session = AiohttpSession(
+            api=TelegramAPIServer.from_base(self.api_url),
+            json_loads=self.json_codec.loads,
+            json_dumps=self.json_codec.dumps
+        )
+        self.bot = create_bot(BOT_TOKEN, self.json_codec, session=session)
+
+        storage, self._events_isolation = make_storage(
+            self.storage_type,
+            self.redis_url,
+            self.json_codec
+        )
+        self.dispatcher = build_dispatcher(storage, self._events_isolation)
+        self._container = setup_bot_container(BotConfigHolder(bot_config))
+
+        # the recorder is added last to see every call
+        setup_middlewares(
+            bots=[self.bot],
+            dispatcher=self.dispatcher,
+            capture=self.capture
+        )
+        setup_handlers(dispatcher=self.dispatcher)
+        setup_container(
+            container=self._container,
+            router=self.dispatcher
+        )
+        self.bot.session.middleware(self.recorder)
+
+    async def close(self) -> None:
+        await self.dispatcher.storage.close()
+        await self._events_isolation.close()
+        await self.bot.session.close()
+        await self._container.close()
+        if self._api is not None:
+            await self._api.stop()
+        if self.capture is not None:
+            self.capture.close()
+        self._directory.cleanup()
+
+    async def feed(self, kind: str, update: dict[str, Any]) -> None:
+        started = time.perf_counter()
+        try:
+            await self.dispatcher.feed_raw_update(self.bot, update)
+        except Exception as error:
+            self.errors[type(error).__name__] += 1
+        self.latencies[kind].append(time.perf_counter() - started)
+
+    def summary(
+        self,
+        elapsed: float,
+        rss_before: int,
+        rss_after: int,
+    ) -> dict[str, Any]:
+        all_latencies = [
+            latency
+            for latencies in self.latencies.values()
+            for latency in latencies
+        ]
+        updates = len(all_latencies)
+        return {
+            "updates": updates,
+            "elapsed": elapsed,
+            "throughput": updates / elapsed if elapsed else 0.0,
+            "errors": dict(self.errors),
+            "latency": {
+                kind: {
+                    "count": len(latencies),
+                    **{
+                        name: percentile(latencies, rank)
+                        for name, rank in PERCENTILES
+                    },
+                }
+                for kind, latencies in [
+                    *self.latencies.items(),
+                    ("all", all_latencies),
+                ]
+            },
+            "calls": dict(self.recorder.calls),
+            "rss_before": rss_before,
+            "rss_after": rss_after,
+            "rss_peak": (
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            ),
+        }
+
+
+class LoadTest:
+    def __init__(
+        self,
+        harness: Harness,
+        clicks: int,
+        burst: int,
+        text_every: int,
+        seed: int,
+    ) -> None:
+        self.harness = harness
+        self.clicks = clicks
+        self.burst = burst
+        self.text_every = text_every
+        self.random = random.Random(seed)
+
+        self._update_ids = itertools.count(1)
+
+    async def simulate_user(self, user_id: int) -> None:
+        feed = self.harness.feed
+        await feed("message", make_message_update(
+            next(self._update_ids),
+            user_id,
+            "/loadtest"
+        ))
+
+        for step in range(0, self.clicks, self.burst):
+            if self.text_every and step % self.text_every == 0:
+                await feed("message", make_message_update(
+                    next(self._update_ids),
+                    user_id,
+                    "hello"
+                ))
+
+            message = self.harness.recorder.messages.get(user_id)
+            if message is None:
+                return
+            buttons = [
+                button["callback_data"]
+                for row in message["reply_markup"]["inline_keyboard"]
+                for button in row
+                if button.get("callback_data")
+            ]
+            # rapid clicks on the same keyboard, as impatient users do
+            await asyncio.gather(*(
+                feed("callback", make_callback_update(
+                    next(self._update_ids),
+                    user_id,
+                    message,
+                    self.random.choice(buttons)
+                ))
+                for _ in range(min(self.burst, self.clicks - step))
+            ))
+
+
+def build_dispatcher(
+    storage: BaseStorage,
+    events_isolation: BaseEventIsolation,
+) -> Dispatcher:
+    dispatcher = Dispatcher(
+        storage=storage,
+        events_isolation=events_isolation
+    )
+
+    router = Router(name="load_test")
+    router.message.register(start_load_test, Command("loadtest"))
+    router.include_router(load_test_dialog)
+    dispatcher.include_router(router)
+    setup_dialogs(dispatcher)
+
+    return dispatcher
+
+
+async def main(args: argparse.Namespace) -> None:
+    harness = Harness(
+        storage_type=args.storage,
+        redis_url=args.redis_url,
+        json_codec=make_json_codec(JsonCodecType(args.json)),
+        api_url=args.api_url,
+        api_latency=args.api_latency,
+        capture=UpdateCapture(args.capture) if args.capture else None
+    )
+    await harness.start()
+
+    load_test = LoadTest(
+        harness=harness,
+        clicks=args.clicks,
+        burst=args.burst,
+        text_every=args.text_every,
+        seed=args.seed
+    )
+
+    rss_before = get_rss()
+    started = time.perf_counter()
+    user_ids = range(1000, 1000 + args.users)
+    for offset in range(0, args.users, args.concurrency):
+        await asyncio.gather(*(
+            load_test.simulate_user(user_id)
+            for user_id in user_ids[offset:offset + args.concurrency]
+        ))
+    elapsed = time.perf_counter() - started
+    rss_after = get_rss()
+
+    await harness.close()
+    report(harness.summary(elapsed, rss_before, rss_after))
+
+
+def report(summary: dict[str, Any]) -> None:
+    updates = summary["updates"]
+    calls = sum(summary["calls"].values())
+
+    print(f"updates            {updates:10d}")
+    print(f"elapsed            {summary['elapsed']:10.2f} s")
+    print(f"throughput         {summary['throughput']:10.1f} updates/s")
+    print(f"errors             {sum(summary['errors'].values()):10d}")
+    for name, count in summary["errors"].items():
+        print(f"  {name:<16} {count:10d}")
+
+    print(
+        f"\n{'latency ms':<16} {'count':>8}"
+        + "".join(f" {name:>9}" for name, _ in PERCENTILES)
+    )
+    for kind, latency in summary["latency"].items():
+        print(
+            f"{kind:<16} {latency['count']:>8}"
+            + "".join(
+                f" {latency[name] * 1e3:>9.2f}"
+                for name, _ in PERCENTILES
+            )
+        )
+
+    print(f"\noutgoing calls     {calls:10d}")
+    print(f"calls per update   {calls / max(updates, 1):10.2f}")
+    for method, count in sorted(
+        summary["calls"].items(),
+        key=lambda item: -item[1]
+    ):
+        print(f"  {method:<24} {count / max(updates, 1):10.2f}")
+
+    print(f"\nrss before         {summary['rss_before'] / 2 ** 20:10.1f} MiB")
+    print(f"rss after          {summary['rss_after'] / 2 ** 20:10.1f} MiB")
+    print(f"rss peak           {summary['rss_peak'] / 2 ** 20:10.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load test the dispatcher against a fake Bot API"
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="users active at the same time"
+    )
+    parser.add_argument("--clicks", type=int, default=20)
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=3,
+        help="callback queries sent at once on one keyboard"
+    )
+    parser.add_argument(
+        "--text-every",
+        type=int,
+        default=10,
+        help="a plain message every N clicks, 0 disables them"
+    )
+    parser.add_argument(
+        "--storage",
+        choices=("memory", "redis"),
+        default="memory"
+    )
+    parser.add_argument(
+        "--redis-url",
+        help="real redis for the redis storage, fakeredis otherwise"
+    )
+    parser.add_argument(
+        "--json",
+        choices=[codec.value for codec in JsonCodecType],
+        default=JsonCodecType.AUTO.value
+    )
+    parser.add_argument(
+        "--api-url",
+        help="an already running fake api, see benchmarks.fake_bot_api"
+    )
+    parser.add_argument("--api-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--capture",
+        help="also write the generated updates for benchmarks.replay"
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # event logging middlewares log at info, that is measured too if enabled
+    logging.basicConfig(level=args.log_level)
+    asyncio.run(main(args))
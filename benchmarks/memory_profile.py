@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import gc
+import logging
+import sys
+import tracemalloc
+from collections import Counter, deque
+from types import FunctionType, ModuleType
+from typing import Any, Iterable, NamedTuple, Optional
+
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+from redis.exceptions import ResponseError
+
+from hueta_bot.infrastructure.persistence.storage_serializer import (
+    StorageSerializer
+)
+from hueta_bot.infrastructure.runtime.json_codec import make_json_codec
+from hueta_bot.infrastructure.runtime.runtime_config import JsonCodecType
+from hueta_bot.presentation.dialogs.widgets import (
+    keyboard_render_cache,
+    locale_data
+)
+
+from benchmarks.load_test import Harness, LoadTest, get_rss
+
+
+CATEGORIES = ("fsm", "stacks", "contexts", "locks", "caches")
+
+# the default key builder of the redis storage, used for key sizes
+KEY_BUILDER = DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+
+class Sizes(NamedTuple):
+    keys: Counter[str]
+    memory: Counter[str]
+    serialized: Counter[str]
+
+
+def subtract(sizes: Sizes, baseline: Sizes) -> Sizes:
+    return Sizes(*(
+        current - base for current, base in zip(sizes, baseline)
+    ))
+
+
+class Checkpoint(NamedTuple):
+    users: int
+    visit: int
+    traced: int
+    rss: int
+    sizes: Sizes
+
+
+def deep_sizeof(obj: Any, seen: Optional[set[int]] = None) -> int:
+    # shared objects are counted once per call, so categories measured
+    # separately may both count e.g. a StorageKey they have in common
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(
+        obj,
+        (type, ModuleType, FunctionType, asyncio.AbstractEventLoop)
+    ):
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+
+    if isinstance(obj, dict):
+        size += sum(
+            deep_sizeof(key, seen) + deep_sizeof(value, seen)
+            for key, value in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if slot != "__dict__" and hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def get_category(destiny: str) -> str:
+    if destiny.startswith("aiogd:stack:"):
+        return "stacks"
+    if destiny.startswith("aiogd:context:"):
+        return "contexts"
+    return "fsm"
+
+
+def get_redis_category(key: str) -> str:
+    if key.endswith(":lock"):
+        return "locks"
+    if ":aiogd:stack:" in key:
+        return "stacks"
+    if ":aiogd:context:" in key:
+        return "contexts"
+    return "fsm"
+
+
+def measure_memory_storage(
+    storage: MemoryStorage,
+    serializer: StorageSerializer,
+    sizes: Sizes,
+) -> None:
+    for key, record in storage.storage.items():
+        category = get_category(key.destiny)
+        sizes.keys[category] += 1
+        sizes.memory[category] += (
+            deep_sizeof(key) + deep_sizeof(record)
+        )
+
+        # what the same record would take as redis keys
+        if record.data:
+            sizes.serialized[category] += (
+                len(KEY_BUILDER.build(key, "data"))
+                + len(serializer.dumps(record.data))
+            )
+        if record.state:
+            sizes.serialized[category] += (
+                len(KEY_BUILDER.build(key, "state"))
+                + len(record.state)
+            )
+
+
+async def measure_redis_storage(storage: RedisStorage, sizes: Sizes) -> None:
+    redis = storage.redis
+    memory_usage = True
+    async for key in redis.scan_iter(match="fsm:*", count=1000):
+        category = get_redis_category(key.decode())
+        sizes.keys[category] += 1
+        if memory_usage:
+            try:
+                usage = await redis.memory_usage(key)
+            except ResponseError:
+                # fakeredis has no MEMORY command
+                memory_usage = False
+            else:
+                sizes.serialized[category] += usage or 0
+                continue
+        sizes.serialized[category] += len(key) + await redis.strlen(key)
+
+
+def measure_isolation(isolation: Any, sizes: Sizes) -> None:
+    # SimpleEventIsolation keeps one lock per key and never drops them,
+    # redis locks are keys that expire and are counted with the storage
+    locks = getattr(isolation, "_locks", None)
+    if locks is not None:
+        sizes.keys["locks"] += len(locks)
+        sizes.memory["locks"] += deep_sizeof(locks)
+
+
+def measure_caches(sizes: Sizes) -> None:
+    caches = (
+        keyboard_render_cache._keyboards,
+        locale_data._normalized,
+        locale_data._day_names,
+        locale_data._month_names,
+    )
+    sizes.keys["caches"] += sum(len(cache) for cache in caches)
+    sizes.memory["caches"] += sum(deep_sizeof(cache) for cache in caches)
+
+
+async def measure(harness: Harness, serializer: StorageSerializer) -> Sizes:
+    sizes = Sizes(Counter(), Counter(), Counter())
+    storage = harness.dispatcher.storage
+    if isinstance(storage, MemoryStorage):
+        measure_memory_storage(storage, serializer, sizes)
+    elif isinstance(storage, RedisStorage):
+        await measure_redis_storage(storage, sizes)
+    measure_isolation(harness.dispatcher.fsm.events_isolation, sizes)
+    measure_caches(sizes)
+    return sizes
+
+
+async def visit(
+    load_test: LoadTest,
+    user_ids: Iterable[int],
+    concurrency: int,
+) -> None:
+    user_ids = list(user_ids)
+    for offset in range(0, len(user_ids), concurrency):
+        await asyncio.gather(*(
+            load_test.simulate_user(user_id)
+            for user_id in user_ids[offset:offset + concurrency]
+        ))
+
+
+async def main(args: argparse.Namespace) -> None:
+    json_codec = make_json_codec(JsonCodecType(args.json))
+    serializer = StorageSerializer(json_codec=json_codec)
+    harness = Harness(
+        storage_type=args.storage,
+        redis_url=args.redis_url,
+        json_codec=json_codec
+    )
+    await harness.start()
+    load_test = LoadTest(
+        harness=harness,
+        clicks=args.clicks,
+        burst=1,
+        text_every=0,
+        seed=args.seed
+    )
+
+    # one user ahead of the baseline, so imports and first renders are
+    # not billed to the users measured
+    await visit(load_test, [1], 1)
+    storage_type = type(harness.dispatcher.storage).__name__
+    harness.recorder.messages.clear()
+
+    tracemalloc.start(args.frames)
+    gc.collect()
+    baseline = tracemalloc.take_snapshot()
+    baseline_traced, _ = tracemalloc.get_traced_memory()
+    baseline_rss = get_rss()
+    baseline_sizes = await measure(harness, serializer)
+
+    checkpoints: list[Checkpoint] = []
+
+    async def checkpoint(users: int, visit_number: int) -> None:
+        # the harness keeps the last message of every user to click on
+        harness.recorder.messages.clear()
+        gc.collect()
+        traced, _ = tracemalloc.get_traced_memory()
+        checkpoints.append(Checkpoint(
+            users=users,
+            visit=visit_number,
+            traced=traced - baseline_traced,
+            rss=get_rss() - baseline_rss,
+            sizes=subtract(await measure(harness, serializer), baseline_sizes)
+        ))
+        report_checkpoint(checkpoints)
+
+    print(f"storage: {storage_type}, clicks per visit: {args.clicks}\n")
+    print_header()
+
+    user_ids = range(1000, 1000 + args.users)
+    for offset in range(0, args.users, args.step):
+        await visit(
+            load_test,
+            user_ids[offset:offset + args.step],
+            args.concurrency
+        )
+        await checkpoint(min(offset + args.step, args.users), 1)
+
+    # the same users come back, their footprint should not keep growing
+    for visit_number in range(2, args.visits + 1):
+        await visit(load_test, user_ids, args.concurrency)
+        await checkpoint(args.users, visit_number)
+
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    report_sizes(checkpoints[-1])
+    report_top(snapshot, baseline, args.top)
+
+    await harness.close()
+
+
+def print_header() -> None:
+    print(
+        f"{'users':>7} {'visit':>5} {'traced MiB':>11} {'B/user':>8} "
+        f"{'marginal':>9} {'rss MiB':>8}"
+        + "".join(f" {category:>9}" for category in CATEGORIES)
+    )
+
+
+def get_size(sizes: Sizes, category: str) -> int:
+    # python objects for the memory storage, redis keys for the redis one
+    return sizes.memory[category] or sizes.serialized[category]
+
+
+def report_checkpoint(checkpoints: list[Checkpoint]) -> None:
+    current = checkpoints[-1]
+    previous = checkpoints[-2] if len(checkpoints) > 1 else None
+
+    # bytes per new user between checkpoints, per visit for return visits
+    if previous is None:
+        marginal = current.traced / current.users
+    elif current.users != previous.users:
+        marginal = (
+            (current.traced - previous.traced)
+            / (current.users - previous.users)
+        )
+    else:
+        marginal = (current.traced - previous.traced) / current.users
+
+    sizes = current.sizes
+    print(
+        f"{current.users:>7} {current.visit:>5} "
+        f"{current.traced / 2 ** 20:>11.2f} "
+        f"{current.traced / current.users:>8.0f} {marginal:>9.0f} "
+        f"{current.rss / 2 ** 20:>8.1f}"
+        + "".join(
+            f" {get_size(sizes, category) / current.users:>9.0f}"
+            for category in CATEGORIES
+        )
+    )
+
+
+def report_sizes(checkpoint: Checkpoint) -> None:
+    users = checkpoint.users
+    sizes = checkpoint.sizes
+    print(
+        f"\n{'per user':<10} {'keys':>8} {'memory B':>10} "
+        f"{'redis B':>10}"
+    )
+    for category in CATEGORIES:
+        print(
+            f"{category:<10} {sizes.keys[category] / users:>8.2f} "
+            f"{sizes.memory[category] / users:>10.0f} "
+            f"{sizes.serialized[category] / users:>10.0f}"
+        )
+    print(
+        f"{'total':<10} {sum(sizes.keys.values()) / users:>8.2f} "
+        f"{sum(sizes.memory.values()) / users:>10.0f} "
+        f"{sum(sizes.serialized.values()) / users:>10.0f}"
+    )
+
+
+def report_top(
+    snapshot: tracemalloc.Snapshot,
+    baseline: tracemalloc.Snapshot,
+    top: int,
+) -> None:
+    print(f"\n{'growth KiB':>10} {'blocks':>8}  allocated at")
+    for stat in snapshot.compare_to(baseline, "traceback")[:top]:
+        frame = stat.traceback[-1]
+        print(
+            f"{stat.size_diff / 1024:>10.1f} {stat.count_diff:>8}  "
+            f"{frame.filename}:{frame.lineno}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Memory footprint per user of storage and dialog state"
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument(
+        "--step",
+        type=int,
+        default=50,
+        help="new users between two measurements"
+    )
+    parser.add_argument(
+        "--visits",
+        type=int,
+        default=2,
+        help="times every user goes through the dialog"
+    )
+    parser.add_argument("--clicks", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--storage",
+        choices=("memory", "redis"),
+        default="memory"
+    )
+    parser.add_argument(
+        "--redis-url",
+        help="real redis for the redis storage, fakeredis otherwise"
+    )
+    parser.add_argument(
+        "--json",
+        choices=[codec.value for codec in JsonCodecType],
+        default=JsonCodecType.AUTO.value
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=1,
+        help="traceback depth of the allocation sites"
+    )
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    asyncio.run(main(args))
@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import time
+
+from aiogram_dialog.widgets.kbd import NumberedPager
+
+from hueta_bot.presentation.dialogs.widgets import (
+    PaginationMode,
+    PaginationPager
+)
+
+from benchmarks.stubs import StubDialogManager, StubScroll
+
+
+PAGE_COUNTS = (10, 100, 1_000, 10_000, 100_000)
+
+
+async def measure(pager, scroll: StubScroll, repeat: int) -> float:
+    manager = StubDialogManager(widgets={scroll.widget_id: scroll})
+    started = time.perf_counter()
+    for step in range(repeat):
+        scroll.page = (scroll.pages // 2 + step) % scroll.pages
+        await pager.render_keyboard({}, manager)
+    return (time.perf_counter() - started) / repeat
+
+
+async def main(repeat: int, width: int, baseline: bool) -> None:
+    print(f"{'pages':>8} {'pager':>24} {'us/render':>12}")
+    for pages in PAGE_COUNTS:
+        scroll = StubScroll(id="scroll", pages=pages)
+        pagers = {
+            f"{mode.value.lower()}": PaginationPager(
+                scroll,
+                mode=mode,
+                width=width,
+                show_edges=True,
+                jump=width * 2,
+            )
+            for mode in PaginationMode
+        }
+        if baseline and pages <= 10_000:
+            pagers["numbered (baseline)"] = NumberedPager(scroll)
+
+        for name, pager in pagers.items():
+            elapsed = await measure(pager, scroll, repeat)
+            print(f"{pages:>8} {name:>24} {elapsed * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="PaginationPager render cost by page count"
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--width", type=int, default=5)
+    parser.add_argument("--baseline", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.repeat, args.width, args.baseline))
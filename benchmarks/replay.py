@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from hueta_bot.infrastructure.capture.update_capture import (
+    CapturedUpdate,
+    read_capture
+)
+from hueta_bot.infrastructure.runtime.json_codec import make_json_codec
+from hueta_bot.infrastructure.runtime.runtime_config import JsonCodecType
+
+from benchmarks.load_test import PERCENTILES, Harness, get_rss, report
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def get_update_kind(update: dict[str, Any]) -> str:
+    return next((key for key in update if key != "update_id"), "unknown")
+
+
+async def replay(
+    harness: Harness,
+    records: Iterable[CapturedUpdate],
+    speed: float,
+    concurrency: int,
+) -> None:
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    tasks: set[asyncio.Task] = set()
+
+    started = loop.time()
+    first_timestamp: Optional[float] = None
+    for record in records:
+        if speed > 0:
+            # keeps the captured gaps between updates, divided by speed
+            if first_timestamp is None:
+                first_timestamp = record.timestamp
+            due = started + (record.timestamp - first_timestamp) / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        # updates are handled concurrently, as polling does
+        await slots.acquire()
+        task = asyncio.create_task(harness.feed(
+            get_update_kind(record.update),
+            record.update
+        ))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        task.add_done_callback(lambda _: slots.release())
+
+    await asyncio.gather(*tasks)
+
+
+async def run_replay(args: argparse.Namespace) -> dict[str, Any]:
+    harness = Harness(
+        storage_type=args.storage,
+        redis_url=args.redis_url,
+        json_codec=make_json_codec(JsonCodecType(args.json)),
+        api_latency=args.api_latency
+    )
+    await harness.start()
+
+    # callback data holds intent ids of the captured run, clicks on them
+    # go through the stale dialog error handler unless /start came first
+    records = read_capture(args.capture)
+    if args.limit:
+        records = itertools.islice(records, args.limit)
+
+    rss_before = get_rss()
+    started = time.perf_counter()
+    await replay(harness, records, args.speed, args.concurrency)
+    elapsed = time.perf_counter() - started
+    rss_after = get_rss()
+
+    await harness.close()
+    return harness.summary(elapsed, rss_before, rss_after)
+
+
+def run_build(build: Path, argv: list[str]) -> dict[str, Any]:
+    # the harness of this tree against the application code of the build
+    with tempfile.TemporaryDirectory() as directory:
+        output = Path(directory) / "summary.json"
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, (
+                str(build / "src"),
+                str(ROOT),
+                env.get("PYTHONPATH")
+            ))
+        )
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.replay",
+                *argv,
+                "--output",
+                str(output),
+            ],
+            cwd=ROOT,
+            env=env,
+            check=True
+        )
+        return json.loads(output.read_text())
+
+
+def compare(summaries: list[tuple[str, dict[str, Any]]]) -> None:
+    def metrics(summary: dict[str, Any]) -> dict[str, float]:
+        latency = summary["latency"]["all"]
+        updates = max(summary["updates"], 1)
+        return {
+            "updates/s": summary["throughput"],
+            **{
+                f"{name} ms": latency[name] * 1e3
+                for name, _ in PERCENTILES
+            },
+            "calls/update": sum(summary["calls"].values()) / updates,
+            "errors": sum(summary["errors"].values()),
+            "rss peak MiB": summary["rss_peak"] / 2 ** 20,
+        }
+
+    rows = [metrics(summary) for _, summary in summaries]
+    baseline = rows[0]
+
+    print(
+        f"\n{'':<16}"
+        + "".join(f"{build[-20:]:>22}" for build, _ in summaries)
+    )
+    for name, base_value in baseline.items():
+        cells = [f"{base_value:.2f}".rjust(22)]
+        for row in rows[1:]:
+            value = row[name]
+            change = (
+                f" ({(value - base_value) / base_value * 100:+.1f}%)"
+                if base_value
+                else ""
+            )
+            cells.append(f"{value:.2f}{change}".rjust(22))
+        print(f"{name:<16}" + "".join(cells))
+
+
+def main(args: argparse.Namespace, argv: list[str]) -> None:
+    if not args.build:
+        summary = asyncio.run(run_replay(args))
+        if args.output:
+            Path(args.output).write_text(json.dumps(summary))
+        else:
+            report(summary)
+        return
+
+    # builds take turns, so a noisy moment does not hit one build only
+    runs: dict[int, list[dict[str, Any]]] = {
+        index: [] for index in range(len(args.build))
+    }
+    for attempt in range(args.repeat):
+        for index, build in enumerate(args.build):
+            print(f"replaying against {build} ({attempt + 1}/{args.repeat})")
+            runs[index].append(run_build(Path(build).resolve(), argv))
+
+    compare([
+        (build, max(runs[index], key=lambda summary: summary["throughput"]))
+        for index, build in enumerate(args.build)
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replay captured updates against a fake Bot API"
+    )
+    parser.add_argument("capture", help="file written by the capture mode")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="1 for real time, N for N times faster, 0 for no delays"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="updates handled at the same time"
+    )
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument(
+        "--build",
+        action="append",
+        help="source tree to replay against, repeat to compare builds, "
+        "the first one is the baseline"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="replays per build, the fastest one is compared"
+    )
+    parser.add_argument(
+        "--storage",
+        choices=("memory", "redis"),
+        default="memory"
+    )
+    parser.add_argument("--redis-url")
+    parser.add_argument(
+        "--json",
+        choices=[codec.value for codec in JsonCodecType],
+        default=JsonCodecType.AUTO.value
+    )
+    parser.add_argument("--api-latency", type=float, default=0.0)
+    parser.add_argument("--output", help="write the summary as json")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+
+    # builds are replayed in subprocesses with the same options
+    build_argv = []
+    skip = False
+    for arg in sys.argv[1:]:
+        if skip:
+            skip = False
+        elif arg in ("--build", "--repeat"):
+            skip = True
+        elif not arg.startswith(("--build=", "--repeat=")):
+            build_argv.append(arg)
+    main(args, build_argv)
@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import time
+from typing import Any, Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+
+from hueta_bot.infrastructure.persistence.persistence_config import (
+    StorageSerializerType
+)
+from hueta_bot.infrastructure.persistence.storage_serializer import (
+    StorageSerializer
+)
+from hueta_bot.infrastructure.runtime import event_loop
+from hueta_bot.infrastructure.runtime.json_codec import (
+    JsonCodec,
+    make_json_codec
+)
+from hueta_bot.infrastructure.runtime.runtime_config import (
+    EventLoopType,
+    JsonCodecType
+)
+
+
+SETUPS = (
+    ("asyncio + json", EventLoopType.ASYNCIO, JsonCodecType.STDLIB),
+    ("uvloop + orjson", EventLoopType.UVLOOP, JsonCodecType.ORJSON),
+)
+
+
+def make_update(update_id: int) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000 + update_id,
+            "chat": {"id": 1000 + update_id % 50, "type": "private"},
+            "from": {
+                "id": 1000 + update_id % 50,
+                "is_bot": False,
+                "first_name": "Хуета",
+                "language_code": "ru",
+            },
+            "text": f"сообщение номер {update_id}",
+        },
+    }
+
+
+def make_dialog_data(items: int) -> dict[str, Any]:
+    # roughly what aiogram_dialog keeps for a user with an open stack
+    return {
+        "aiogd_stack": {"id": "stack", "intents": ["a1b2", "c3d4"]},
+        "aiogd_context": {
+            "intent_id": "c3d4",
+            "state": "Calendar:select",
+            "widget_data": {"scroll": 3, "calendar": "2024-05-01"},
+            "dialog_data": {
+                "dates": [
+                    f"2024-05-{day % 28 + 1:02d}"
+                    for day in range(items)
+                ]
+            },
+        },
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def measure_codec(codec: JsonCodec, repeat: int) -> dict[str, float]:
+    response = {"ok": True, "result": [make_update(i) for i in range(100)]}
+    response_bytes = codec.dumps_bytes(response)
+    serializer = StorageSerializer(
+        type=StorageSerializerType.JSON,
+        sample_rate=0,
+        json_codec=codec
+    )
+    dialog_data = make_dialog_data(200)
+    stored = serializer.dumps(dialog_data)
+
+    return {
+        "getUpdates loads": measure(
+            lambda: codec.loads(response_bytes),
+            repeat
+        ),
+        "sendMessage dumps": measure(
+            lambda: codec.dumps(response["result"][0]["message"]),
+            repeat * 10
+        ),
+        "storage dumps": measure(
+            lambda: serializer.dumps(dialog_data),
+            repeat
+        ),
+        "storage loads": measure(lambda: serializer.loads(stored), repeat),
+    }
+
+
+async def ping_pong(messages: int, pairs: int) -> None:
+    async def echo(inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        for _ in range(messages):
+            outbox.put_nowait(await inbox.get())
+
+    async def pair() -> None:
+        ping: asyncio.Queue = asyncio.Queue()
+        pong: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(echo(ping, pong))
+        for message in range(messages):
+            ping.put_nowait(message)
+            await pong.get()
+        await task
+
+    await asyncio.gather(*(pair() for _ in range(pairs)))
+
+
+async def feed_updates(codec: JsonCodec, updates: int) -> None:
+    bot = Bot(token="123456:benchmark")
+    dispatcher = Dispatcher()
+    storage_data = make_dialog_data(20)
+
+    @dispatcher.message()
+    async def handle(message: Message) -> None:
+        # a state read and write per update, as with RedisStorage
+        codec.loads(codec.dumps_bytes(storage_data))
+        await asyncio.sleep(0)
+
+    raw = [codec.dumps_bytes(make_update(i)) for i in range(updates)]
+    await asyncio.gather(*(
+        dispatcher.feed_raw_update(bot, codec.loads(update))
+        for update in raw
+    ))
+    await bot.session.close()
+
+
+async def measure_loop(
+    codec: JsonCodec,
+    updates: int,
+    messages: int,
+) -> dict[str, float]:
+    started = time.perf_counter()
+    await ping_pong(messages, pairs=100)
+    ping_pong_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await feed_updates(codec, updates)
+    feed_time = time.perf_counter() - started
+
+    return {
+        "queue ping-pong": ping_pong_time / (messages * 100),
+        "feed update": feed_time / updates,
+    }
+
+
+def main(repeat: int, updates: int, messages: int) -> None:
+    results: dict[str, dict[str, float]] = {}
+    for name, loop_type, codec_type in SETUPS:
+        codec = make_json_codec(codec_type)
+        loop_factory = event_loop.get_loop_factory(loop_type)
+        if codec.type != codec_type or (
+            loop_type == EventLoopType.UVLOOP and loop_factory is None
+        ):
+            print(f"{name}: not available, skipped")
+            continue
+
+        timings = measure_codec(codec, repeat)
+        timings.update(event_loop.run(
+            measure_loop(codec, updates, messages),
+            loop_type
+        ))
+        results[name] = timings
+
+    names = list(results)
+    print(f"{'us/op':<20}" + "".join(f"{name:>18}" for name in names))
+    for operation in next(iter(results.values()), {}):
+        row = [results[name][operation] * 1e6 for name in names]
+        speedup = f"{row[0] / row[-1]:>9.2f}x" if len(row) > 1 else ""
+        print(
+            f"{operation:<20}"
+            + "".join(f"{value:>18.2f}" for value in row)
+            + speedup
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Stock asyncio and json against uvloop and orjson"
+    )
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=1000)
+    args = parser.parse_args()
+
+    main(args.repeat, args.updates, args.messages)
@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_TIME_RE = re.compile(
+    r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$"
+)
+
+# runs main() up to polling, the bot never talks to telegram
+SNIPPET = """
+import json, time
+started = time.perf_counter()
+
+from aiogram import Dispatcher
+
+async def start_polling(self, *bots, **kwargs):
+    return None
+
+Dispatcher.start_polling = start_polling
+
+import hueta_bot.main.config as config
+loads = 0
+load_bot_config = config.load_bot_config
+
+def counting_load_bot_config():
+    global loads
+    loads += 1
+    return load_bot_config()
+
+config.load_bot_config = counting_load_bot_config
+
+import hueta_bot.main.bot
+hueta_bot.main.bot.run()
+
+print(json.dumps({
+    "startup": time.perf_counter() - started,
+    "config_loads": loads,
+}))
+"""
+
+
+def run_once(env: dict[str, str]) -> tuple[float, dict, list[str]]:
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    return wall, result, process.stderr.splitlines()
+
+
+def parse_import_times(lines: list[str]) -> dict[str, int]:
+    self_times: dict[str, int] = {}
+    for line in lines:
+        match = IMPORT_TIME_RE.match(line)
+        if match:
+            self_times[match.group(4)] = int(match.group(1))
+    return self_times
+
+
+def make_env(sqlite_path: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        PYTHONPATH=os.pathsep.join(
+            filter(None, (str(ROOT / "src"), env.get("PYTHONPATH")))
+        ),
+        BOT_CONFIG_PATH=str(ROOT / "config" / "bot.yaml"),
+        LOGGING_CONFIG_PATH=str(ROOT / "config" / "logging.yaml"),
+        BOT_TOKEN="123456:benchmark",
+        BOT_DATABASE_SQLITE_PATH=sqlite_path,
+    )
+    return env
+
+
+def main(runs: int, top: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        env = make_env(str(Path(directory) / "bot.sqlite3"))
+        # the first run compiles bytecode, it is not a cold start
+        run_once(env)
+
+        walls = []
+        startups = []
+        packages: dict[str, list[int]] = defaultdict(list)
+        modules: dict[str, list[int]] = defaultdict(list)
+        config_loads = 0
+        for _ in range(runs):
+            wall, result, stderr = run_once(env)
+            walls.append(wall)
+            startups.append(result["startup"])
+            config_loads = result["config_loads"]
+
+            run_packages: dict[str, int] = defaultdict(int)
+            for module, self_time in parse_import_times(stderr).items():
+                run_packages[module.split(".")[0]] += self_time
+                modules[module].append(self_time)
+            for package, self_time in run_packages.items():
+                packages[package].append(self_time)
+
+    print(f"process wall time  {min(walls) * 1e3:10.1f} ms (best of {runs})")
+    print(f"imports + main()   {min(startups) * 1e3:10.1f} ms")
+    print(f"config loads       {config_loads:10d}")
+
+    print(f"\n{'package':<32} {'self ms':>10}")
+    for package, times in sorted(
+        packages.items(),
+        key=lambda item: -min(item[1])
+    )[:top]:
+        print(f"{package:<32} {min(times) / 1e3:>10.1f}")
+
+    print(f"\n{'module':<56} {'self ms':>10}")
+    for module, times in sorted(
+        modules.items(),
+        key=lambda item: -min(item[1])
+    )[:top]:
+        print(f"{module:<56} {min(times) / 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bot cold start time with an import time breakdown"
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    main(args.runs, args.top)
@@ -0,0 +1,63 @@
+from typing import Any, Optional
+
+from aiogram.fsm.state import State
+
+from aiogram_dialog.api.entities import ChatEvent
+from aiogram_dialog.widgets.common import ManagedScroll, Scroll
+
+
+class StubUser:
+    def __init__(self, language_code: str = "en"):
+        self.id = 1
+        self.language_code = language_code
+
+
+class StubEvent:
+    def __init__(self, language_code: str = "en"):
+        self.from_user = StubUser(language_code)
+
+
+class StubDialogManager:
+    def __init__(
+        self,
+        widgets: Optional[dict[str, Any]] = None,
+        language_code: str = "en",
+        state: Optional[State] = None,
+    ):
+        self.event = StubEvent(language_code)
+        self.widget_data: dict[str, Any] = {}
+        self.widgets = widgets or {}
+        self.state = state
+
+    def is_preview(self) -> bool:
+        return False
+
+    def find(self, widget_id: str) -> Any:
+        return self.widgets[widget_id].managed(self)
+
+    def current_context(self) -> "StubDialogManager":
+        return self
+
+
+class StubScroll(Scroll):
+    def __init__(self, id: str, pages: int, page: int = 0):
+        self.widget_id = id
+        self.pages = pages
+        self.page = page
+
+    async def get_page_count(self, data: dict, manager: Any) -> int:
+        return self.pages
+
+    async def get_page(self, manager: Any) -> int:
+        return self.page
+
+    async def set_page(self, event: ChatEvent, page: int, manager: Any):
+        self.page = page
+
+    def managed(self, manager: Any) -> ManagedScroll:
+        return ManagedScroll(self, manager)
+
+    def find(self, widget_id: str) -> Optional["StubScroll"]:
+        if widget_id == self.widget_id:
+            return self
+        return None
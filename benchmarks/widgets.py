@@ -0,0 +1,311 @@
+import argparse
+import asyncio
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from operator import itemgetter
+from typing import Any, Awaitable, Callable, Iterable, NamedTuple
+
+from aiogram.fsm.state import State, StatesGroup
+from aiogram_dialog.widgets.text import Const
+
+from hueta_bot.presentation.dialogs.widgets import (
+    CheckStateMode,
+    KeyboardRenderCache,
+    MarkedCalendar,
+    MultiselectCalendar,
+    PaginationMode,
+    PaginationPager,
+    RadioCalendar,
+    TabStart,
+    TabSwitchTo
+)
+
+from benchmarks.stubs import StubDialogManager, StubScroll
+
+
+GROUPS = ("calendar", "pager", "tab")
+ITEM_COUNTS = (10, 100, 1_000, 10_000, 100_000)
+CHECKED_COUNTS = (0, 10, 100, 1_000)
+PAGE_COUNTS = (10, 100, 1_000, 10_000, 100_000)
+
+# a fixed month, so results do not depend on the day they are taken
+OFFSET = date(2024, 5, 1)
+# items and checked dates are spread over four years around it
+SPAN_DAYS = 1461
+SEED = 42
+
+
+class Tabs(StatesGroup):
+    first = State()
+    second = State()
+
+
+class Other(StatesGroup):
+    main = State()
+
+
+class Case(NamedTuple):
+    widget: str
+    params: str
+    render: Callable[[int], Awaitable[Any]]
+
+
+def make_items(count: int, rng: random.Random) -> list[dict[str, date]]:
+    start = OFFSET - timedelta(days=SPAN_DAYS // 2)
+    return [
+        {"date": start + timedelta(days=rng.randrange(SPAN_DAYS))}
+        for _ in range(count)
+    ]
+
+
+def make_checked(count: int, rng: random.Random) -> list[int]:
+    start = OFFSET.toordinal() - SPAN_DAYS // 2
+    return sorted(rng.sample(range(start, start + SPAN_DAYS), count))
+
+
+def calendar_case(
+    calendar_type: type,
+    items_count: int,
+    checked_count: int,
+    cached: bool,
+    versioned: bool = False,
+) -> Case:
+    rng = random.Random(SEED)
+    calendar = calendar_type(
+        id="calendar",
+        item_id_getter=itemgetter("date"),
+        items="items",
+        items_version="items_version" if versioned else None
+    )
+    calendar.render_cache = KeyboardRenderCache()
+    data = {"items": make_items(items_count, rng), "items_version": 1}
+    manager = StubDialogManager()
+
+    widget_data: dict[str, Any] = {"current_offset": OFFSET.isoformat()}
+    if calendar_type is MultiselectCalendar:
+        widget_data["checked"] = make_checked(checked_count, rng)
+    elif calendar_type is RadioCalendar and checked_count:
+        widget_data["checked"] = OFFSET.toordinal() + 7
+    manager.widget_data[calendar.widget_id] = widget_data
+
+    async def render(step: int) -> Any:
+        if not cached:
+            calendar.render_cache.clear()
+        return await calendar.render_keyboard(data, manager)
+
+    return Case(
+        calendar_type.__name__,
+        f"items={items_count} checked={checked_count} "
+        + ("cached" if cached else "cold")
+        + (" versioned" if versioned else ""),
+        render
+    )
+
+
+def calendar_cases(
+    cached: bool,
+    versioned: bool = False,
+) -> Iterable[Case]:
+    for items_count in ITEM_COUNTS:
+        yield calendar_case(
+            MarkedCalendar,
+            items_count,
+            0,
+            cached,
+            versioned
+        )
+        for checked_count in (0, 1):
+            yield calendar_case(
+                RadioCalendar,
+                items_count,
+                checked_count,
+                cached,
+                versioned
+            )
+        for checked_count in CHECKED_COUNTS:
+            yield calendar_case(
+                MultiselectCalendar,
+                items_count,
+                checked_count,
+                cached,
+                versioned
+            )
+
+
+def pager_cases(width: int) -> Iterable[Case]:
+    for pages in PAGE_COUNTS:
+        for mode in PaginationMode:
+            scroll = StubScroll(id="scroll", pages=pages)
+            pager = PaginationPager(
+                scroll,
+                mode=mode,
+                width=width,
+                show_edges=True,
+                jump=width * 2,
+            )
+            manager = StubDialogManager(widgets={scroll.widget_id: scroll})
+
+            async def render(
+                step: int,
+                pager: PaginationPager = pager,
+                scroll: StubScroll = scroll,
+                manager: StubDialogManager = manager,
+            ) -> Any:
+                # walk around the middle, windows change every `width` pages
+                scroll.page = (scroll.pages // 2 + step) % scroll.pages
+                return await pager.render_keyboard({}, manager)
+
+            yield Case(
+                "PaginationPager",
+                f"pages={pages} mode={mode.value.lower()}",
+                render
+            )
+
+
+def tab_cases() -> Iterable[Case]:
+    for tab_type in (TabSwitchTo, TabStart):
+        for check_state_mode in CheckStateMode:
+            for state, checked in ((Tabs.first, True), (Other.main, False)):
+                tab = tab_type(
+                    Const("[tab]"),
+                    Const("tab"),
+                    id="tab",
+                    state=Tabs.first,
+                    check_state_mode=check_state_mode,
+                )
+                manager = StubDialogManager(state=state)
+
+                async def render(
+                    step: int,
+                    tab: Any = tab,
+                    manager: StubDialogManager = manager,
+                ) -> Any:
+                    return await tab.render_keyboard({}, manager)
+
+                yield Case(
+                    tab_type.__name__,
+                    f"mode={check_state_mode.name.lower()} "
+                    + ("checked" if checked else "unchecked"),
+                    render
+                )
+
+
+async def measure_time(
+    case: Case,
+    repeat: int,
+    rounds: int,
+    warmup: int,
+) -> list[float]:
+    for step in range(warmup):
+        await case.render(step)
+
+    # collections in the middle of a round are the main source of noise
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter_ns()
+            for step in range(repeat):
+                await case.render(step)
+            timings.append((time.perf_counter_ns() - started) / repeat)
+    finally:
+        gc.enable()
+    return timings
+
+
+async def measure_allocations(case: Case, repeat: int) -> tuple[int, int]:
+    # tracemalloc slows everything down, so it gets a pass of its own
+    tracemalloc.start()
+    try:
+        peak = 0
+        before, _ = tracemalloc.get_traced_memory()
+        for step in range(repeat):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            keyboard = await case.render(step)
+            _, render_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, render_peak - current)
+            del keyboard
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, (after - before) // repeat
+
+
+def collect_cases(groups: list[str], width: int) -> Iterable[Case]:
+    # cases are built one at a time, calendar items take a lot of memory
+    if "calendar" in groups:
+        yield from calendar_cases(cached=False)
+        yield from calendar_cases(cached=True)
+        yield from calendar_cases(cached=True, versioned=True)
+    if "pager" in groups:
+        yield from pager_cases(width)
+    if "tab" in groups:
+        yield from tab_cases()
+
+
+async def main(
+    groups: list[str],
+    filter: str,
+    repeat: int,
+    rounds: int,
+    warmup: int,
+    width: int,
+) -> None:
+    print(
+        f"{'widget':<20} {'case':<46} {'us min':>10} {'us median':>10} "
+        f"{'peak KiB':>10} {'kept B':>8}"
+    )
+    for case in collect_cases(groups, width):
+        if filter not in f"{case.widget} {case.params}":
+            continue
+
+        timings = await measure_time(case, repeat, rounds, warmup)
+        peak, kept = await measure_allocations(case, min(repeat, 10))
+        print(
+            f"{case.widget:<20} {case.params:<46} "
+            f"{min(timings) / 1e3:>10.1f} "
+            f"{statistics.median(timings) / 1e3:>10.1f} "
+            f"{peak / 1024:>10.1f} {kept:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Render cost of the custom dialog widgets"
+    )
+    parser.add_argument(
+        "--group",
+        action="append",
+        choices=GROUPS,
+        help="widgets to render, all of them by default"
+    )
+    parser.add_argument(
+        "--filter",
+        default="",
+        help="only cases whose name contains this text"
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=15,
+        help="timed rounds per case, min and median are reported"
+    )
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--width", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(main(
+        args.group or list(GROUPS),
+        args.filter,
+        args.repeat,
+        args.rounds,
+        args.warmup,
+        args.width
+    ))
@@ -0,0 +1,164 @@
+import asyncio
+from functools import wraps
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Final,
+    Generic,
+    Hashable,
+    Optional,
+    TypeVar
+)
+
+from cachetools import TTLCache
+
+from hueta_bot.application.common.interactor import Input, Output
+
+
+InteractorCall = Callable[[Any, Optional[Input]], Awaitable[Output]]
+KeyGetter = Callable[[Optional[Input]], Hashable]
+UserGetter = Callable[[Any], Hashable]
+
+CallT = TypeVar("CallT", bound=InteractorCall)
+
+MISSING: Final = object()
+
+
+def make_input_key(data: Any) -> Hashable:
+    try:
+        hash(data)
+    except TypeError:
+        # plain dataclasses and dicts are unhashable, their repr is stable
+        return repr(data)
+    return data
+
+
+class InteractorMemo(Generic[Input, Output]):
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int,
+        key: KeyGetter = make_input_key,
+        user: Optional[UserGetter] = None,
+    ) -> None:
+        self.key = key
+        self.user = user
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._results: TTLCache[Hashable, Output] = TTLCache(
+            maxsize=maxsize,
+            ttl=ttl
+        )
+        self._in_flight: dict[Hashable, asyncio.Future[Output]] = {}
+
+    def make_key(self, interactor: Any, data: Optional[Input]) -> Hashable:
+        user = self.user(interactor) if self.user is not None else None
+        return user, self.key(data)
+
+    async def call(
+        self,
+        call: InteractorCall,
+        interactor: Any,
+        data: Optional[Input],
+    ) -> Output:
+        key = self.make_key(interactor, data)
+
+        while True:
+            result = self._results.get(key, MISSING)
+            if result is not MISSING:
+                self.hits += 1
+                return result
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+
+            # concurrent callers share the leader's execution
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise
+                # the leader was cancelled, let one of the waiters lead
+
+        self.misses += 1
+        future: asyncio.Future[Output] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[key] = future
+        try:
+            result = await call(interactor, data)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # waiters get the error, the leader raises it itself
+            future.exception()
+            raise
+        else:
+            # an invalidation during the call detached the future, the
+            # result may predate the write and is not stored
+            if self._in_flight.get(key) is future:
+                self._results[key] = result
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def invalidate(
+        self,
+        data: Optional[Input] = None,
+        user: Optional[Hashable] = None,
+    ) -> None:
+        key = (user, self.key(data))
+        self._results.pop(key, None)
+        # later callers start a fresh call instead of joining a stale one
+        self._in_flight.pop(key, None)
+
+    def invalidate_user(self, user: Hashable) -> None:
+        for key in [key for key in self._results if key[0] == user]:
+            self._results.pop(key, None)
+        for key in [key for key in self._in_flight if key[0] == user]:
+            del self._in_flight[key]
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._in_flight.clear()
+
+
+def memoize(
+    ttl: float = 60.0,
+    maxsize: int = 1024,
+    key: KeyGetter = make_input_key,
+    user: Optional[UserGetter] = None,
+) -> Callable[[CallT], CallT]:
+    def decorator(call: CallT) -> CallT:
+        memo: InteractorMemo = InteractorMemo(
+            ttl=ttl,
+            maxsize=maxsize,
+            key=key,
+            user=user
+        )
+
+        @wraps(call)
+        async def wrapper(self, data=None):
+            return await memo.call(call, self, data)
+
+        # shared by every instance, interactors are created per request
+        wrapper.memo = memo
+        return wrapper
+
+    return decorator
+
+
+def get_memo(interactor: Any) -> InteractorMemo:
+    memo = getattr(interactor.__call__, "memo", None)
+    if memo is None:
+        raise TypeError(f"{interactor!r} is not memoized")
+    return memo
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from hueta_bot.application.common.interactor import Input, Interactor, Output
+from hueta_bot.application.ports.offload.offloader import (
+    OffloadKind,
+    Offloader
+)
+
+
+class OffloadedInteractor(Interactor[Input, Output]):
+    # compute runs in a worker, for a process pool it has to be a
+    # picklable staticmethod working on picklable input
+    offload_kind: OffloadKind = OffloadKind.THREAD
+    offload_timeout: Optional[float] = None
+
+    def __init__(self, offloader: Offloader):
+        self.offloader: Offloader = offloader
+
+    @staticmethod
+    def compute(data: Optional[Input]) -> Output:
+        raise NotImplementedError
+
+    async def __call__(
+        self,
+        data: Optional[Input] = None
+    ) -> Output:
+        return await self.offloader.run(
+            type(self).compute,
+            data,
+            kind=self.offload_kind,
+            name=type(self).__qualname__,
+            timeout=self.offload_timeout
+        )
@@ -0,0 +1,28 @@
+from abc import abstractmethod
+from pathlib import Path
+from typing import Any, Protocol
+
+from aiogram import Bot
+from aiogram.methods import TelegramMethod
+from aiogram.types import Message
+
+
+class MediaSender(Protocol):
+    @abstractmethod
+    async def send(
+        self,
+        bot: Bot,
+        method_type: type[TelegramMethod[Message]],
+        path: str | Path,
+        **kwargs: Any,
+    ) -> Message:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def download(
+        self,
+        bot: Bot,
+        file_id: str,
+        destination: str | Path,
+    ) -> Path:
+        raise NotImplementedError
@@ -0,0 +1,15 @@
+from abc import abstractmethod
+from typing import Any, Optional, Protocol
+
+from aiogram.methods import TelegramMethod
+
+
+class Outbox(Protocol):
+    @abstractmethod
+    async def add(
+        self,
+        method: TelegramMethod[Any],
+        dedupe_key: Optional[str] = None,
+        bot_id: Optional[int] = None,
+    ) -> str:
+        raise NotImplementedError
@@ -0,0 +1,28 @@
+from abc import abstractmethod
+from enum import Enum
+from typing import Any, Callable, Optional, Protocol, TypeVar
+
+
+ResultT = TypeVar("ResultT")
+
+
+class OffloadKind(str, Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class OffloadQueueFullError(RuntimeError):
+    pass
+
+
+class Offloader(Protocol):
+    @abstractmethod
+    async def run(
+        self,
+        func: Callable[..., ResultT],
+        *args: Any,
+        kind: OffloadKind = OffloadKind.THREAD,
+        name: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> ResultT:
+        raise NotImplementedError
@@ -0,0 +1,47 @@
+from abc import abstractmethod
+from typing import (
+    Any,
+    AsyncIterable,
+    Iterable,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Union
+)
+
+
+BulkRow = Mapping[str, Any]
+BulkRows = Union[Iterable[BulkRow], AsyncIterable[BulkRow]]
+
+
+class BulkWriter(Protocol):
+    @abstractmethod
+    async def insert(
+        self,
+        table: Any,
+        rows: BulkRows,
+        chunk_size: int = 1000,
+    ) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert(
+        self,
+        table: Any,
+        rows: BulkRows,
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def copy(
+        self,
+        table: Any,
+        rows: BulkRows,
+        columns: Sequence[str],
+        chunk_size: int = 10000,
+    ) -> int:
+        raise NotImplementedError
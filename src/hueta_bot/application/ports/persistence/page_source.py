@@ -0,0 +1,43 @@
+from abc import abstractmethod
+from dataclasses import dataclass
+from typing import Any, Generic, Optional, Protocol, Sequence, TypeVar
+
+
+ItemT = TypeVar("ItemT")
+Cursor = Sequence[Any]
+
+
+@dataclass(frozen=True)
+class KeysetPage(Generic[ItemT]):
+    items: Sequence[ItemT]
+    next_cursor: Optional[Cursor] = None
+
+
+class KeysetPageSource(Protocol[ItemT]):
+    @abstractmethod
+    async def fetch_page(
+        self,
+        after: Optional[Cursor],
+        limit: int,
+    ) -> KeysetPage[ItemT]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def fetch_page_at(
+        self,
+        page: int,
+        limit: int,
+    ) -> KeysetPage[ItemT]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def estimate_count(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def prefetch(
+        self,
+        after: Optional[Cursor],
+        limit: int,
+    ) -> None:
+        raise NotImplementedError
@@ -0,0 +1,35 @@
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+
+JobPayload = dict[str, Any]
+
+
+@dataclass(frozen=True)
+class ScheduledJob:
+    id: str
+    name: str
+    run_at: datetime
+    payload: JobPayload = field(default_factory=dict)
+    attempts: int = 0
+
+
+JobHandler = Callable[[ScheduledJob], Awaitable[None]]
+
+
+class JobScheduler(Protocol):
+    @abstractmethod
+    async def schedule(
+        self,
+        name: str,
+        run_at: datetime,
+        payload: Optional[JobPayload] = None,
+        job_id: Optional[str] = None,
+    ) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def cancel(self, job_id: str) -> bool:
+        raise NotImplementedError
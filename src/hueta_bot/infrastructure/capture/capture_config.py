@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class CaptureConfig:
+    enabled: bool = False
+    path: str = "captures/updates.msgpack"
+    # keeps pseudonyms stable across restarts, random per process if unset
+    salt: Optional[str] = None
+    flush_every: int = 100
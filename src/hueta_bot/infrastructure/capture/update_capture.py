@@ -0,0 +1,171 @@
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+CHAT_TYPES = frozenset({"private", "group", "supergroup", "channel"})
+# user and chat ids outside of User and Chat objects
+ID_FIELDS = frozenset({
+    "user_id",
+    "chat_id",
+    "user_chat_id",
+    "migrate_to_chat_id",
+    "migrate_from_chat_id",
+})
+NAME_FIELDS = frozenset({
+    "first_name",
+    "last_name",
+    "username",
+    "title",
+    "forward_sender_name",
+    "sender_user_name",
+    "author_signature",
+    "forward_signature",
+})
+TEXT_FIELDS = frozenset({"text", "caption", "query"})
+DROPPED_FIELDS = frozenset({
+    "contact",
+    "location",
+    "venue",
+    "phone_number",
+    "entities",
+    "caption_entities",
+    "photo",
+    "document",
+    "voice",
+    "video",
+    "sticker",
+})
+
+
+def import_msgpack() -> Any:
+    # the capture is off by default, msgpack is not worth loading on start
+    import msgpack
+    return msgpack
+
+
+@dataclass(frozen=True)
+class CapturedUpdate:
+    timestamp: float
+    update: dict[str, Any]
+
+
+class UpdateAnonymizer:
+    def __init__(self, salt: Optional[str] = None) -> None:
+        self._key = (salt or secrets.token_hex(16)).encode("utf-8")
+
+    def pseudonym(self, value: int | str) -> int:
+        digest = hmac.new(
+            self._key,
+            str(value).encode("utf-8"),
+            hashlib.sha256
+        ).digest()
+        # group chats have negative ids, keep the sign and json safe range
+        pseudonym = int.from_bytes(digest[:6], "big") or 1
+        return -pseudonym if str(value).startswith("-") else pseudonym
+
+    def anonymize(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self.anonymize(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+
+        # users and chats are recognised by their shape wherever they are:
+        # from, forward_from, new_chat_members, via_bot, sender_chat, ...
+        is_user_or_chat = "id" in value and (
+            "is_bot" in value or value.get("type") in CHAT_TYPES
+        )
+
+        result = {}
+        for key, item in value.items():
+            if key in DROPPED_FIELDS:
+                continue
+            if key == "id" and is_user_or_chat:
+                result[key] = self.pseudonym(item)
+            elif key in ID_FIELDS and isinstance(item, (int, str)):
+                result[key] = self.pseudonym(item)
+            elif key == "chat_instance":
+                result[key] = str(self.pseudonym(item))
+            elif key in NAME_FIELDS and isinstance(item, str):
+                result[key] = "x"
+            elif key in TEXT_FIELDS and isinstance(item, str):
+                result[key] = self._anonymize_text(item)
+            else:
+                result[key] = self.anonymize(item)
+        return result
+
+    def _anonymize_text(self, text: str) -> str:
+        # commands drive handlers, the rest only matters by its length
+        if text.startswith("/"):
+            command, _, rest = text.partition(" ")
+            return f"{command} {'x' * len(rest)}" if rest else command
+        return "x" * len(text)
+
+
+class UpdateCapture:
+    def __init__(
+        self,
+        path: str | Path,
+        anonymizer: Optional[UpdateAnonymizer] = None,
+        flush_every: int = 100,
+    ) -> None:
+        self.path = Path(path)
+        self.anonymizer = anonymizer or UpdateAnonymizer()
+        self.flush_every = flush_every
+
+        self._file: Optional[BinaryIO] = None
+        self._packer = import_msgpack().Packer(use_bin_type=True)
+        self._pending = 0
+        self.captured = 0
+
+    def write(self, update: dict[str, Any]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+
+        try:
+            record = self._packer.pack([
+                time.time(),
+                self.anonymizer.anonymize(update)
+            ])
+        except Exception:
+            logger.exception("Failed to capture update")
+            return
+
+        # one msgpack array per update, a crash loses the unflushed tail only
+        self._file.write(record)
+        self.captured += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        logger.info("Captured %d updates to %s", self.captured, self.path)
+
+
+def read_capture(path: str | Path) -> Iterator[CapturedUpdate]:
+    with open(path, "rb") as f:
+        # a truncated last record of a capture that was not closed is skipped
+        unpacker = import_msgpack().Unpacker(
+            f,
+            raw=False,
+            strict_map_key=False
+        )
+        for timestamp, update in unpacker:
+            yield CapturedUpdate(timestamp=timestamp, update=update)
@@ -0,0 +1,26 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from hueta_bot.infrastructure.runtime.json_codec import get_json_codec
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(
+                record.created,
+                tz=timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.filename}:{record.lineno}",
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+
+        # resolved per record, the codec is picked from bot.yaml at startup
+        return get_json_codec().dumps(entry)
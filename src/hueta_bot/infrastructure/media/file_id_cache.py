@@ -0,0 +1,119 @@
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
+from cachetools import LRUCache
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from hueta_bot.infrastructure.persistence.bulk_writer import (
+    SQLAlchemyBulkWriter
+)
+from hueta_bot.infrastructure.persistence.tables import (
+    media_files_table,
+    utcnow
+)
+
+
+FileKey = tuple[int, str, str]
+
+
+class FileIdCache:
+    # content hash -> file_id of an earlier upload, the table outlives
+    # restarts, the lru in front of it saves a query per send
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_size: int = 1024,
+        chunk_size: int = 65536,
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self._file_ids: LRUCache[FileKey, str] = LRUCache(maxsize=max_size)
+        self._hashes: LRUCache[tuple[str, int, int], str] = LRUCache(
+            maxsize=max_size
+        )
+
+    async def hash_file(self, path: str | Path) -> str:
+        # the file is read again only when its size or mtime change
+        stat = await aiofiles.os.stat(path)
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        content_hash = self._hashes.get(key)
+        if content_hash is not None:
+            return content_hash
+
+        digest = hashlib.sha256()
+        async with aiofiles.open(path, "rb") as file:
+            while chunk := await file.read(self.chunk_size):
+                digest.update(chunk)
+
+        content_hash = self._hashes[key] = digest.hexdigest()
+        return content_hash
+
+    async def get(
+        self,
+        bot_id: int,
+        kind: str,
+        content_hash: str,
+    ) -> Optional[str]:
+        key = (bot_id, kind, content_hash)
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            return file_id
+
+        table = media_files_table
+        async with self.session_factory() as session:
+            file_id = await session.scalar(
+                select(table.c.file_id).where(
+                    table.c.bot_id == bot_id,
+                    table.c.kind == kind,
+                    table.c.content_hash == content_hash
+                )
+            )
+
+        if file_id is not None:
+            self._file_ids[key] = file_id
+        return file_id
+
+    async def set(
+        self,
+        bot_id: int,
+        kind: str,
+        content_hash: str,
+        file_id: str,
+        file_unique_id: str,
+        size: int,
+    ) -> None:
+        async with self.session_factory() as session:
+            await SQLAlchemyBulkWriter(session).upsert(
+                media_files_table,
+                [{
+                    "bot_id": bot_id,
+                    "kind": kind,
+                    "content_hash": content_hash,
+                    "file_id": file_id,
+                    "file_unique_id": file_unique_id,
+                    "size": size,
+                    "created_at": utcnow(),
+                }],
+                conflict_columns=["bot_id", "kind", "content_hash"]
+            )
+            await session.commit()
+
+        self._file_ids[(bot_id, kind, content_hash)] = file_id
+
+    async def delete(self, bot_id: int, kind: str, content_hash: str) -> None:
+        self._file_ids.pop((bot_id, kind, content_hash), None)
+
+        table = media_files_table
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(table).where(
+                    table.c.bot_id == bot_id,
+                    table.c.kind == kind,
+                    table.c.content_hash == content_hash
+                )
+            )
+            await session.commit()
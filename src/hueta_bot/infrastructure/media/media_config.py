@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class MediaConfig:
+    file_id_cache: bool = True
+    memory_size: int = 1024
+    chunk_size: int = 65536
@@ -0,0 +1,148 @@
+import logging
+from pathlib import Path
+from typing import Any, Final, Optional
+
+import aiofiles.os
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import (
+    SendAnimation,
+    SendAudio,
+    SendDocument,
+    SendPhoto,
+    SendSticker,
+    SendVideo,
+    SendVideoNote,
+    SendVoice,
+    TelegramMethod
+)
+from aiogram.types import FSInputFile, Message
+
+from hueta_bot.application.ports.messaging.media_sender import MediaSender
+from hueta_bot.infrastructure.media.file_id_cache import FileIdCache
+
+
+logger = logging.getLogger(__name__)
+
+# the method argument that takes the file, the same name is used
+# for the attachment of the sent message
+MEDIA_FIELDS: dict[type[TelegramMethod[Message]], str] = {
+    SendPhoto: "photo",
+    SendDocument: "document",
+    SendVideo: "video",
+    SendAudio: "audio",
+    SendAnimation: "animation",
+    SendVoice: "voice",
+    SendVideoNote: "video_note",
+    SendSticker: "sticker",
+}
+
+
+def get_attachment(message: Message, field: str) -> Any:
+    attachment = getattr(message, field, None)
+    # photos come back in several sizes, the largest one is the original
+    if isinstance(attachment, list):
+        return attachment[-1] if attachment else None
+    return attachment
+
+
+# errors telling that a cached file id cannot be used any more, other
+# bad requests like a too long caption must not cause an upload
+FILE_ID_ERRORS: Final = (
+    "wrong file identifier",
+    "wrong remote file identifier",
+    "wrong file_id",
+    "file reference expired",
+    "file_reference_expired",
+    "type of file mismatch",
+    "media_empty",
+)
+
+
+def is_file_error(error: TelegramBadRequest) -> bool:
+    message = error.message.lower()
+    return any(text in message for text in FILE_ID_ERRORS)
+
+
+class CachedMediaSender(MediaSender):
+    def __init__(
+        self,
+        cache: Optional[FileIdCache] = None,
+        chunk_size: int = 65536,
+    ):
+        self.cache = cache
+        self.chunk_size = chunk_size
+
+    async def send(
+        self,
+        bot: Bot,
+        method_type: type[TelegramMethod[Message]],
+        path: str | Path,
+        **kwargs: Any,
+    ) -> Message:
+        field = MEDIA_FIELDS.get(method_type)
+        if field is None:
+            raise ValueError(f"{method_type.__name__} does not send a file")
+
+        if self.cache is None:
+            return await bot(method_type(
+                **{field: FSInputFile(path, chunk_size=self.chunk_size)},
+                **kwargs
+            ))
+
+        content_hash = await self.cache.hash_file(path)
+        file_id = await self.cache.get(bot.id, field, content_hash)
+        if file_id is not None:
+            try:
+                return await bot(method_type(**{field: file_id}, **kwargs))
+            except TelegramBadRequest as error:
+                if not is_file_error(error):
+                    raise
+                # file ids may stop working, the file is uploaded again
+                logger.warning(
+                    "Cached file id of %s was rejected: %s",
+                    path,
+                    error.message
+                )
+                await self.cache.delete(bot.id, field, content_hash)
+
+        message = await bot(method_type(
+            **{field: FSInputFile(path, chunk_size=self.chunk_size)},
+            **kwargs
+        ))
+
+        attachment = get_attachment(message, field)
+        if attachment is not None:
+            await self.cache.set(
+                bot_id=bot.id,
+                kind=field,
+                content_hash=content_hash,
+                file_id=attachment.file_id,
+                file_unique_id=attachment.file_unique_id,
+                size=attachment.file_size or 0
+            )
+        return message
+
+    async def download(
+        self,
+        bot: Bot,
+        file_id: str,
+        destination: str | Path,
+    ) -> Path:
+        # streamed in chunks to a temporary file, a failed download
+        # never leaves a truncated file at the destination
+        destination = Path(destination)
+        partial = destination.with_name(f".{destination.name}.part")
+        try:
+            await bot.download(
+                file_id,
+                destination=partial,
+                timeout=int(bot.session.timeout),
+                chunk_size=self.chunk_size
+            )
+            await aiofiles.os.replace(partial, destination)
+        except BaseException:
+            if await aiofiles.os.path.exists(partial):
+                await aiofiles.os.remove(partial)
+            raise
+        return destination
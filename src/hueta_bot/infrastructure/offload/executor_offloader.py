@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from hueta_bot.application.ports.offload.offloader import (
+    OffloadKind,
+    OffloadQueueFullError,
+    Offloader,
+    ResultT
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def timed_call(
+    func: Callable[..., ResultT],
+    args: tuple[Any, ...],
+) -> tuple[ResultT, float, float]:
+    # wall clock, the worker may live in another process
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at, time.time() - started_at
+
+
+@dataclass
+class OffloadMetrics:
+    calls: int = 0
+    completed: int = 0
+    failures: int = 0
+    cancelled: int = 0
+    rejected: int = 0
+    queue_time: float = 0.0
+    max_queue_time: float = 0.0
+    execution_time: float = 0.0
+    max_execution_time: float = 0.0
+
+    def add_timings(self, queue_time: float, execution_time: float) -> None:
+        self.completed += 1
+        self.queue_time += queue_time
+        self.max_queue_time = max(self.max_queue_time, queue_time)
+        self.execution_time += execution_time
+        self.max_execution_time = max(
+            self.max_execution_time,
+            execution_time
+        )
+
+
+class ExecutorOffloader(Offloader):
+    def __init__(
+        self,
+        thread_workers: int = 4,
+        process_workers: int = 2,
+        max_pending: int = 32,
+        queue_timeout: float = 5.0,
+        timeout: Optional[float] = 30.0,
+    ) -> None:
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+
+        self.max_pending = max_pending
+
+        self._executors: dict[OffloadKind, Executor] = {}
+        self._slots = self._make_slots()
+        self._metrics: dict[str, OffloadMetrics] = {}
+
+    def _make_slots(self) -> dict[OffloadKind, asyncio.Semaphore]:
+        # bounds running plus queued calls, executors queue without limit
+        return {
+            OffloadKind.THREAD: asyncio.Semaphore(
+                self.thread_workers + self.max_pending
+            ),
+            OffloadKind.PROCESS: asyncio.Semaphore(
+                self.process_workers + self.max_pending
+            ),
+        }
+
+    def reconfigure(
+        self,
+        thread_workers: int,
+        process_workers: int,
+        max_pending: int,
+        queue_timeout: float,
+        timeout: Optional[float],
+    ) -> None:
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+
+        resized = (
+            thread_workers != self.thread_workers
+            or process_workers != self.process_workers
+            or max_pending != self.max_pending
+        )
+        if not resized:
+            return
+
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.max_pending = max_pending
+        # calls in flight finish in the old pools and release old slots,
+        # new calls go to pools of the new size
+        self._slots = self._make_slots()
+        old_executors = list(self._executors.values())
+        self._executors.clear()
+        for executor in old_executors:
+            executor.shutdown(wait=False)
+
+    async def run(
+        self,
+        func: Callable[..., ResultT],
+        *args: Any,
+        kind: OffloadKind = OffloadKind.THREAD,
+        name: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> ResultT:
+        metrics = self._metrics.setdefault(
+            name or getattr(func, "__qualname__", repr(func)),
+            OffloadMetrics()
+        )
+        slots = self._slots[kind]
+        submitted_at = time.time()
+
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            metrics.rejected += 1
+            raise OffloadQueueFullError(
+                f"{kind.value} offload queue is full"
+            ) from None
+
+        metrics.calls += 1
+        loop = asyncio.get_running_loop()
+        try:
+            concurrent_future = self._get_executor(kind).submit(
+                timed_call,
+                func,
+                args
+            )
+        except BaseException:
+            slots.release()
+            raise
+
+        # the slot is freed when the work is done, a timed out or cancelled
+        # call that already started keeps its slot until it finishes
+        concurrent_future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(slots.release)
+        )
+
+        try:
+            result, started_at, execution_time = await asyncio.wait_for(
+                asyncio.wrap_future(concurrent_future, loop=loop),
+                timeout if timeout is not None else self.timeout
+            )
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            metrics.cancelled += 1
+            raise
+        except Exception:
+            metrics.failures += 1
+            raise
+
+        metrics.add_timings(
+            max(0.0, started_at - submitted_at),
+            execution_time
+        )
+        return result
+
+    def metrics(self) -> dict[str, OffloadMetrics]:
+        return {
+            name: OffloadMetrics(**vars(metrics))
+            for name, metrics in self._metrics.items()
+        }
+
+    def _get_executor(self, kind: OffloadKind) -> Executor:
+        executor = self._executors.get(kind)
+        if executor is None:
+            if kind == OffloadKind.PROCESS:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.process_workers
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.thread_workers,
+                    thread_name_prefix="offload"
+                )
+            self._executors[kind] = executor
+        return executor
+
+    def shutdown(self) -> None:
+        for name, metrics in self._metrics.items():
+            logger.info(
+                "Offload %s: %d calls, %d failed, %d cancelled, "
+                "%d rejected, queue %.3fs avg %.3fs max, "
+                "execution %.3fs avg %.3fs max",
+                name,
+                metrics.calls,
+                metrics.failures,
+                metrics.cancelled,
+                metrics.rejected,
+                metrics.queue_time / max(metrics.completed, 1),
+                metrics.max_queue_time,
+                metrics.execution_time / max(metrics.completed, 1),
+                metrics.max_execution_time
+            )
+
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class OffloadConfig:
+    thread_workers: int = 4
+    process_workers: int = 2
+    max_pending: int = 32
+    queue_timeout: float = 5.0
+    timeout: Optional[float] = 30.0
@@ -0,0 +1,73 @@
+from typing import Any, Optional
+from uuid import uuid4
+
+from aiogram import Bot
+from aiogram.methods import TelegramMethod
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from hueta_bot.application.ports.messaging.outbox import Outbox
+from hueta_bot.application.ports.persistence.bulk_writer import BulkWriter
+from hueta_bot.infrastructure.outbox.outbox_relay import (
+    OutboxRelay,
+    dump_method
+)
+from hueta_bot.infrastructure.persistence.tables import (
+    OutboxStatus,
+    outbox_messages_table,
+    utcnow
+)
+
+
+class SQLAlchemyOutbox(Outbox):
+    # messages are written in the request session, the relay sends them
+    # only after that session commits
+    def __init__(
+        self,
+        session: AsyncSession,
+        bulk_writer: BulkWriter,
+        relay: OutboxRelay,
+        bot: Bot,
+    ):
+        self.session: AsyncSession = session
+        self.bulk_writer: BulkWriter = bulk_writer
+        self.relay: OutboxRelay = relay
+        self.bot: Bot = bot
+
+    async def add(
+        self,
+        method: TelegramMethod[Any],
+        dedupe_key: Optional[str] = None,
+        bot_id: Optional[int] = None,
+    ) -> str:
+        message_id = uuid4().hex
+        now = utcnow()
+        chat_id = getattr(method, "chat_id", None)
+        # sent by the bot that handles the update unless told otherwise
+        if bot_id is None:
+            bot_id = self.bot.id
+
+        # a repeated dedupe key is ignored instead of queued twice
+        await self.bulk_writer.upsert(
+            outbox_messages_table,
+            [{
+                "id": message_id,
+                "dedupe_key": dedupe_key or message_id,
+                "chat_id": str(chat_id) if chat_id is not None else None,
+                "bot_id": bot_id,
+                "method": method.__api_method__,
+                "payload": dump_method(method),
+                "created_at": now,
+                "available_at": now,
+                "status": OutboxStatus.PENDING.value,
+                "attempts": 0,
+            }],
+            conflict_columns=["dedupe_key"],
+            update_columns=[]
+        )
+
+        sync_session = self.session.sync_session
+        if not event.contains(sync_session, "after_commit", self.relay.notify):
+            event.listen(sync_session, "after_commit", self.relay.notify)
+
+        return message_id
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class OutboxConfig:
+    enabled: bool = True
+    batch_size: int = 100
+    poll_interval: float = 1.0
+    rate: float = 25.0
+    chat_interval: float = 1.0
+    lease_timeout: float = 60.0
+    max_attempts: int = 5
+    retry_delay: float = 5.0
+    retention: float = 86400.0
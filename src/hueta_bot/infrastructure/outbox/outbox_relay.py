@@ -0,0 +1,557 @@
+import asyncio
+import base64
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Optional, Sequence
+from uuid import uuid4
+
+from aiogram import Bot, methods
+from aiogram.client.default import Default
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter
+)
+from aiogram.methods import TelegramMethod
+from aiogram.types import (
+    BufferedInputFile,
+    FSInputFile,
+    InputFile,
+    URLInputFile
+)
+from cachetools import TTLCache
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+from sqlalchemy import and_, delete, exists, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from hueta_bot.infrastructure.persistence.tables import (
+    OutboxStatus,
+    outbox_messages_table,
+    utcnow
+)
+
+
+logger = logging.getLogger(__name__)
+
+SKIP_LOCKED_DIALECTS = frozenset({"postgresql", "mysql", "mariadb"})
+
+TELEGRAM_METHODS: dict[str, type[TelegramMethod[Any]]] = {
+    method.__api_method__: method
+    for method in (getattr(methods, name) for name in methods.__all__)
+    if isinstance(method, type)
+    and issubclass(method, TelegramMethod)
+    and hasattr(method, "__api_method__")
+}
+
+
+INPUT_FILE_KEY = "__input_file__"
+
+
+def dump_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [dump_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: dump_value(item) for key, item in value.items()}
+    if isinstance(value, BaseModel):
+        # unset fields keep their bot defaults when loaded again, but
+        # type discriminators of input media have to be kept
+        fields = {
+            name: getattr(value, name) for name in type(value).model_fields
+        }
+        return {
+            name: dump_value(item)
+            for name, item in fields.items()
+            if name in value.model_fields_set
+            or (item is not None and not isinstance(item, Default))
+        }
+    if not isinstance(value, InputFile):
+        return value
+
+    # files are stored by reference where possible, buffers by content
+    if isinstance(value, FSInputFile):
+        return {
+            INPUT_FILE_KEY: "fs",
+            "path": str(value.path),
+            "filename": value.filename,
+            "chunk_size": value.chunk_size,
+        }
+    if isinstance(value, BufferedInputFile):
+        return {
+            INPUT_FILE_KEY: "buffered",
+            "data": base64.b64encode(value.data).decode("ascii"),
+            "filename": value.filename,
+            "chunk_size": value.chunk_size,
+        }
+    if isinstance(value, URLInputFile):
+        return {
+            INPUT_FILE_KEY: "url",
+            "url": value.url,
+            "headers": value.headers,
+            "filename": value.filename,
+            "chunk_size": value.chunk_size,
+            "timeout": value.timeout,
+        }
+    raise TypeError(f"{type(value).__name__} cannot be queued")
+
+
+def load_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [load_value(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    kind = value.get(INPUT_FILE_KEY)
+    if kind is None:
+        return {key: load_value(item) for key, item in value.items()}
+
+    options = {
+        key: item for key, item in value.items() if key != INPUT_FILE_KEY
+    }
+    if kind == "fs":
+        return FSInputFile(**options)
+    if kind == "buffered":
+        return BufferedInputFile(
+            file=base64.b64decode(options.pop("data")),
+            **options
+        )
+    if kind == "url":
+        return URLInputFile(**options)
+    raise ValueError(f"Unknown queued input file kind: {kind}")
+
+
+def dump_method(method: TelegramMethod[Any]) -> dict[str, Any]:
+    # input files are not json, they are replaced by how to open them again
+    return to_jsonable_python(dump_value(method))
+
+
+def load_method(name: str, payload: dict[str, Any]) -> TelegramMethod[Any]:
+    return TELEGRAM_METHODS[name].model_validate(load_value(payload))
+
+
+class RateLimiter:
+    def __init__(self, rate: float, chat_interval: float) -> None:
+        self.rate = rate
+        self.chat_interval = chat_interval
+
+        self._tokens = rate
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._chat_sent_at: TTLCache[str, float] = TTLCache(
+            maxsize=100000,
+            ttl=max(chat_interval, 1.0)
+        )
+
+    def reconfigure(self, rate: float, chat_interval: float) -> None:
+        self.rate = rate
+        self._tokens = min(self._tokens, rate)
+        if chat_interval > self._chat_sent_at.ttl:
+            self._chat_sent_at = TTLCache(
+                maxsize=self._chat_sent_at.maxsize,
+                ttl=chat_interval
+            )
+        self.chat_interval = chat_interval
+
+    async def acquire(self, chat_id: Optional[str]) -> None:
+        if chat_id is not None:
+            sent_at = self._chat_sent_at.get(chat_id)
+            if sent_at is not None:
+                delay = sent_at + self.chat_interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate,
+                self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._updated_at = time.monotonic()
+                self._tokens = 1
+            self._tokens -= 1
+
+        if chat_id is not None:
+            self._chat_sent_at[chat_id] = time.monotonic()
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        rate: float = 25.0,
+        chat_interval: float = 1.0,
+        lease_timeout: float = 60.0,
+        max_attempts: int = 5,
+        retry_delay: float = 5.0,
+        retention: float = 86400.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retention = retention
+        self.rate = rate
+        self.chat_interval = chat_interval
+
+        # telegram limits every bot on its own
+        self._limiters: dict[int, RateLimiter] = {}
+        self._bots: dict[int, Bot] = {}
+
+        # ids sent by this process, guards against sending twice when
+        # marking a message as sent failed and it was claimed again
+        self._sent: TTLCache[str, bool] = TTLCache(
+            maxsize=max(batch_size * 100, 1000),
+            ttl=max(lease_timeout * 2, 60.0)
+        )
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._cleanup_at = 0.0
+        self._dialect_name: Optional[str] = None
+
+    def start(self, bots: Sequence[Bot]) -> None:
+        self._bots = {bot.id: bot for bot in bots}
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def reconfigure(
+        self,
+        poll_interval: float,
+        rate: float,
+        chat_interval: float,
+        max_attempts: int,
+        retry_delay: float,
+        retention: float,
+    ) -> None:
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retention = retention
+        self.rate = rate
+        self.chat_interval = chat_interval
+        for limiter in self._limiters.values():
+            limiter.reconfigure(rate=rate, chat_interval=chat_interval)
+        self._cleanup_at = 0.0
+        self._wakeup.set()
+
+    def notify(self, *args: Any) -> None:
+        # called from the session after_commit event
+        self._wakeup.set()
+
+    def _get_limiter(self, bot: Bot) -> RateLimiter:
+        limiter = self._limiters.get(bot.id)
+        if limiter is None:
+            limiter = self._limiters[bot.id] = RateLimiter(
+                rate=self.rate,
+                chat_interval=self.chat_interval
+            )
+        return limiter
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                sent = await self._relay()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox relay failed")
+                sent = 0
+
+            if sent < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        self.poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _relay(self) -> int:
+        if time.monotonic() >= self._cleanup_at:
+            await self._cleanup()
+
+        rows = await self._claim()
+        if not rows:
+            return 0
+
+        # messages of one chat keep their order, chats are sent concurrently
+        chats: dict[
+            tuple[Bot, Optional[str]],
+            list[dict[str, Any]]
+        ] = defaultdict(list)
+        for row in rows:
+            bot = self._bots.get(row["bot_id"])
+            if bot is None:
+                # sending through another bot would reach the wrong chat
+                logger.error(
+                    "Outbox message %s is for bot id=%d, which is not served",
+                    row["id"],
+                    row["bot_id"]
+                )
+                await self._mark(row, OutboxStatus.FAILED)
+                continue
+            chats[(bot, row["chat_id"])].append(row)
+        # one broken chat must not cancel the others, its rows stay
+        # sending until their lease expires
+        results = await asyncio.gather(
+            *(
+                self._send_chat(bot, chat_id, chat_rows)
+                for (bot, chat_id), chat_rows in chats.items()
+            ),
+            return_exceptions=True
+        )
+        for (bot, chat_id), result in zip(chats, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Outbox chat %s of bot id=%d failed",
+                    chat_id,
+                    bot.id,
+                    exc_info=result
+                )
+        return len(rows)
+
+    async def _send_chat(
+        self,
+        bot: Bot,
+        chat_id: Optional[str],
+        rows: list[dict[str, Any]],
+    ) -> None:
+        limiter = self._get_limiter(bot)
+        lease_margin = timedelta(seconds=self.lease_timeout / 2)
+        for index, row in enumerate(rows):
+            # a chat with many messages is sent for longer than one lease
+            if row["locked_until"] - utcnow() < lease_margin:
+                if not await self._extend_lease(rows[index:]):
+                    logger.warning(
+                        "Outbox chat %s of bot id=%d was claimed again",
+                        chat_id,
+                        bot.id
+                    )
+                    return
+
+            if row["id"] not in self._sent:
+                await limiter.acquire(chat_id)
+                try:
+                    await bot(load_method(row["method"], row["payload"]))
+                except TelegramRetryAfter as error:
+                    await self._retry(row, error.retry_after)
+                except (TelegramBadRequest, TelegramForbiddenError):
+                    logger.exception("Outbox message %s rejected", row["id"])
+                    await self._mark(row, OutboxStatus.FAILED)
+                except Exception:
+                    logger.exception("Outbox message %s failed", row["id"])
+                    await self._retry(row)
+                else:
+                    self._sent[row["id"]] = True
+                    await self._mark(row, OutboxStatus.SENT)
+                    continue
+
+                # later messages of the chat wait for the next poll,
+                # sending them now would overtake this one
+                await self._release(rows[index + 1:])
+                return
+
+            await self._mark(row, OutboxStatus.SENT)
+
+    async def _claim(self) -> list[dict[str, Any]]:
+        now = utcnow()
+        table = outbox_messages_table
+        async with self.session_factory() as session:
+            async with session.begin():
+                # a sending row with an expired lease belongs to a dead relay
+                claimable = or_(
+                    and_(
+                        table.c.status == OutboxStatus.PENDING.value,
+                        table.c.available_at <= now
+                    ),
+                    and_(
+                        table.c.status == OutboxStatus.SENDING.value,
+                        table.c.locked_until < now
+                    )
+                )
+                # a chat is sent in order, nothing overtakes a message
+                # that waits for a retry or is being sent by another relay
+                earlier = table.alias("earlier")
+                blocked = exists().where(
+                    earlier.c.chat_id == table.c.chat_id,
+                    earlier.c.bot_id == table.c.bot_id,
+                    earlier.c.created_at < table.c.created_at,
+                    or_(
+                        and_(
+                            earlier.c.status == OutboxStatus.PENDING.value,
+                            earlier.c.available_at > now
+                        ),
+                        and_(
+                            earlier.c.status == OutboxStatus.SENDING.value,
+                            earlier.c.locked_until >= now
+                        )
+                    )
+                )
+                statement = (
+                    select(table)
+                    .where(claimable, ~blocked)
+                    .order_by(table.c.created_at)
+                    .limit(self.batch_size)
+                )
+                if self._get_dialect_name(session) in SKIP_LOCKED_DIALECTS:
+                    statement = statement.with_for_update(skip_locked=True)
+
+                rows = (await session.execute(statement)).mappings().all()
+                if not rows:
+                    return []
+
+                # without SKIP LOCKED another relay may have selected the
+                # same rows, the claimable check lets one of them win and
+                # the token tells which rows this relay got
+                claim_token = uuid4().hex
+                await session.execute(
+                    update(table)
+                    .where(
+                        table.c.id.in_([row["id"] for row in rows]),
+                        claimable
+                    )
+                    .values(
+                        status=OutboxStatus.SENDING.value,
+                        attempts=table.c.attempts + 1,
+                        locked_until=now + timedelta(
+                            seconds=self.lease_timeout
+                        ),
+                        claim_token=claim_token
+                    )
+                )
+                rows = (await session.execute(
+                    select(table)
+                    .where(table.c.claim_token == claim_token)
+                    .order_by(table.c.created_at)
+                )).mappings().all()
+
+        return [dict(row) for row in rows]
+
+    def _get_dialect_name(self, session: AsyncSession) -> str:
+        if self._dialect_name is None:
+            self._dialect_name = session.sync_session.get_bind().dialect.name
+        return self._dialect_name
+
+    def _owned(self, rows: list[dict[str, Any]]) -> Any:
+        # a row whose lease expired may be sent by another relay now
+        table = outbox_messages_table
+        return and_(
+            table.c.id.in_([row["id"] for row in rows]),
+            table.c.status == OutboxStatus.SENDING.value,
+            table.c.claim_token == rows[0]["claim_token"]
+        )
+
+    async def _extend_lease(self, rows: list[dict[str, Any]]) -> bool:
+        locked_until = utcnow() + timedelta(seconds=self.lease_timeout)
+
+        table = outbox_messages_table
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(table)
+                .where(self._owned(rows))
+                .values(locked_until=locked_until)
+            )
+            await session.commit()
+
+        for row in rows:
+            row["locked_until"] = locked_until
+        return result.rowcount == len(rows)
+
+    async def _mark(self, row: dict[str, Any], status: OutboxStatus) -> None:
+        table = outbox_messages_table
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(table)
+                .where(self._owned([row]))
+                .values(
+                    status=status.value,
+                    locked_until=None,
+                    claim_token=None,
+                    sent_at=utcnow() if status == OutboxStatus.SENT else None
+                )
+            )
+            await session.commit()
+        if not result.rowcount:
+            logger.warning("Outbox message %s was claimed again", row["id"])
+
+    async def _release(self, rows: list[dict[str, Any]]) -> None:
+        # claimed but not tried, the claim does not count as an attempt
+        if not rows:
+            return
+
+        table = outbox_messages_table
+        async with self.session_factory() as session:
+            await session.execute(
+                update(table)
+                .where(self._owned(rows))
+                .values(
+                    status=OutboxStatus.PENDING.value,
+                    attempts=table.c.attempts - 1,
+                    locked_until=None,
+                    claim_token=None
+                )
+            )
+            await session.commit()
+
+    async def _retry(
+        self,
+        row: dict[str, Any],
+        delay: Optional[float] = None,
+    ) -> None:
+        if delay is None:
+            if row["attempts"] >= self.max_attempts:
+                await self._mark(row, OutboxStatus.FAILED)
+                return
+            delay = self.retry_delay * 2 ** (row["attempts"] - 1)
+
+        table = outbox_messages_table
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(table)
+                .where(self._owned([row]))
+                .values(
+                    status=OutboxStatus.PENDING.value,
+                    available_at=utcnow() + timedelta(seconds=delay),
+                    locked_until=None,
+                    claim_token=None
+                )
+            )
+            await session.commit()
+        if not result.rowcount:
+            logger.warning("Outbox message %s was claimed again", row["id"])
+            return
+        asyncio.get_running_loop().call_later(delay, self._wakeup.set)
+
+    async def _cleanup(self) -> None:
+        # sent rows are kept for a while so their dedupe keys still apply
+        table = outbox_messages_table
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(table).where(
+                    table.c.status == OutboxStatus.SENT.value,
+                    table.c.sent_at < utcnow() - timedelta(
+                        seconds=self.retention
+                    )
+                )
+            )
+            await session.commit()
+        self._cleanup_at = time.monotonic() + min(self.retention, 3600.0)
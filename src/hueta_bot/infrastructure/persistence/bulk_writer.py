@@ -0,0 +1,212 @@
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from sqlalchemy import Table, inspect, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from hueta_bot.application.ports.persistence.bulk_writer import (
+    BulkRow,
+    BulkRows,
+    BulkWriter
+)
+from hueta_bot.infrastructure.persistence.query_cache import (
+    add_written_tables
+)
+
+
+async def iterate_chunks(
+    rows: BulkRows,
+    chunk_size: int
+) -> AsyncIterator[list[BulkRow]]:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    chunk: list[BulkRow] = []
+
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    else:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def get_table(table: Any) -> Table:
+    if isinstance(table, Table):
+        return table
+    return inspect(table).local_table
+
+
+class SQLAlchemyBulkWriter(BulkWriter):
+    def __init__(self, session: AsyncSession):
+        self.session: AsyncSession = session
+
+    @property
+    def dialect_name(self) -> str:
+        return self.session.sync_session.get_bind().dialect.name
+
+    async def insert(
+        self,
+        table: Any,
+        rows: BulkRows,
+        chunk_size: int = 1000,
+    ) -> int:
+        statement = insert(get_table(table))
+
+        written = 0
+        async for chunk in iterate_chunks(rows, chunk_size):
+            await self.session.execute(statement, chunk)
+            written += len(chunk)
+
+        return written
+
+    async def upsert(
+        self,
+        table: Any,
+        rows: BulkRows,
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> int:
+        sa_table = get_table(table)
+
+        written = 0
+        async for chunk in iterate_chunks(rows, chunk_size):
+            if update_columns is None:
+                update_columns = [
+                    column for column in chunk[0]
+                    if column not in conflict_columns
+                ]
+            statement = self._make_upsert(
+                sa_table,
+                conflict_columns,
+                update_columns
+            )
+            await self.session.execute(statement, chunk)
+            written += len(chunk)
+
+        return written
+
+    async def copy(
+        self,
+        table: Any,
+        rows: BulkRows,
+        columns: Sequence[str],
+        chunk_size: int = 10000,
+    ) -> int:
+        sa_table = get_table(table)
+        if self.dialect_name != "postgresql":
+            return await self._copy_with_insert(
+                sa_table,
+                rows,
+                columns,
+                chunk_size
+            )
+
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        if not hasattr(driver_connection, "copy_records_to_table"):
+            return await self._copy_with_insert(
+                sa_table,
+                rows,
+                columns,
+                chunk_size
+            )
+
+        # the asyncpg adapter begins its transaction with the first statement,
+        # COPY sent before it would autocommit instead of rolling back with
+        # the session
+        if not driver_connection.is_in_transaction():
+            await connection.exec_driver_sql("SELECT 1")
+
+        written = 0
+        async for chunk in iterate_chunks(rows, chunk_size):
+            await driver_connection.copy_records_to_table(
+                sa_table.name,
+                records=[
+                    tuple(row[column] for column in columns)
+                    for row in chunk
+                ],
+                columns=list(columns),
+                schema_name=sa_table.schema,
+            )
+            written += len(chunk)
+
+        # COPY bypasses the ORM execution events
+        add_written_tables(self.session, sa_table)
+
+        return written
+
+    async def _copy_with_insert(
+        self,
+        table: Table,
+        rows: BulkRows,
+        columns: Sequence[str],
+        chunk_size: int,
+    ) -> int:
+        # same rows as COPY would write, other keys of the rows are ignored
+        statement = insert(table)
+
+        written = 0
+        async for chunk in iterate_chunks(rows, chunk_size):
+            await self.session.execute(
+                statement,
+                [{column: row[column] for column in columns} for row in chunk]
+            )
+            written += len(chunk)
+
+        return written
+
+    def _make_upsert(
+        self,
+        table: Table,
+        conflict_columns: Sequence[str],
+        update_columns: Sequence[str],
+    ):
+        dialect_name = self.dialect_name
+
+        # dialect modules are imported for the configured database only
+        if dialect_name in ("postgresql", "sqlite"):
+            from sqlalchemy.dialects import postgresql, sqlite
+
+            dialect_module = (
+                postgresql if dialect_name == "postgresql" else sqlite
+            )
+            statement = dialect_module.insert(table)
+            if not update_columns:
+                return statement.on_conflict_do_nothing(
+                    index_elements=conflict_columns
+                )
+            return statement.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={
+                    column: statement.excluded[column]
+                    for column in update_columns
+                }
+            )
+
+        elif dialect_name in ("mysql", "mariadb"):
+            from sqlalchemy.dialects import mysql
+
+            statement = mysql.insert(table)
+            if not update_columns:
+                return statement.prefix_with("IGNORE")
+            return statement.on_duplicate_key_update({
+                column: statement.inserted[column]
+                for column in update_columns
+            })
+
+        else:
+            raise NotImplementedError(
+                f"Upsert is not supported for {dialect_name} dialect"
+            )
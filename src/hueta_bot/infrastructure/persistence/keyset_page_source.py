@@ -0,0 +1,190 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Optional, Sequence
+
+from cachetools import TTLCache
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql import ColumnElement
+
+from hueta_bot.application.ports.persistence.page_source import (
+    Cursor,
+    ItemT,
+    KeysetPage,
+    KeysetPageSource
+)
+
+
+logger = logging.getLogger(__name__)
+
+PrefetchKey = tuple[Optional[tuple[Any, ...]], int]
+
+
+class SQLAlchemyKeysetPageSource(KeysetPageSource[ItemT]):
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        statement: Select,
+        key_columns: Sequence[ColumnElement],
+        scalars: bool = True,
+        count_ttl: float = 60.0,
+        prefetch_ttl: float = 30.0,
+        prefetch_size: int = 64,
+    ):
+        if not key_columns:
+            raise ValueError("keyset pagination requires key columns")
+
+        self.session_factory = session_factory
+        self.statement = statement
+        self.key_columns = tuple(key_columns)
+        self.scalars = scalars
+        self.count_ttl = count_ttl
+
+        self._count: Optional[int] = None
+        self._count_expires_at: float = 0.0
+        self._prefetched: TTLCache[PrefetchKey, asyncio.Task] = TTLCache(
+            maxsize=prefetch_size,
+            ttl=prefetch_ttl
+        )
+        # the cache drops tasks silently, running ones are referenced here
+        self._prefetch_tasks: set[asyncio.Task] = set()
+
+    async def fetch_page(
+        self,
+        after: Optional[Cursor],
+        limit: int,
+    ) -> KeysetPage[ItemT]:
+        task = self._prefetched.pop(self._prefetch_key(after, limit), None)
+        if task is not None:
+            try:
+                return await task
+            except Exception:
+                logger.exception("Prefetched page load failed")
+
+        return await self._load_page(after, limit)
+
+    async def fetch_page_at(
+        self,
+        page: int,
+        limit: int,
+    ) -> KeysetPage[ItemT]:
+        statement = (
+            self.statement
+            .add_columns(*self.key_columns)
+            .order_by(*self.key_columns)
+            .offset(page * limit)
+            .limit(limit + 1)
+        )
+        return await self._execute_page(statement, limit)
+
+    async def estimate_count(self) -> int:
+        now = time.monotonic()
+        if self._count is not None and self._count_expires_at > now:
+            return self._count
+
+        async with self.session_factory() as session:
+            count: Optional[int] = None
+            if session.sync_session.get_bind().dialect.name == "postgresql":
+                count = await self._estimate_postgres_count(session)
+            if count is None:
+                count = await session.scalar(
+                    select(func.count())
+                    .select_from(self.statement.order_by(None).subquery())
+                )
+
+        self._count = int(count or 0)
+        self._count_expires_at = now + self.count_ttl
+        return self._count
+
+    def prefetch(
+        self,
+        after: Optional[Cursor],
+        limit: int,
+    ) -> None:
+        key = self._prefetch_key(after, limit)
+        if key in self._prefetched:
+            return
+
+        task = asyncio.create_task(self._load_page(after, limit))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_done)
+        self._prefetched[key] = task
+
+    def _prefetch_done(self, task: asyncio.Task) -> None:
+        self._prefetch_tasks.discard(task)
+        # pages dropped from the cache are never awaited
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(
+                "Prefetched page load failed",
+                exc_info=task.exception()
+            )
+
+    def _prefetch_key(
+        self,
+        after: Optional[Cursor],
+        limit: int
+    ) -> PrefetchKey:
+        return (tuple(after) if after is not None else None, limit)
+
+    async def _load_page(
+        self,
+        after: Optional[Cursor],
+        limit: int,
+    ) -> KeysetPage[ItemT]:
+        statement = self.statement.add_columns(*self.key_columns)
+        if after is not None:
+            if len(self.key_columns) == 1:
+                statement = statement.where(self.key_columns[0] > after[0])
+            else:
+                statement = statement.where(
+                    tuple_(*self.key_columns) > tuple_(*after)
+                )
+        statement = statement.order_by(*self.key_columns).limit(limit + 1)
+
+        return await self._execute_page(statement, limit)
+
+    async def _execute_page(
+        self,
+        statement: Select,
+        limit: int,
+    ) -> KeysetPage[ItemT]:
+        async with self.session_factory() as session:
+            rows = (await session.execute(statement)).all()
+
+        keys_count = len(self.key_columns)
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+
+        items = [
+            row[0] if self.scalars else tuple(row[:-keys_count])
+            for row in rows
+        ]
+        next_cursor = None
+        if has_next and rows:
+            next_cursor = list(rows[-1][-keys_count:])
+
+        return KeysetPage(items=items, next_cursor=next_cursor)
+
+    async def _estimate_postgres_count(
+        self,
+        session: AsyncSession,
+    ) -> Optional[int]:
+        # planner estimate is good enough for page count and is O(1)
+        try:
+            compiled = self.statement.order_by(None).compile(
+                bind=session.sync_session.get_bind(),
+                compile_kwargs={"literal_binds": True}
+            )
+            async with session.begin_nested():
+                plan = await session.scalar(
+                    text(f"EXPLAIN (FORMAT JSON) {compiled}")
+                )
+        except Exception:
+            logger.debug("Failed to estimate count from query plan")
+            return None
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -60,6 +60,38 @@ class RedisConfig(BaseDBConfig):
         return f"redis://{self.host}:{self.port}/{self.db}"
 
 
+class QueryCacheBackendType(str, Enum):
+    MEMORY = "memory"
+    REDIS = "redis"
+
+
+@dataclass(frozen=True)
+class QueryCacheConfig:
+    backend: QueryCacheBackendType = QueryCacheBackendType.MEMORY
+    ttl: float = 60.0
+    max_size: int = 1024
+    redis: Optional[RedisConfig] = None
+
+
+class StorageSerializerType(str, Enum):
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
+@dataclass(frozen=True)
+class StorageSerializerConfig:
+    type: StorageSerializerType = StorageSerializerType.MSGPACK
+    compress_threshold: int = 1024
+    compress_level: int = 6
+
+
+@dataclass(frozen=True)
+class StorageSweeperConfig:
+    interval: float = 3600.0
+    batch_size: int = 500
+    min_idle: int = 3600
+
+
 class StorageType(str, Enum):
     MEMORY = "memory"
     REDIS = "redis"
@@ -81,3 +113,7 @@ class MemoryStorageConfig(BaseStorageConfig):
 class DBStorageConfig(BaseStorageConfig):
     type: StorageType
     config: BaseDBConfig
+    serializer: StorageSerializerConfig = StorageSerializerConfig()
+    state_ttl: Optional[int] = None
+    data_ttl: Optional[int] = None
+    sweeper: Optional[StorageSweeperConfig] = None
@@ -0,0 +1,421 @@
+import copy
+import hashlib
+import pickle
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from typing import TYPE_CHECKING, Any, Final, Iterable, Optional, Protocol
+
+from sqlalchemy import Table, event, inspect
+from sqlalchemy.engine import Dialect, Result
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+from sqlalchemy.orm.base import instance_state
+from sqlalchemy.orm.exc import NO_STATE
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.util import find_tables
+from sqlalchemy.util import await_only
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+MISSING: Final = object()
+
+WRITTEN_TABLES_KEY = "query_cache_written_tables"
+QUERY_CACHE_KEY = "query_cache"
+
+Generation = tuple[int, ...]
+
+
+class QueryCacheBackend(Protocol):
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def generation(self, tags: Iterable[str]) -> Generation:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str],
+        ttl: float,
+        generation: Generation
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def close(self) -> None:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class _MemoryEntry:
+    value: Any
+    expires_at: float
+    tags: frozenset[str]
+
+
+class MemoryQueryCacheBackend(QueryCacheBackend):
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, _MemoryEntry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._generations: dict[str, int] = {}
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+
+        if entry.expires_at <= time.monotonic():
+            self._discard(key)
+            return MISSING
+
+        self._entries.move_to_end(key)
+        # callers get their own copy, changing it never reaches the cache
+        return copy.deepcopy(entry.value)
+
+    async def generation(self, tags: Iterable[str]) -> Generation:
+        return tuple(self._generations.get(tag, 0) for tag in sorted(tags))
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str],
+        ttl: float,
+        generation: Generation
+    ) -> None:
+        tags = frozenset(tags)
+        # a read that started before an invalidation holds old rows
+        if await self.generation(tags) != generation:
+            return
+
+        self._discard(key)
+
+        entry = _MemoryEntry(
+            value=copy.deepcopy(value),
+            expires_at=time.monotonic() + ttl,
+            tags=tags
+        )
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in self._tags.pop(tag, ()):
+                self._discard(key)
+
+    async def close(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._generations.clear()
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+class RedisQueryCacheBackend(QueryCacheBackend):
+    # LRU eviction is delegated to redis itself, the server is expected
+    # to run with an `allkeys-lru` or `volatile-lru` maxmemory policy.
+    def __init__(self, redis: "Redis", prefix: str = "query_cache"):
+        self.redis = redis
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(
+        cls,
+        url: str,
+        prefix: str = "query_cache"
+    ) -> "RedisQueryCacheBackend":
+        from redis.asyncio import Redis
+
+        return cls(redis=Redis.from_url(url), prefix=prefix)
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def _generation_key(self, tag: str) -> str:
+        return f"{self.prefix}:generation:{tag}"
+
+    async def get(self, key: str) -> Any:
+        raw = await self.redis.get(self._entry_key(key))
+        if raw is None:
+            return MISSING
+        return pickle.loads(raw)
+
+    async def generation(self, tags: Iterable[str]) -> Generation:
+        tags = sorted(tags)
+        if not tags:
+            return ()
+        values = await self.redis.mget(
+            [self._generation_key(tag) for tag in tags]
+        )
+        return tuple(int(value or 0) for value in values)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str],
+        ttl: float,
+        generation: Generation
+    ) -> None:
+        from redis.exceptions import WatchError
+
+        tags = sorted(tags)
+        ttl_ms = max(1, int(ttl * 1000))
+        entry_key = self._entry_key(key)
+        generation_keys = [self._generation_key(tag) for tag in tags]
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # the entry is written only if no tag was invalidated since
+            # the read began, an invalidation in between aborts the write
+            if generation_keys:
+                await pipe.watch(*generation_keys)
+                values = await pipe.mget(generation_keys)
+                if tuple(int(value or 0) for value in values) != generation:
+                    return
+
+            pipe.multi()
+            pipe.set(entry_key, pickle.dumps(value), px=ttl_ms)
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, entry_key)
+                # tag set has to outlive the longest entry it points to
+                pipe.pexpire(tag_key, ttl_ms, nx=True)
+                pipe.pexpire(tag_key, ttl_ms, gt=True)
+            try:
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            # bumped first, reads in flight can no longer store old rows
+            await self.redis.incr(self._generation_key(tag))
+            tag_key = self._tag_key(tag)
+            entry_keys = await self.redis.smembers(tag_key)
+            await self.redis.delete(tag_key, *entry_keys)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def is_mapped_instance(value: Any) -> bool:
+    try:
+        instance_state(value)
+    except NO_STATE:
+        return False
+    return True
+
+
+def get_plain_rows(result: Result[Any], kind: str) -> list[Any]:
+    # rows are cached as plain data, ORM instances belong to one session
+    # and cannot be shared between callers or stored in redis
+    if kind == "scalars":
+        rows = list(result.scalars().all())
+        values: Iterable[Any] = rows
+    else:
+        rows = [dict(row) for row in result.mappings().all()]
+        values = chain.from_iterable(row.values() for row in rows)
+
+    if any(is_mapped_instance(value) for value in values):
+        raise TypeError(
+            "query cache stores plain row data, select columns instead "
+            "of ORM entities"
+        )
+    return rows
+
+
+def get_statement_tags(statement: Executable) -> set[str]:
+    return {
+        table.fullname
+        for table in find_tables(
+            statement,
+            check_columns=True,
+            include_crud=True
+        )
+        if isinstance(table, Table)
+    }
+
+
+class QueryCache:
+    def __init__(
+        self,
+        backend: QueryCacheBackend,
+        default_ttl: float = 60.0,
+    ):
+        self.backend = backend
+        self.default_ttl = default_ttl
+
+    def make_key(
+        self,
+        statement: Executable,
+        dialect: Dialect,
+        kind: str
+    ) -> str:
+        compiled = statement.compile(dialect=dialect)
+        params = sorted(compiled.params.items())
+        payload = repr((kind, dialect.name, str(compiled), params))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def all(
+        self,
+        session: AsyncSession,
+        statement: Executable,
+        ttl: Optional[float] = None
+    ) -> list[Any]:
+        # rows come back as dicts of column values
+        return await self._fetch(session, statement, "all", ttl)
+
+    async def scalars(
+        self,
+        session: AsyncSession,
+        statement: Executable,
+        ttl: Optional[float] = None
+    ) -> list[Any]:
+        return await self._fetch(session, statement, "scalars", ttl)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        if tags:
+            await self.backend.invalidate_tags(tags)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    async def _fetch(
+        self,
+        session: AsyncSession,
+        statement: Executable,
+        kind: str,
+        ttl: Optional[float]
+    ) -> list[Any]:
+        tags = get_statement_tags(statement)
+        result: Result[Any]
+
+        # a session sees its own uncommitted writes, cached rows do not
+        if tags & get_session_written_tables(session):
+            result = await session.execute(statement)
+            return get_plain_rows(result, kind)
+
+        dialect = session.sync_session.get_bind().dialect
+        key = self.make_key(statement, dialect, kind)
+
+        value = await self.backend.get(key)
+        if value is not MISSING:
+            return value
+
+        generation = await self.backend.generation(tags)
+        result = await session.execute(statement)
+        value = get_plain_rows(result, kind)
+
+        await self.backend.set(
+            key,
+            value,
+            tags=tags,
+            ttl=self.default_ttl if ttl is None else ttl,
+            generation=generation
+        )
+
+        return value
+
+
+class QueryCacheSession(Session):
+    pass
+
+
+def add_written_tables(session: AsyncSession, *tables: Table) -> None:
+    _get_written_tables(session.sync_session).update(
+        table.fullname for table in tables
+    )
+
+
+def get_session_written_tables(session: AsyncSession) -> set[str]:
+    # flushed writes are tracked on flush, pending ones are not flushed yet
+    sync_session = session.sync_session
+    return (
+        set(sync_session.info.get(WRITTEN_TABLES_KEY, ()))
+        | _get_pending_tables(sync_session)
+    )
+
+
+def _get_pending_tables(session: Session) -> set[str]:
+    return {
+        table.fullname
+        for obj in chain(session.new, session.dirty, session.deleted)
+        for table in inspect(obj).mapper.tables
+    }
+
+
+def _get_written_tables(session: Session) -> set[str]:
+    return session.info.setdefault(WRITTEN_TABLES_KEY, set())
+
+
+@event.listens_for(QueryCacheSession, "after_flush")
+def _track_flushed_tables(
+    session: Session,
+    flush_context: UOWTransaction
+) -> None:
+    _get_written_tables(session).update(_get_pending_tables(session))
+
+
+@event.listens_for(QueryCacheSession, "do_orm_execute")
+def _track_executed_tables(orm_execute_state: ORMExecuteState) -> None:
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+
+    _get_written_tables(orm_execute_state.session).update(
+        get_statement_tags(orm_execute_state.statement)
+    )
+
+
+@event.listens_for(QueryCacheSession, "after_commit")
+def _invalidate_written_tables(session: Session) -> None:
+    tables = session.info.pop(WRITTEN_TABLES_KEY, None)
+    query_cache = session.info.get(QUERY_CACHE_KEY)
+    if not tables or query_cache is None:
+        return
+
+    # the async session commits inside a greenlet, so the invalidation is
+    # awaited before its commit returns, whoever commits the session
+    await_only(query_cache.invalidate_tags(tables))
+
+
+@event.listens_for(QueryCacheSession, "after_rollback")
+def _discard_written_tables(session: Session) -> None:
+    session.info.pop(WRITTEN_TABLES_KEY, None)
@@ -0,0 +1,66 @@
+import logging
+from typing import Any, Optional
+
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.redis import KeyBuilder, RedisStorage
+from redis.asyncio import Redis
+
+from hueta_bot.infrastructure.persistence.storage_serializer import (
+    StorageSerializer
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class SerializingRedisStorage(RedisStorage):
+    # RedisStorage decodes values as utf-8 before json_loads,
+    # so binary payloads need their own get_data/set_data
+    def __init__(
+        self,
+        redis: Redis,
+        serializer: StorageSerializer,
+        key_builder: Optional[KeyBuilder] = None,
+        **kwargs: Any
+    ) -> None:
+        super().__init__(redis=redis, key_builder=key_builder, **kwargs)
+        self.serializer = serializer
+
+    async def set_data(
+        self,
+        key: StorageKey,
+        data: dict[str, Any],
+    ) -> None:
+        redis_key = self.key_builder.build(key, "data")
+        if not data:
+            await self.redis.delete(redis_key)
+            return
+        await self.redis.set(
+            redis_key,
+            self.serializer.dumps(data),
+            ex=self.data_ttl
+        )
+
+    async def get_data(
+        self,
+        key: StorageKey,
+    ) -> dict[str, Any]:
+        redis_key = self.key_builder.build(key, "data")
+        value = await self.redis.get(redis_key)
+        if value is None:
+            return {}
+        return self.serializer.loads(value)
+
+    async def close(self) -> None:
+        stats = self.serializer.stats()
+        logger.info(
+            "Storage serializer: %d writes, %d bytes written, "
+            "%d compressed, %d legacy reads, ~%d bytes saved (%.1f%%)",
+            stats.writes,
+            stats.bytes_written,
+            stats.compressed_writes,
+            stats.legacy_reads,
+            stats.bytes_saved,
+            stats.saved_ratio * 100
+        )
+        await super().close()
@@ -0,0 +1,116 @@
+import zlib
+from dataclasses import dataclass
+from typing import Any, Final
+
+import msgpack
+
+from hueta_bot.infrastructure.persistence.persistence_config import (
+    StorageSerializerType
+)
+from hueta_bot.infrastructure.runtime.json_codec import (
+    STDLIB_JSON_CODEC,
+    JsonCodec
+)
+
+
+# first byte of a stored value, json objects always start with "{"
+MSGPACK_HEADER: Final = b"\x01"
+MSGPACK_ZLIB_HEADER: Final = b"\x02"
+
+
+@dataclass(frozen=True)
+class StorageSerializerStats:
+    writes: int
+    bytes_written: int
+    compressed_writes: int
+    legacy_reads: int
+    sampled_json_bytes: int
+    sampled_bytes: int
+
+    @property
+    def saved_ratio(self) -> float:
+        if not self.sampled_json_bytes:
+            return 0.0
+        return 1 - self.sampled_bytes / self.sampled_json_bytes
+
+    @property
+    def bytes_saved(self) -> int:
+        # extrapolated from the sampled writes
+        if not self.sampled_bytes:
+            return 0
+        ratio = self.sampled_json_bytes / self.sampled_bytes
+        return int(self.bytes_written * ratio) - self.bytes_written
+
+
+class StorageSerializer:
+    def __init__(
+        self,
+        type: StorageSerializerType = StorageSerializerType.MSGPACK,
+        compress_threshold: int = 1024,
+        compress_level: int = 6,
+        sample_rate: int = 100,
+        json_codec: JsonCodec = STDLIB_JSON_CODEC,
+    ) -> None:
+        self.type = type
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.sample_rate = sample_rate
+        self.json_codec = json_codec
+
+        self._writes = 0
+        self._bytes_written = 0
+        self._compressed_writes = 0
+        self._legacy_reads = 0
+        self._sampled_json_bytes = 0
+        self._sampled_bytes = 0
+
+    def dumps(self, data: dict[str, Any]) -> bytes:
+        if self.type == StorageSerializerType.JSON:
+            value = self.json_codec.dumps_bytes(data)
+        else:
+            value = self._dump_msgpack(data)
+
+        self._writes += 1
+        self._bytes_written += len(value)
+        if self.sample_rate > 0 and (self._writes - 1) % self.sample_rate == 0:
+            self._sampled_json_bytes += len(
+                self.json_codec.dumps_bytes(data)
+            )
+            self._sampled_bytes += len(value)
+        return value
+
+    def loads(self, value: bytes | str) -> dict[str, Any]:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+
+        header = value[:1]
+        if header == MSGPACK_HEADER:
+            return self._load_msgpack(value[1:])
+        elif header == MSGPACK_ZLIB_HEADER:
+            return self._load_msgpack(zlib.decompress(value[1:]))
+
+        # values written before the serializer was switched
+        self._legacy_reads += 1
+        return self.json_codec.loads(value)
+
+    def stats(self) -> StorageSerializerStats:
+        return StorageSerializerStats(
+            writes=self._writes,
+            bytes_written=self._bytes_written,
+            compressed_writes=self._compressed_writes,
+            legacy_reads=self._legacy_reads,
+            sampled_json_bytes=self._sampled_json_bytes,
+            sampled_bytes=self._sampled_bytes
+        )
+
+    def _dump_msgpack(self, data: dict[str, Any]) -> bytes:
+        packed = msgpack.packb(data, use_bin_type=True)
+        if 0 <= self.compress_threshold <= len(packed):
+            compressed = zlib.compress(packed, self.compress_level)
+            if len(compressed) < len(packed):
+                self._compressed_writes += 1
+                return MSGPACK_ZLIB_HEADER + compressed
+        return MSGPACK_HEADER + packed
+
+    def _load_msgpack(self, value: bytes) -> dict[str, Any]:
+        return msgpack.unpackb(value, raw=False, strict_map_key=False)
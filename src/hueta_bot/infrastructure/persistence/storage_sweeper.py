@@ -0,0 +1,222 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from hueta_bot.infrastructure.persistence.redis_storage import (
+    SerializingRedisStorage
+)
+
+
+logger = logging.getLogger(__name__)
+
+STACK_DESTINY = "aiogd:stack:"
+CONTEXT_DESTINY = "aiogd:context:"
+
+
+@dataclass
+class SweepResult:
+    scanned: int = 0
+    expired: int = 0
+    removed_stacks: int = 0
+    removed_contexts: int = 0
+
+
+SweepBatch = Callable[
+    [dict[bytes, dict[str, Any]], SweepResult],
+    Awaitable[None]
+]
+
+
+class DialogStorageSweeper:
+    def __init__(
+        self,
+        storage: SerializingRedisStorage,
+        interval: float = 3600.0,
+        batch_size: int = 500,
+        min_idle: int = 3600,
+    ) -> None:
+        self.storage = storage
+        self.redis = storage.redis
+        self.interval = interval
+        self.batch_size = batch_size
+        # keys touched recently may belong to a request still in flight
+        self.min_idle = min_idle
+        self.separator = getattr(storage.key_builder, "separator", ":")
+        self.prefix = getattr(storage.key_builder, "prefix", "fsm")
+
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def sweep(self) -> SweepResult:
+        result = SweepResult()
+        await self._sweep_keys(STACK_DESTINY, self._sweep_stacks, result)
+        await self._sweep_keys(CONTEXT_DESTINY, self._sweep_contexts, result)
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                result = await self.sweep()
+            except Exception:
+                logger.exception("Dialog storage sweep failed")
+                continue
+            logger.info(
+                "Dialog storage sweep: %d keys scanned, %d expiries set, "
+                "%d stacks and %d contexts removed",
+                result.scanned,
+                result.expired,
+                result.removed_stacks,
+                result.removed_contexts
+            )
+
+    async def _sweep_keys(
+        self,
+        destiny: str,
+        sweep_batch: SweepBatch,
+        result: SweepResult,
+    ) -> None:
+        pattern = self.separator.join(
+            (self.prefix, "*", f"{destiny}*", "data")
+        )
+        batch: list[bytes] = []
+        async for key in self.redis.scan_iter(
+            match=pattern,
+            count=self.batch_size
+        ):
+            batch.append(key)
+            if len(batch) >= self.batch_size:
+                await self._sweep_batch(batch, sweep_batch, result)
+                batch = []
+        if batch:
+            await self._sweep_batch(batch, sweep_batch, result)
+
+    async def _sweep_batch(
+        self,
+        keys: list[bytes],
+        sweep_batch: SweepBatch,
+        result: SweepResult,
+    ) -> None:
+        result.scanned += len(keys)
+
+        # reading a key resets its idle time, so check it before GET
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.object("idletime", key)
+                if self.storage.data_ttl is not None:
+                    pipe.expire(key, self.storage.data_ttl, nx=True)
+            replies = await pipe.execute(raise_on_error=False)
+
+        step = 2 if self.storage.data_ttl is not None else 1
+        idle_keys = []
+        for key, index in zip(keys, range(0, len(replies), step)):
+            idle_time = replies[index]
+            if step == 2 and replies[index + 1] is True:
+                result.expired += 1
+            if isinstance(idle_time, int) and idle_time >= self.min_idle:
+                idle_keys.append(key)
+        if not idle_keys:
+            return
+
+        values = await self.redis.mget(idle_keys)
+        idle_data: dict[bytes, dict[str, Any]] = {}
+        for key, value in zip(idle_keys, values):
+            if value is None:
+                continue
+            try:
+                idle_data[key] = self.storage.serializer.loads(value)
+            except Exception:
+                logger.warning("Failed to decode dialog storage key %r", key)
+
+        if idle_data:
+            await sweep_batch(idle_data, result)
+
+    def _key_prefix(self, key: bytes, destiny: str) -> str:
+        return key.decode("utf-8").rpartition(self.separator + destiny)[0]
+
+    def _key_id(self, key: bytes, destiny: str) -> str:
+        suffix = key.decode("utf-8").rpartition(destiny)[2]
+        return suffix[:-len(self.separator + "data")]
+
+    def _build_key(self, prefix: str, destiny: str, id: str) -> str:
+        return self.separator.join((prefix, f"{destiny}{id}", "data"))
+
+    async def _sweep_stacks(
+        self,
+        stacks: dict[bytes, dict[str, Any]],
+        result: SweepResult,
+    ) -> None:
+        # a stack is orphaned when none of its intents has a context left
+        checked: list[tuple[bytes, list[str]]] = []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, data in stacks.items():
+                intents = data.get("intents") or []
+                if not intents:
+                    continue
+                prefix = self._key_prefix(key, STACK_DESTINY)
+                context_keys = [
+                    self._build_key(prefix, CONTEXT_DESTINY, intent_id)
+                    for intent_id in intents
+                ]
+                pipe.exists(*context_keys)
+                checked.append((key, context_keys))
+            replies = await pipe.execute()
+
+        orphaned = [
+            key for (key, _), exists in zip(checked, replies)
+            if not exists
+        ]
+        if orphaned:
+            await self.redis.unlink(*orphaned)
+            result.removed_stacks += len(orphaned)
+
+    async def _sweep_contexts(
+        self,
+        contexts: dict[bytes, dict[str, Any]],
+        result: SweepResult,
+    ) -> None:
+        # a context is orphaned when its stack no longer references it
+        stack_keys: list[tuple[bytes, str, str]] = []
+        for key, data in contexts.items():
+            prefix = self._key_prefix(key, CONTEXT_DESTINY)
+            stack_id = data.get("_stack_id", "")
+            stack_keys.append((
+                key,
+                self._key_id(key, CONTEXT_DESTINY),
+                self._build_key(prefix, STACK_DESTINY, stack_id)
+            ))
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for _, _, stack_key in stack_keys:
+                pipe.get(stack_key)
+            replies = await pipe.execute()
+
+        orphaned = []
+        for (key, intent_id, _), value in zip(stack_keys, replies):
+            if value is None:
+                orphaned.append(key)
+                continue
+            try:
+                intents = self.storage.serializer.loads(value).get("intents")
+            except Exception:
+                continue
+            if intent_id not in (intents or []):
+                orphaned.append(key)
+
+        if orphaned:
+            await self.redis.unlink(*orphaned)
+            result.removed_contexts += len(orphaned)
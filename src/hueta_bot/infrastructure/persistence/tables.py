@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from enum import Enum
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    UniqueConstraint
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+metadata = MetaData()
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+
+
+# datetimes are stored as naive UTC, sqlite drops the timezone anyway
+scheduled_jobs_table = Table(
+    "scheduled_jobs",
+    metadata,
+    Column("id", String(36), primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("payload", JSON, nullable=False),
+    Column("run_at", DateTime, nullable=False),
+    Column("status", String(16), nullable=False, default=JobStatus.PENDING.value),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("locked_until", DateTime, nullable=True),
+    # set by the runner that claimed the job, tells apart its own claims
+    Column("claim_token", String(32), nullable=True),
+    Index("ix_scheduled_jobs_status_run_at", "status", "run_at"),
+)
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+outbox_messages_table = Table(
+    "outbox_messages",
+    metadata,
+    Column("id", String(36), primary_key=True),
+    Column("dedupe_key", String(255), nullable=False),
+    Column("chat_id", String(64), nullable=True),
+    Column("bot_id", BigInteger, nullable=False),
+    Column("method", String(64), nullable=False),
+    Column("payload", JSON, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("available_at", DateTime, nullable=False),
+    Column(
+        "status",
+        String(16),
+        nullable=False,
+        default=OutboxStatus.PENDING.value
+    ),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("locked_until", DateTime, nullable=True),
+    Column("claim_token", String(32), nullable=True),
+    Column("sent_at", DateTime, nullable=True),
+    UniqueConstraint("dedupe_key", name="uq_outbox_messages_dedupe_key"),
+    Index("ix_outbox_messages_status_available_at", "status", "available_at"),
+)
+
+
+# file ids are valid for the bot that uploaded the file only
+media_files_table = Table(
+    "media_files",
+    metadata,
+    Column("bot_id", BigInteger, primary_key=True),
+    Column("kind", String(32), primary_key=True),
+    Column("content_hash", String(64), primary_key=True),
+    Column("file_id", String(255), nullable=False),
+    Column("file_unique_id", String(255), nullable=False),
+    Column("size", BigInteger, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+
+
+async def create_tables(engine: AsyncEngine) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(metadata.create_all, checkfirst=True)
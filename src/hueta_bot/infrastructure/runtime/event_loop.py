@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+from hueta_bot.infrastructure.runtime.runtime_config import EventLoopType
+
+
+logger = logging.getLogger(__name__)
+
+ResultT = TypeVar("ResultT")
+
+
+def get_loop_factory(
+    type: EventLoopType = EventLoopType.AUTO
+) -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    if type == EventLoopType.ASYNCIO:
+        return None
+
+    try:
+        import uvloop
+    except ImportError:
+        # uvloop does not support windows, pypy has no wheels
+        if type == EventLoopType.UVLOOP:
+            logger.warning("uvloop is not available, using asyncio loop")
+        return None
+
+    return uvloop.new_event_loop
+
+
+def run(
+    main: Coroutine[Any, Any, ResultT],
+    type: EventLoopType = EventLoopType.AUTO,
+) -> ResultT:
+    with asyncio.Runner(loop_factory=get_loop_factory(type)) as runner:
+        return runner.run(main)
@@ -0,0 +1,78 @@
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from hueta_bot.infrastructure.runtime.runtime_config import JsonCodecType
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    type: JsonCodecType
+    dumps: Callable[[Any], str]
+    dumps_bytes: Callable[[Any], bytes]
+    loads: Callable[[str | bytes], Any]
+
+
+def _stdlib_dumps_bytes(data: Any) -> bytes:
+    return json.dumps(data).encode("utf-8")
+
+
+STDLIB_JSON_CODEC = JsonCodec(
+    type=JsonCodecType.STDLIB,
+    dumps=json.dumps,
+    dumps_bytes=_stdlib_dumps_bytes,
+    loads=json.loads
+)
+
+
+def _make_orjson_codec() -> JsonCodec:
+    import orjson
+
+    # stdlib json turns int keys into strings, orjson refuses them by default
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(data: Any) -> bytes:
+        try:
+            return orjson.dumps(data, option=options)
+        except TypeError:
+            # integers over 64 bits and other values orjson does not support
+            return _stdlib_dumps_bytes(data)
+
+    def dumps(data: Any) -> str:
+        return dumps_bytes(data).decode("utf-8")
+
+    return JsonCodec(
+        type=JsonCodecType.ORJSON,
+        dumps=dumps,
+        dumps_bytes=dumps_bytes,
+        loads=orjson.loads
+    )
+
+
+def make_json_codec(type: JsonCodecType = JsonCodecType.AUTO) -> JsonCodec:
+    if type == JsonCodecType.STDLIB:
+        return STDLIB_JSON_CODEC
+
+    try:
+        return _make_orjson_codec()
+    except ImportError:
+        if type == JsonCodecType.ORJSON:
+            logger.warning("orjson is not installed, using stdlib json")
+        return STDLIB_JSON_CODEC
+
+
+_json_codec = STDLIB_JSON_CODEC
+
+
+def get_json_codec() -> JsonCodec:
+    return _json_codec
+
+
+def set_json_codec(codec: JsonCodec) -> None:
+    # for code built outside of main(), like logging formatters
+    global _json_codec
+    _json_codec = codec
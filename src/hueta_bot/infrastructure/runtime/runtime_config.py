@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from enum import Enum
+
+
+class EventLoopType(str, Enum):
+    AUTO = "auto"
+    ASYNCIO = "asyncio"
+    UVLOOP = "uvloop"
+
+
+class JsonCodecType(str, Enum):
+    AUTO = "auto"
+    STDLIB = "stdlib"
+    ORJSON = "orjson"
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    event_loop: EventLoopType = EventLoopType.AUTO
+    json: JsonCodecType = JsonCodecType.AUTO
@@ -0,0 +1,392 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Any, NamedTuple, Optional
+from uuid import uuid4
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from hueta_bot.application.ports.scheduler.job_scheduler import (
+    JobHandler,
+    ScheduledJob
+)
+from hueta_bot.infrastructure.persistence.tables import (
+    JobStatus,
+    scheduled_jobs_table,
+    utcnow
+)
+
+
+logger = logging.getLogger(__name__)
+
+SKIP_LOCKED_DIALECTS = frozenset({"postgresql", "mysql", "mariadb"})
+
+SCHEDULED_JOBS_KEY = "scheduler_scheduled_jobs"
+
+
+class JobRegistry:
+    def __init__(self) -> None:
+        self._handlers: dict[str, JobHandler] = {}
+
+    def register(self, name: str, handler: JobHandler) -> None:
+        if name in self._handlers:
+            raise ValueError(f"Job handler {name!r} is already registered")
+        self._handlers[name] = handler
+
+    def get(self, name: str) -> Optional[JobHandler]:
+        return self._handlers.get(name)
+
+
+class ClaimedJob(NamedTuple):
+    job: ScheduledJob
+    # rows are updated only while they still carry the token of the claim
+    claim_token: str
+
+
+class JobRunner:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        registry: JobRegistry,
+        workers: int = 8,
+        batch_size: int = 100,
+        poll_interval: float = 5.0,
+        horizon: float = 60.0,
+        heap_size: int = 10000,
+        lease_timeout: float = 300.0,
+        max_attempts: int = 5,
+        retry_delay: float = 30.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.registry = registry
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.horizon = horizon
+        self.heap_size = heap_size
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        # only timers due within the horizon are kept in memory,
+        # the table is the source of truth and is claimed in batches
+        self._heap: list[tuple[datetime, str]] = []
+        self._refill_at = datetime.min
+        self._wakeup = asyncio.Event()
+        # jobs are claimed for idle workers only, a lease starts running
+        # when a worker picks the job up, not while it waits in a queue
+        self._idle_workers = workers
+        self._queue: asyncio.Queue[ClaimedJob] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._dialect_name: Optional[str] = None
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._idle_workers = self.workers
+        self._tasks = [
+            asyncio.create_task(self._work())
+            for _ in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._run()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def reconfigure(
+        self,
+        poll_interval: float,
+        horizon: float,
+        heap_size: int,
+        lease_timeout: float,
+        max_attempts: int,
+        retry_delay: float,
+    ) -> None:
+        # workers and batch_size need a restart
+        self.poll_interval = poll_interval
+        self.horizon = horizon
+        self.heap_size = heap_size
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._refill_at = datetime.min
+        self._wakeup.set()
+
+    def notify_committed(self, session: Session, *args: Any) -> None:
+        # session after_commit event, the jobs are visible to claims now
+        for job_id, run_at in session.info.pop(SCHEDULED_JOBS_KEY, ()):
+            self.notify(job_id, run_at)
+
+    def discard_rolled_back(self, session: Session, *args: Any) -> None:
+        session.info.pop(SCHEDULED_JOBS_KEY, None)
+
+    def notify(self, job_id: str, run_at: datetime) -> None:
+        if run_at - utcnow() > timedelta(seconds=self.horizon):
+            return
+        if len(self._heap) >= self.heap_size:
+            return
+        heapq.heappush(self._heap, (run_at, job_id))
+        if self._heap[0][1] == job_id:
+            self._wakeup.set()
+
+    async def recover(self) -> int:
+        # running jobs with an expired lease belong to a dead worker
+        table = scheduled_jobs_table
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(table)
+                .where(
+                    table.c.status == JobStatus.RUNNING.value,
+                    table.c.locked_until < utcnow()
+                )
+                .values(
+                    status=JobStatus.PENDING.value,
+                    locked_until=None,
+                    claim_token=None
+                )
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.warning("Recovered %d abandoned jobs", result.rowcount)
+        return result.rowcount
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Scheduler tick failed")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _tick(self) -> None:
+        # cleared before the claim, a notify during it wakes the next wait
+        self._wakeup.clear()
+        now = utcnow()
+        if now >= self._refill_at:
+            await self.recover()
+            await self._refill(now)
+
+        while self._heap and self._heap[0][0] <= now:
+            heapq.heappop(self._heap)
+
+        # missed jobs are due as well, so claim by time, not by heap entry
+        claimed = await self._claim(now)
+        self._idle_workers -= len(claimed)
+        for claimed_job in claimed:
+            self._queue.put_nowait(claimed_job)
+
+        if claimed and self._idle_workers > 0:
+            return
+        await self._wait(now)
+
+    async def _wait(self, now: datetime) -> None:
+        timeout = (self._refill_at - now).total_seconds()
+        if self._heap:
+            timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+        try:
+            await asyncio.wait_for(
+                self._wakeup.wait(),
+                max(0.0, min(timeout, self.poll_interval))
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    async def _refill(self, now: datetime) -> None:
+        table = scheduled_jobs_table
+        async with self.session_factory() as session:
+            rows = (await session.execute(
+                select(table.c.run_at, table.c.id)
+                .where(
+                    table.c.status == JobStatus.PENDING.value,
+                    table.c.run_at <= now + timedelta(seconds=self.horizon)
+                )
+                .order_by(table.c.run_at)
+                .limit(self.heap_size)
+            )).all()
+
+        self._heap = [(run_at, job_id) for run_at, job_id in rows]
+        heapq.heapify(self._heap)
+        self._refill_at = now + timedelta(seconds=self.horizon)
+
+    async def _claim(self, now: datetime) -> list[ClaimedJob]:
+        limit = min(self.batch_size, self._idle_workers)
+        if limit <= 0:
+            return []
+
+        table = scheduled_jobs_table
+        async with self.session_factory() as session:
+            async with session.begin():
+                statement = (
+                    select(table)
+                    .where(
+                        table.c.status == JobStatus.PENDING.value,
+                        table.c.run_at <= now
+                    )
+                    .order_by(table.c.run_at)
+                    .limit(limit)
+                )
+                if self._get_dialect_name(session) in SKIP_LOCKED_DIALECTS:
+                    statement = statement.with_for_update(skip_locked=True)
+
+                rows = (await session.execute(statement)).mappings().all()
+                if not rows:
+                    return []
+
+                # without SKIP LOCKED another process may have selected
+                # the same rows, the status check lets one of them win and
+                # the token tells which rows this runner got
+                claim_token = uuid4().hex
+                await session.execute(
+                    update(table)
+                    .where(
+                        table.c.id.in_([row["id"] for row in rows]),
+                        table.c.status == JobStatus.PENDING.value
+                    )
+                    .values(
+                        status=JobStatus.RUNNING.value,
+                        attempts=table.c.attempts + 1,
+                        locked_until=now + timedelta(
+                            seconds=self.lease_timeout
+                        ),
+                        claim_token=claim_token
+                    )
+                )
+                rows = (await session.execute(
+                    select(table)
+                    .where(table.c.claim_token == claim_token)
+                    .order_by(table.c.run_at)
+                )).mappings().all()
+
+        return [
+            ClaimedJob(
+                ScheduledJob(
+                    id=row["id"],
+                    name=row["name"],
+                    run_at=row["run_at"],
+                    payload=row["payload"],
+                    attempts=row["attempts"]
+                ),
+                claim_token
+            )
+            for row in rows
+        ]
+
+    def _get_dialect_name(self, session: AsyncSession) -> str:
+        if self._dialect_name is None:
+            self._dialect_name = session.sync_session.get_bind().dialect.name
+        return self._dialect_name
+
+    async def _work(self) -> None:
+        while True:
+            claimed = await self._queue.get()
+            try:
+                await self._execute(claimed)
+            except Exception:
+                logger.exception("Failed to finish job %s", claimed.job.id)
+            finally:
+                self._queue.task_done()
+                self._idle_workers += 1
+                # a worker is free, more due jobs can be claimed
+                self._wakeup.set()
+
+    async def _execute(self, claimed: ClaimedJob) -> None:
+        job = claimed.job
+        handler = self.registry.get(job.name)
+        if handler is None:
+            logger.error("No handler for job %s (%s)", job.id, job.name)
+            await self._finish(claimed, JobStatus.FAILED)
+            return
+
+        locked_until = await self._start(claimed)
+        if locked_until is None:
+            logger.warning("Job %s was claimed by another runner", job.id)
+            return
+
+        # the handler has to be done before another runner may recover it
+        timeout = (locked_until - utcnow()).total_seconds()
+        try:
+            await asyncio.wait_for(handler(job), max(0.0, timeout))
+        except Exception:
+            logger.exception("Job %s (%s) failed", job.id, job.name)
+            if job.attempts >= self.max_attempts:
+                await self._finish(claimed, JobStatus.FAILED)
+            else:
+                await self._retry(claimed)
+            return
+
+        await self._finish(claimed)
+
+    async def _start(self, claimed: ClaimedJob) -> Optional[datetime]:
+        locked_until = utcnow() + timedelta(seconds=self.lease_timeout)
+        if not await self._update_claimed(
+            claimed,
+            update(scheduled_jobs_table).values(locked_until=locked_until)
+        ):
+            return None
+        return locked_until
+
+    async def _finish(
+        self,
+        claimed: ClaimedJob,
+        status: Optional[JobStatus] = None,
+    ) -> None:
+        table = scheduled_jobs_table
+        if status is None:
+            statement = delete(table)
+        else:
+            statement = update(table).values(
+                status=status.value,
+                locked_until=None,
+                claim_token=None
+            )
+        if not await self._update_claimed(claimed, statement):
+            logger.warning(
+                "Job %s was recovered before it finished",
+                claimed.job.id
+            )
+
+    async def _retry(self, claimed: ClaimedJob) -> None:
+        job = claimed.job
+        delay = self.retry_delay * 2 ** (job.attempts - 1)
+        run_at = utcnow() + timedelta(seconds=delay)
+
+        if not await self._update_claimed(
+            claimed,
+            update(scheduled_jobs_table).values(
+                status=JobStatus.PENDING.value,
+                run_at=run_at,
+                locked_until=None,
+                claim_token=None
+            )
+        ):
+            logger.warning(
+                "Job %s was recovered before it was retried",
+                job.id
+            )
+            return
+        self.notify(job.id, run_at)
+
+    async def _update_claimed(
+        self,
+        claimed: ClaimedJob,
+        statement: Any,
+    ) -> bool:
+        # a row whose lease expired may be running in another runner now
+        table = scheduled_jobs_table
+        async with self.session_factory() as session:
+            result = await session.execute(
+                statement.where(
+                    table.c.id == claimed.job.id,
+                    table.c.claim_token == claimed.claim_token
+                )
+            )
+            await session.commit()
+        return bool(result.rowcount)
@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import delete, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from hueta_bot.application.ports.scheduler.job_scheduler import (
+    JobPayload,
+    JobScheduler
+)
+from hueta_bot.infrastructure.persistence.tables import (
+    JobStatus,
+    scheduled_jobs_table
+)
+from hueta_bot.infrastructure.scheduler.job_runner import (
+    SCHEDULED_JOBS_KEY,
+    JobRunner
+)
+
+
+def to_utc(value: datetime) -> datetime:
+    # a naive datetime could be local time or utc, guessing would shift
+    # jobs by the utc offset of the server
+    if value.tzinfo is None:
+        raise ValueError("run_at must be timezone aware")
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class SQLAlchemyJobScheduler(JobScheduler):
+    # jobs are written in the request session and commit with it
+    def __init__(self, session: AsyncSession, runner: JobRunner):
+        self.session: AsyncSession = session
+        self.runner: JobRunner = runner
+
+    async def schedule(
+        self,
+        name: str,
+        run_at: datetime,
+        payload: Optional[JobPayload] = None,
+        job_id: Optional[str] = None,
+    ) -> str:
+        job_id = job_id or uuid4().hex
+        run_at = to_utc(run_at)
+
+        await self.session.execute(
+            insert(scheduled_jobs_table).values(
+                id=job_id,
+                name=name,
+                payload=payload or {},
+                run_at=run_at,
+                status=JobStatus.PENDING.value,
+                attempts=0
+            )
+        )
+        # the runner is woken up once the job is committed and visible
+        sync_session = self.session.sync_session
+        sync_session.info.setdefault(SCHEDULED_JOBS_KEY, []).append(
+            (job_id, run_at)
+        )
+        for event_name, listener in (
+            ("after_commit", self.runner.notify_committed),
+            ("after_rollback", self.runner.discard_rolled_back),
+        ):
+            if not event.contains(sync_session, event_name, listener):
+                event.listen(sync_session, event_name, listener)
+
+        return job_id
+
+    async def cancel(self, job_id: str) -> bool:
+        result = await self.session.execute(
+            delete(scheduled_jobs_table).where(
+                scheduled_jobs_table.c.id == job_id,
+                scheduled_jobs_table.c.status == JobStatus.PENDING.value
+            )
+        )
+        return result.rowcount > 0
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    enabled: bool = True
+    workers: int = 8
+    batch_size: int = 100
+    poll_interval: float = 5.0
+    horizon: float = 60.0
+    heap_size: int = 10000
+    lease_timeout: float = 300.0
+    max_attempts: int = 5
+    retry_delay: float = 30.0
@@ -1,30 +1,62 @@
-import asyncio
+from typing import TYPE_CHECKING, Optional
 
 from aiogram import Dispatcher, Bot
 from aiogram.fsm.storage.base import BaseStorage, BaseEventIsolation
 from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
-from aiogram.fsm.storage.redis import (
-    RedisStorage,
-    DefaultKeyBuilder,
-    RedisEventIsolation
-)
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.base import BaseSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
 from aiogram.enums import ParseMode
-from dishka.integrations.aiogram import setup_dishka
+from dishka import AsyncContainer
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-from hueta_bot.presentation.middlewares import setup_middlewares
+from hueta_bot.presentation.middlewares import (
+    BotMetricsRegistry,
+    setup_container,
+    setup_middlewares
+)
 from hueta_bot.presentation.handlers import setup_handlers
+from hueta_bot.presentation.dialogs.widgets import locale_data
+from hueta_bot.infrastructure.capture.update_capture import (
+    UpdateAnonymizer,
+    UpdateCapture
+)
 from hueta_bot.infrastructure.logging import setup_logging
+from hueta_bot.infrastructure.offload.executor_offloader import (
+    ExecutorOffloader
+)
+from hueta_bot.infrastructure.outbox.outbox_relay import OutboxRelay
+from hueta_bot.infrastructure.persistence.query_cache import QueryCache
+from hueta_bot.infrastructure.persistence.tables import create_tables
+from hueta_bot.infrastructure.runtime import event_loop
+from hueta_bot.infrastructure.runtime.json_codec import (
+    JsonCodec,
+    get_json_codec,
+    make_json_codec,
+    set_json_codec
+)
+from hueta_bot.infrastructure.scheduler.job_runner import JobRunner
 from hueta_bot.main.di import setup_bot_container
 from hueta_bot.main.config import (
+    get_env_var,
     load_bot_config,
     BotConfig,
     BaseStorageConfig,
     StorageType
 )
+from hueta_bot.main.config_watcher import BotConfigHolder, ConfigWatcher
 
+if TYPE_CHECKING:
+    from hueta_bot.infrastructure.persistence.storage_sweeper import (
+        DialogStorageSweeper
+    )
 
-def create_storage(storage_config: BaseStorageConfig) -> BaseStorage:
+
+def create_storage(
+    storage_config: BaseStorageConfig,
+    json_codec: JsonCodec
+) -> BaseStorage:
     if storage_config.type == StorageType.MEMORY:
         return MemoryStorage()
 
@@ -32,37 +64,119 @@ def create_storage(storage_config: BaseStorageConfig) -> BaseStorage:
         if storage_config.config is None:
             raise ValueError("you have to specify redis config for use redis storage")
 
-        return RedisStorage.from_url(
+        # redis backends are imported only when they are configured
+        from aiogram.fsm.storage.redis import DefaultKeyBuilder
+
+        from hueta_bot.infrastructure.persistence.redis_storage import (
+            SerializingRedisStorage
+        )
+        from hueta_bot.infrastructure.persistence.storage_serializer import (
+            StorageSerializer
+        )
+
+        serializer_config = storage_config.serializer
+        return SerializingRedisStorage.from_url(
             storage_config.config.url(),
             key_builder=DefaultKeyBuilder(
                 with_bot_id=True,
                 with_destiny=True
-            )
+            ),
+            state_ttl=storage_config.state_ttl,
+            data_ttl=storage_config.data_ttl,
+            serializer=StorageSerializer(
+                type=serializer_config.type,
+                compress_threshold=serializer_config.compress_threshold,
+                compress_level=serializer_config.compress_level,
+                json_codec=json_codec
+            ),
+            json_loads=json_codec.loads,
+            json_dumps=json_codec.dumps
         )
 
     else:
         raise NotImplementedError
 
 
-def create_event_isolation(
+def create_storage_sweeper(
+    storage: BaseStorage,
     storage_config: BaseStorageConfig
+) -> Optional["DialogStorageSweeper"]:
+    if storage_config.type != StorageType.REDIS:
+        return None
+
+    if storage_config.sweeper is None:
+        return None
+
+    from hueta_bot.infrastructure.persistence.storage_sweeper import (
+        DialogStorageSweeper
+    )
+
+    return DialogStorageSweeper(
+        storage=storage,
+        interval=storage_config.sweeper.interval,
+        batch_size=storage_config.sweeper.batch_size,
+        min_idle=storage_config.sweeper.min_idle
+    )
+
+
+def create_event_isolation(
+    storage_config: BaseStorageConfig,
+    storage: BaseStorage
 ) -> BaseEventIsolation:
     if storage_config.type == StorageType.MEMORY:
         return SimpleEventIsolation()
 
     elif storage_config.type == StorageType.REDIS:
-        if storage_config.config is None:
-            raise ValueError("you have to specify redis config for use redis storage")
+        from aiogram.fsm.storage.redis import RedisEventIsolation, RedisStorage
+
+        if not isinstance(storage, RedisStorage):
+            raise ValueError("redis event isolation requires redis storage")
 
-        return RedisEventIsolation.from_url(storage_config.config.url())
+        # locks go through the storage connection pool, the storage
+        # closes it, closing the isolation does nothing
+        return RedisEventIsolation(
+            redis=storage.redis,
+            key_builder=storage.key_builder
+        )
 
     else:
         raise NotImplementedError
 
 
-def create_bot(bot_config: BotConfig) -> Bot:
+def create_session(
+    bot_config: BotConfig,
+    json_codec: JsonCodec
+) -> AiohttpSession:
+    bot_api_config = bot_config.bot_api
+    api = PRODUCTION
+    if bot_api_config.base_url is not None:
+        api = TelegramAPIServer.from_base(
+            bot_api_config.base_url,
+            is_local=bot_api_config.is_local
+        )
+
+    return AiohttpSession(
+        api=api,
+        timeout=bot_api_config.timeout,
+        json_loads=json_codec.loads,
+        json_dumps=json_codec.dumps
+    )
+
+
+def create_bot(
+    token: str,
+    json_codec: JsonCodec,
+    session: Optional[BaseSession] = None
+) -> Bot:
+    if session is None:
+        session = AiohttpSession(
+            json_loads=json_codec.loads,
+            json_dumps=json_codec.dumps
+        )
+
     bot = Bot(
-        token=bot_config.bot_token,
+        token=token,
+        session=session,
         default=DefaultBotProperties(
             parse_mode=ParseMode.HTML
         )
@@ -71,14 +185,40 @@ def create_bot(bot_config: BotConfig) -> Bot:
     return bot
 
 
+def create_bots(
+    bot_config: BotConfig,
+    json_codec: JsonCodec,
+    session: Optional[BaseSession] = None
+) -> dict[str, Bot]:
+    # the token is part of the request url, so all bots share
+    # one session and its connection pool
+    if session is None:
+        session = create_session(
+            bot_config=bot_config,
+            json_codec=json_codec
+        )
+
+    return {
+        bot_token_config.name: create_bot(
+            token=bot_token_config.token,
+            json_codec=json_codec,
+            session=session
+        )
+        for bot_token_config in bot_config.bots
+    }
+
+
 def create_dispatcher(
-    bot_config: BotConfig
+    bot_config: BotConfig,
+    json_codec: JsonCodec
 ) -> Dispatcher:
     storage: BaseStorage = create_storage(
-        storage_config=bot_config.storage
+        storage_config=bot_config.storage,
+        json_codec=json_codec
     )
     event_isolation: BaseEventIsolation = create_event_isolation(
-        storage_config=bot_config.storage
+        storage_config=bot_config.storage,
+        storage=storage
     )
 
     dispatcher = Dispatcher(
@@ -86,34 +226,195 @@ def create_dispatcher(
         events_isolation=event_isolation
     )
 
+    sweeper = create_storage_sweeper(
+        storage=storage,
+        storage_config=bot_config.storage
+    )
+    if sweeper is not None:
+        dispatcher.startup.register(sweeper.start)
+        dispatcher.shutdown.register(sweeper.stop)
+
     return dispatcher
 
 
-async def main() -> None:
-    bot_config: BotConfig = load_bot_config()
+def setup_database(
+    dispatcher: Dispatcher,
+    container: AsyncContainer
+) -> None:
+    # registered before the workers that use the tables
+    async def create_database_tables() -> None:
+        await create_tables(await container.get(AsyncEngine))
+
+    dispatcher.startup.register(create_database_tables)
+
+
+def setup_scheduler(
+    dispatcher: Dispatcher,
+    container: AsyncContainer
+) -> None:
+    async def start_scheduler() -> None:
+        runner = await container.get(JobRunner)
+        runner.start()
+
+    dispatcher.startup.register(start_scheduler)
+
+
+def setup_outbox_relay(
+    dispatcher: Dispatcher,
+    container: AsyncContainer
+) -> None:
+    async def start_outbox_relay(bots: list[Bot]) -> None:
+        relay = await container.get(OutboxRelay)
+        relay.start(bots)
+
+    dispatcher.startup.register(start_outbox_relay)
+
+
+def create_update_capture(bot_config: BotConfig) -> Optional[UpdateCapture]:
+    if not bot_config.capture.enabled:
+        return None
+
+    return UpdateCapture(
+        path=bot_config.capture.path,
+        anonymizer=UpdateAnonymizer(salt=bot_config.capture.salt),
+        flush_every=bot_config.capture.flush_every
+    )
+
+
+def setup_config_watcher(
+    dispatcher: Dispatcher,
+    container: AsyncContainer,
+    config_holder: BotConfigHolder
+) -> None:
+    startup_config = config_holder.current
+    watcher = ConfigWatcher(
+        holder=config_holder,
+        paths=[
+            get_env_var("BOT_CONFIG_PATH"),
+            startup_config.logging_config_path
+        ]
+    )
+
+    async def apply_config(config: BotConfig) -> None:
+        locale_data.preload(config.locales)
+
+        query_cache = await container.get(QueryCache)
+        query_cache.default_ttl = config.query_cache.ttl
+
+        offloader = await container.get(ExecutorOffloader)
+        offloader.reconfigure(
+            thread_workers=config.offload.thread_workers,
+            process_workers=config.offload.process_workers,
+            max_pending=config.offload.max_pending,
+            queue_timeout=config.offload.queue_timeout,
+            timeout=config.offload.timeout
+        )
+
+        # background workers are started or not at startup only
+        if startup_config.scheduler.enabled:
+            runner = await container.get(JobRunner)
+            runner.reconfigure(
+                poll_interval=config.scheduler.poll_interval,
+                horizon=config.scheduler.horizon,
+                heap_size=config.scheduler.heap_size,
+                lease_timeout=config.scheduler.lease_timeout,
+                max_attempts=config.scheduler.max_attempts,
+                retry_delay=config.scheduler.retry_delay
+            )
+        if startup_config.outbox.enabled:
+            relay = await container.get(OutboxRelay)
+            relay.reconfigure(
+                poll_interval=config.outbox.poll_interval,
+                rate=config.outbox.rate,
+                chat_interval=config.outbox.chat_interval,
+                max_attempts=config.outbox.max_attempts,
+                retry_delay=config.outbox.retry_delay,
+                retention=config.outbox.retention
+            )
+
+    watcher.add_listener(apply_config)
+
+    async def start_config_watcher() -> None:
+        watcher.start()
+
+    dispatcher.startup.register(start_config_watcher)
+    dispatcher.shutdown.register(watcher.stop)
+
 
+async def main(bot_config: BotConfig) -> None:
     setup_logging(bot_config.logging_config_path)
 
-    bot = create_bot(bot_config=bot_config)
-    dispatcher = create_dispatcher(bot_config=bot_config)
+    locale_data.preload(bot_config.locales)
 
-    bot_container = setup_bot_container()
+    json_codec = get_json_codec()
+    bots = create_bots(bot_config=bot_config, json_codec=json_codec)
+    dispatcher = create_dispatcher(
+        bot_config=bot_config,
+        json_codec=json_codec
+    )
+
+    config_holder = BotConfigHolder(bot_config)
+    bot_container = setup_bot_container(config_holder=config_holder)
+
+    capture = create_update_capture(bot_config=bot_config)
+    if capture is not None:
+        dispatcher.shutdown.register(capture.close)
+
+    metrics = BotMetricsRegistry(
+        names={bot.id: name for name, bot in bots.items()}
+    )
+    dispatcher.shutdown.register(metrics.log_metrics)
 
     setup_middlewares(
-        bot=bot,
-        dispatcher=dispatcher
+        bots=list(bots.values()),
+        dispatcher=dispatcher,
+        capture=capture,
+        metrics=metrics
     )
     setup_handlers(
         dispatcher=dispatcher
     )
 
-    setup_dishka(
+    # after the handlers, their dependencies are looked up once here
+    setup_container(
         container=bot_container,
-        router=dispatcher,
-        auto_inject=True
+        router=dispatcher
+    )
+
+    setup_database(
+        dispatcher=dispatcher,
+        container=bot_container
     )
+    if bot_config.scheduler.enabled:
+        setup_scheduler(
+            dispatcher=dispatcher,
+            container=bot_container
+        )
+    if bot_config.outbox.enabled:
+        setup_outbox_relay(
+            dispatcher=dispatcher,
+            container=bot_container
+        )
+    if bot_config.reload.enabled:
+        setup_config_watcher(
+            dispatcher=dispatcher,
+            container=bot_container,
+            config_holder=config_holder
+        )
+    # closes app scoped resources: engine, caches, background workers
+    dispatcher.shutdown.register(bot_container.close)
+
+    # one polling task per bot, all of them feed the same dispatcher
+    await dispatcher.start_polling(*bots.values())
+
+
+def run() -> None:
+    # the loop is picked before it starts, so the config is loaded here
+    bot_config: BotConfig = load_bot_config()
 
-    await dispatcher.start_polling(bot)
+    set_json_codec(make_json_codec(bot_config.runtime.json))
+    event_loop.run(main(bot_config), bot_config.runtime.event_loop)
 
 
-asyncio.run(main())
+if __name__ == "__main__":
+    run()
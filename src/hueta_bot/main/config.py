@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 import os
 from pathlib import Path
+from typing import Optional
 
 import yaml
 
@@ -13,7 +14,24 @@ from hueta_bot.infrastructure.persistence.persistence_config import (
     RedisConfig,
     StorageType,
     MemoryStorageConfig,
-    DBStorageConfig
+    DBStorageConfig,
+    QueryCacheBackendType,
+    QueryCacheConfig,
+    StorageSerializerType,
+    StorageSerializerConfig,
+    StorageSweeperConfig
+)
+from hueta_bot.infrastructure.capture.capture_config import CaptureConfig
+from hueta_bot.infrastructure.media.media_config import MediaConfig
+from hueta_bot.infrastructure.offload.offload_config import OffloadConfig
+from hueta_bot.infrastructure.outbox.outbox_config import OutboxConfig
+from hueta_bot.infrastructure.runtime.runtime_config import (
+    EventLoopType,
+    JsonCodecType,
+    RuntimeConfig
+)
+from hueta_bot.infrastructure.scheduler.scheduler_config import (
+    SchedulerConfig
 )
 
 
@@ -66,6 +84,73 @@ def get_db_config(db_config: dict) -> BaseDBConfig:
         raise ConfigParseError(f"Unsupported database type: {db_type}")
 
 
+def get_storage_serializer_config(
+    serializer_config: dict
+) -> StorageSerializerConfig:
+    serializer_type = StorageSerializerType(
+        serializer_config.get("type", StorageSerializerConfig.type)
+    )
+    compress_threshold = int(
+        serializer_config.get(
+            "compress_threshold",
+            StorageSerializerConfig.compress_threshold
+        )
+    )
+    compress_level = int(
+        serializer_config.get(
+            "compress_level",
+            StorageSerializerConfig.compress_level
+        )
+    )
+    if not -1 <= compress_level <= 9:
+        raise ConfigParseError(
+            f"Unsupported compress level: {compress_level}"
+        )
+
+    return StorageSerializerConfig(
+        type=serializer_type,
+        compress_threshold=compress_threshold,
+        compress_level=compress_level
+    )
+
+
+def get_storage_sweeper_config(
+    sweeper_config: Optional[dict]
+) -> Optional[StorageSweeperConfig]:
+    if sweeper_config is None:
+        return None
+
+    interval = float(
+        sweeper_config.get("interval", StorageSweeperConfig.interval)
+    )
+    batch_size = int(
+        sweeper_config.get("batch_size", StorageSweeperConfig.batch_size)
+    )
+    min_idle = int(
+        sweeper_config.get("min_idle", StorageSweeperConfig.min_idle)
+    )
+    # reading a key resets its idle time, a longer min_idle never matches
+    if min_idle > interval:
+        raise ConfigParseError(
+            "Storage sweeper min_idle must not exceed its interval"
+        )
+
+    return StorageSweeperConfig(
+        interval=interval,
+        batch_size=batch_size,
+        min_idle=min_idle
+    )
+
+
+def get_ttl(value: Optional[int | str]) -> Optional[int]:
+    if value is None:
+        return None
+    ttl = int(value)
+    if ttl <= 0:
+        raise ConfigParseError(f"TTL must be positive, got {ttl}")
+    return ttl
+
+
 def get_storage_config(storage_config: dict) -> BaseStorageConfig:
     storage_type = StorageType(storage_config["type"])
 
@@ -79,19 +164,298 @@ def get_storage_config(storage_config: dict) -> BaseStorageConfig:
                 port=int(get_env_var("BOT_STORAGE_REDIS_PORT")),
                 db=int(get_env_var("BOT_STORAGE_REDIS_DB")),
             ),
-            type=StorageType.REDIS
+            type=StorageType.REDIS,
+            serializer=get_storage_serializer_config(
+                storage_config.get("serializer", {})
+            ),
+            state_ttl=get_ttl(storage_config.get("state_ttl")),
+            data_ttl=get_ttl(storage_config.get("data_ttl")),
+            sweeper=get_storage_sweeper_config(
+                storage_config.get("sweeper")
+            )
         )
 
     else:
         raise ConfigParseError(f"Unsupported storage type: {storage_type}")
 
 
+def get_query_cache_config(query_cache_config: dict) -> QueryCacheConfig:
+    backend = QueryCacheBackendType(
+        query_cache_config.get("backend", QueryCacheBackendType.MEMORY)
+    )
+    ttl = float(query_cache_config.get("ttl", QueryCacheConfig.ttl))
+    max_size = int(
+        query_cache_config.get("max_size", QueryCacheConfig.max_size)
+    )
+
+    if backend == QueryCacheBackendType.MEMORY:
+        return QueryCacheConfig(
+            backend=backend,
+            ttl=ttl,
+            max_size=max_size
+        )
+
+    elif backend == QueryCacheBackendType.REDIS:
+        return QueryCacheConfig(
+            backend=backend,
+            ttl=ttl,
+            max_size=max_size,
+            redis=RedisConfig(
+                host=get_env_var("BOT_QUERY_CACHE_REDIS_HOST"),
+                port=int(get_env_var("BOT_QUERY_CACHE_REDIS_PORT")),
+                db=int(get_env_var("BOT_QUERY_CACHE_REDIS_DB")),
+            )
+        )
+
+    else:
+        raise ConfigParseError(f"Unsupported query cache backend: {backend}")
+
+
+def get_scheduler_config(scheduler_config: dict) -> SchedulerConfig:
+    config = SchedulerConfig(
+        enabled=bool(
+            scheduler_config.get("enabled", SchedulerConfig.enabled)
+        ),
+        workers=int(
+            scheduler_config.get("workers", SchedulerConfig.workers)
+        ),
+        batch_size=int(
+            scheduler_config.get("batch_size", SchedulerConfig.batch_size)
+        ),
+        poll_interval=float(
+            scheduler_config.get(
+                "poll_interval",
+                SchedulerConfig.poll_interval
+            )
+        ),
+        horizon=float(
+            scheduler_config.get("horizon", SchedulerConfig.horizon)
+        ),
+        heap_size=int(
+            scheduler_config.get("heap_size", SchedulerConfig.heap_size)
+        ),
+        lease_timeout=float(
+            scheduler_config.get(
+                "lease_timeout",
+                SchedulerConfig.lease_timeout
+            )
+        ),
+        max_attempts=int(
+            scheduler_config.get(
+                "max_attempts",
+                SchedulerConfig.max_attempts
+            )
+        ),
+        retry_delay=float(
+            scheduler_config.get("retry_delay", SchedulerConfig.retry_delay)
+        )
+    )
+
+    if config.workers <= 0 or config.batch_size <= 0:
+        raise ConfigParseError(
+            "Scheduler workers and batch_size must be positive"
+        )
+
+    return config
+
+
+def get_outbox_config(outbox_config: dict) -> OutboxConfig:
+    config = OutboxConfig(
+        enabled=bool(outbox_config.get("enabled", OutboxConfig.enabled)),
+        batch_size=int(
+            outbox_config.get("batch_size", OutboxConfig.batch_size)
+        ),
+        poll_interval=float(
+            outbox_config.get("poll_interval", OutboxConfig.poll_interval)
+        ),
+        rate=float(outbox_config.get("rate", OutboxConfig.rate)),
+        chat_interval=float(
+            outbox_config.get("chat_interval", OutboxConfig.chat_interval)
+        ),
+        lease_timeout=float(
+            outbox_config.get("lease_timeout", OutboxConfig.lease_timeout)
+        ),
+        max_attempts=int(
+            outbox_config.get("max_attempts", OutboxConfig.max_attempts)
+        ),
+        retry_delay=float(
+            outbox_config.get("retry_delay", OutboxConfig.retry_delay)
+        ),
+        retention=float(
+            outbox_config.get("retention", OutboxConfig.retention)
+        )
+    )
+
+    if config.rate <= 0 or config.batch_size <= 0:
+        raise ConfigParseError("Outbox rate and batch_size must be positive")
+
+    return config
+
+
+def get_offload_config(offload_config: dict) -> OffloadConfig:
+    timeout = offload_config.get("timeout", OffloadConfig.timeout)
+    config = OffloadConfig(
+        thread_workers=int(
+            offload_config.get("thread_workers", OffloadConfig.thread_workers)
+        ),
+        process_workers=int(
+            offload_config.get(
+                "process_workers",
+                OffloadConfig.process_workers
+            )
+        ),
+        max_pending=int(
+            offload_config.get("max_pending", OffloadConfig.max_pending)
+        ),
+        queue_timeout=float(
+            offload_config.get("queue_timeout", OffloadConfig.queue_timeout)
+        ),
+        timeout=float(timeout) if timeout is not None else None
+    )
+
+    if config.thread_workers <= 0 or config.process_workers <= 0:
+        raise ConfigParseError("Offload workers must be positive")
+
+    return config
+
+
+def get_capture_config(capture_config: dict) -> CaptureConfig:
+    config = CaptureConfig(
+        enabled=bool(capture_config.get("enabled", CaptureConfig.enabled)),
+        path=str(capture_config.get("path", CaptureConfig.path)),
+        salt=os.getenv("BOT_CAPTURE_SALT") or CaptureConfig.salt,
+        flush_every=int(
+            capture_config.get("flush_every", CaptureConfig.flush_every)
+        )
+    )
+
+    if config.flush_every <= 0:
+        raise ConfigParseError("Capture flush_every must be positive")
+
+    return config
+
+
+def get_media_config(media_config: dict) -> MediaConfig:
+    config = MediaConfig(
+        file_id_cache=bool(
+            media_config.get("file_id_cache", MediaConfig.file_id_cache)
+        ),
+        memory_size=int(
+            media_config.get("memory_size", MediaConfig.memory_size)
+        ),
+        chunk_size=int(
+            media_config.get("chunk_size", MediaConfig.chunk_size)
+        )
+    )
+
+    if config.memory_size <= 0 or config.chunk_size <= 0:
+        raise ConfigParseError(
+            "Media memory_size and chunk_size must be positive"
+        )
+
+    return config
+
+
+def get_runtime_config(runtime_config: dict) -> RuntimeConfig:
+    return RuntimeConfig(
+        event_loop=EventLoopType(
+            runtime_config.get("event_loop", RuntimeConfig.event_loop)
+        ),
+        json=JsonCodecType(runtime_config.get("json", RuntimeConfig.json))
+    )
+
+
+@dataclass(frozen=True)
+class ConfigReloadConfig:
+    enabled: bool = True
+    interval: float = 2.0
+
+
+def get_config_reload_config(reload_config: dict) -> ConfigReloadConfig:
+    config = ConfigReloadConfig(
+        enabled=bool(
+            reload_config.get("enabled", ConfigReloadConfig.enabled)
+        ),
+        interval=float(
+            reload_config.get("interval", ConfigReloadConfig.interval)
+        )
+    )
+
+    if config.interval <= 0:
+        raise ConfigParseError("Config reload interval must be positive")
+
+    return config
+
+
+@dataclass(frozen=True)
+class BotApiConfig:
+    base_url: Optional[str] = None
+    is_local: bool = False
+    timeout: float = 60.0
+
+
+def get_bot_api_config(bot_api_config: dict) -> BotApiConfig:
+    config = BotApiConfig(
+        base_url=bot_api_config.get("base_url", BotApiConfig.base_url),
+        is_local=bool(
+            bot_api_config.get("is_local", BotApiConfig.is_local)
+        ),
+        timeout=float(
+            bot_api_config.get("timeout", BotApiConfig.timeout)
+        )
+    )
+
+    if config.is_local and config.base_url is None:
+        raise ConfigParseError("A local Bot API server needs a base_url")
+    if config.timeout <= 0:
+        raise ConfigParseError("Bot API timeout must be positive")
+
+    return config
+
+
+@dataclass(frozen=True)
+class BotTokenConfig:
+    name: str
+    token: str
+
+
+def get_bots_config(bots_config: list) -> tuple[BotTokenConfig, ...]:
+    # without a bots list a single bot is served, as before
+    if not bots_config:
+        return (BotTokenConfig(name="main", token=get_env_var("BOT_TOKEN")),)
+
+    bots = tuple(
+        BotTokenConfig(
+            name=str(bot_config["name"]),
+            token=get_env_var(bot_config.get("token_env", "BOT_TOKEN"))
+        )
+        for bot_config in bots_config
+    )
+
+    if len({bot.name for bot in bots}) != len(bots):
+        raise ConfigParseError("Bot names must be unique")
+    if len({bot.token for bot in bots}) != len(bots):
+        raise ConfigParseError("Bot tokens must be unique")
+
+    return bots
+
+
 @dataclass
 class BotConfig:
-    bot_token: str
+    bots: tuple[BotTokenConfig, ...]
     storage: BaseStorageConfig
     db: BaseDBConfig
     logging_config_path: str
+    query_cache: QueryCacheConfig = QueryCacheConfig()
+    locales: tuple[str, ...] = ()
+    scheduler: SchedulerConfig = SchedulerConfig()
+    outbox: OutboxConfig = OutboxConfig()
+    offload: OffloadConfig = OffloadConfig()
+    reload: ConfigReloadConfig = ConfigReloadConfig()
+    runtime: RuntimeConfig = RuntimeConfig()
+    capture: CaptureConfig = CaptureConfig()
+    bot_api: BotApiConfig = BotApiConfig()
+    media: MediaConfig = MediaConfig()
 
 
 def load_bot_config() -> BotConfig:
@@ -101,8 +465,20 @@ def load_bot_config() -> BotConfig:
     config_data: dict = load_yaml_config(config_path)
 
     return BotConfig(
-        bot_token=get_env_var("BOT_TOKEN"),
+        bots=get_bots_config(config_data.get("bots", [])),
         storage=get_storage_config(config_data["storage"]),
         db=get_db_config(config_data["db"]),
-        logging_config_path=logging_config_path
+        logging_config_path=logging_config_path,
+        query_cache=get_query_cache_config(
+            config_data.get("query_cache", {})
+        ),
+        locales=tuple(config_data.get("locales", ())),
+        scheduler=get_scheduler_config(config_data.get("scheduler", {})),
+        outbox=get_outbox_config(config_data.get("outbox", {})),
+        offload=get_offload_config(config_data.get("offload", {})),
+        reload=get_config_reload_config(config_data.get("reload", {})),
+        runtime=get_runtime_config(config_data.get("runtime", {})),
+        capture=get_capture_config(config_data.get("capture", {})),
+        bot_api=get_bot_api_config(config_data.get("bot_api", {})),
+        media=get_media_config(config_data.get("media", {}))
     )
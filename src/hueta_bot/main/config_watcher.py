@@ -0,0 +1,159 @@
+import asyncio
+import dataclasses
+import logging
+import logging.config
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Sequence, Union
+
+import yaml
+
+from hueta_bot.infrastructure.logging import setup_logging
+from hueta_bot.main.config import BotConfig, load_bot_config
+
+
+logger = logging.getLogger(__name__)
+
+# these are set up once in main()
+RESTART_FIELDS = (
+    "bots",
+    "storage",
+    "db",
+    "logging_config_path",
+    "runtime",
+    "capture",
+    "bot_api",
+    "media"
+)
+
+ReloadListener = Callable[[BotConfig], Union[Awaitable[None], None]]
+
+
+class BotConfigHolder:
+    def __init__(self, config: BotConfig) -> None:
+        self._config = config
+
+    @property
+    def current(self) -> BotConfig:
+        return self._config
+
+    def swap(self, config: BotConfig) -> BotConfig:
+        # a single reference assignment, readers see old or new, not a mix
+        old, self._config = self._config, config
+        return old
+
+
+class ConfigWatcher:
+    def __init__(
+        self,
+        holder: BotConfigHolder,
+        paths: Sequence[Union[str, Path]],
+        loader: Callable[[], BotConfig] = load_bot_config,
+    ) -> None:
+        self.holder = holder
+        self.paths = [Path(path) for path in paths]
+        self.loader = loader
+
+        self._listeners: list[ReloadListener] = []
+        self._mtimes = self._read_mtimes()
+        self._logging_config = self._load_logging_config(
+            holder.current.logging_config_path
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: ReloadListener) -> None:
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def reload(self) -> bool:
+        try:
+            config = self._keep_restart_fields(self.loader())
+            logging_config = self._load_logging_config(
+                config.logging_config_path
+            )
+        except Exception:
+            logger.exception("Config reload rejected, keeping the old config")
+            return False
+
+        if logging_config != self._logging_config:
+            try:
+                setup_logging(config.logging_config_path)
+            except Exception:
+                # dictConfig may fail halfway, put the last good one back
+                if self._logging_config is not None:
+                    logging.config.dictConfig(self._logging_config)
+                logger.exception("Logging config reload rejected")
+                return False
+            self._logging_config = logging_config
+            logger.info("Logging config reloaded")
+
+        if config == self.holder.current:
+            return False
+
+        self.holder.swap(config)
+        for listener in self._listeners:
+            try:
+                result = listener(config)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                logger.exception("Config reload listener %r failed", listener)
+
+        logger.info("Config reloaded")
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.holder.current.reload.interval)
+            mtimes = self._read_mtimes()
+            if mtimes == self._mtimes:
+                continue
+            self._mtimes = mtimes
+            await self.reload()
+
+    def _read_mtimes(self) -> tuple[Optional[int], ...]:
+        mtimes = []
+        for path in self.paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _load_logging_config(self, path: Union[str, Path]) -> Optional[dict]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            logging_config = yaml.safe_load(f)
+        if not isinstance(logging_config, dict):
+            raise ValueError(f"Invalid logging config in {path}")
+        return logging_config
+
+    def _keep_restart_fields(self, config: BotConfig) -> BotConfig:
+        current = self.holder.current
+        changed = {
+            field: getattr(current, field)
+            for field in RESTART_FIELDS
+            if getattr(config, field) != getattr(current, field)
+        }
+        if not changed:
+            return config
+
+        logger.warning(
+            "Changes to %s need a restart and were not applied",
+            ", ".join(changed)
+        )
+        return dataclasses.replace(config, **changed)
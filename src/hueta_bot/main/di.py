@@ -1,5 +1,7 @@
-from typing import AsyncGenerator, AsyncIterable
+from typing import AsyncGenerator, AsyncIterable, Iterable
 
+from aiogram import Bot
+from aiogram.types import TelegramObject
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
@@ -10,39 +12,128 @@ from dishka import (
     AsyncContainer,
     Provider,
     Scope,
+    alias,
+    from_context,
     make_async_container,
     provide,
 )
 
+from hueta_bot.application.ports.messaging.media_sender import MediaSender
+from hueta_bot.application.ports.messaging.outbox import Outbox
+from hueta_bot.application.ports.offload.offloader import Offloader
+from hueta_bot.application.ports.persistence.bulk_writer import (
+    BulkWriter
+)
 from hueta_bot.application.ports.persistence.transaction_manager import (
     TransactionManager
 )
+from hueta_bot.application.ports.scheduler.job_scheduler import (
+    JobScheduler
+)
+from hueta_bot.infrastructure.media.file_id_cache import FileIdCache
+from hueta_bot.infrastructure.media.media_config import MediaConfig
+from hueta_bot.infrastructure.media.media_sender import CachedMediaSender
+from hueta_bot.infrastructure.offload.executor_offloader import (
+    ExecutorOffloader
+)
+from hueta_bot.infrastructure.offload.offload_config import OffloadConfig
+from hueta_bot.infrastructure.outbox.outbox import SQLAlchemyOutbox
+from hueta_bot.infrastructure.outbox.outbox_config import OutboxConfig
+from hueta_bot.infrastructure.outbox.outbox_relay import OutboxRelay
+from hueta_bot.infrastructure.persistence.bulk_writer import (
+    SQLAlchemyBulkWriter
+)
 from hueta_bot.infrastructure.persistence.transaction_manager import (
     SQLAlchemyTransactionManager
 )
 from hueta_bot.infrastructure.persistence.persistence_config import (
-    BaseDBConfig
+    BaseDBConfig,
+    QueryCacheBackendType,
+    QueryCacheConfig
+)
+from hueta_bot.infrastructure.persistence.query_cache import (
+    QUERY_CACHE_KEY,
+    MemoryQueryCacheBackend,
+    QueryCache,
+    QueryCacheBackend,
+    QueryCacheSession,
+    RedisQueryCacheBackend
 )
-from hueta_bot.main.config import (
-    load_bot_config,
-    BotConfig
+from hueta_bot.infrastructure.scheduler.job_runner import (
+    JobRegistry,
+    JobRunner
 )
+from hueta_bot.infrastructure.scheduler.job_scheduler import (
+    SQLAlchemyJobScheduler
+)
+from hueta_bot.infrastructure.scheduler.scheduler_config import (
+    SchedulerConfig
+)
+from hueta_bot.main.config import BotConfig
+from hueta_bot.main.config_watcher import BotConfigHolder
 
 
 class BotConfigProvider(Provider):
-    @provide(scope=Scope.APP)
+    # loaded once in main(), the config watcher swaps the held snapshot
+    config_holder = from_context(provides=BotConfigHolder, scope=Scope.APP)
+
+    @provide(scope=Scope.REQUEST)
     def provide_bot_config(
         self,
+        holder: BotConfigHolder
     ) -> BotConfig:
-        config = load_bot_config()
-        return config
+        # one snapshot per update, a reload never changes it mid handler
+        return holder.current
 
+    # app scoped objects are built from the startup config,
+    # reloads reach them through the watcher listeners
     @provide(scope=Scope.APP)
     def provide_db_config(
         self,
-        config: BotConfig
+        holder: BotConfigHolder
     ) -> BaseDBConfig:
-        return config.db
+        return holder.current.db
+
+    @provide(scope=Scope.APP)
+    def provide_query_cache_config(
+        self,
+        holder: BotConfigHolder
+    ) -> QueryCacheConfig:
+        return holder.current.query_cache
+
+    @provide(scope=Scope.APP)
+    def provide_scheduler_config(
+        self,
+        holder: BotConfigHolder
+    ) -> SchedulerConfig:
+        return holder.current.scheduler
+
+    @provide(scope=Scope.APP)
+    def provide_outbox_config(
+        self,
+        holder: BotConfigHolder
+    ) -> OutboxConfig:
+        return holder.current.outbox
+
+    @provide(scope=Scope.APP)
+    def provide_offload_config(
+        self,
+        holder: BotConfigHolder
+    ) -> OffloadConfig:
+        return holder.current.offload
+
+    @provide(scope=Scope.APP)
+    def provide_media_config(
+        self,
+        holder: BotConfigHolder
+    ) -> MediaConfig:
+        return holder.current.media
+
+
+class TelegramProvider(Provider):
+    # passed by the container middleware for every update
+    event = from_context(provides=TelegramObject, scope=Scope.REQUEST)
+    bot = from_context(provides=Bot, scope=Scope.REQUEST)
 
 
 class PersistenceProvider(Provider):
@@ -63,14 +154,45 @@ class PersistenceProvider(Provider):
     @provide(scope=Scope.APP)
     def provide_sessionmaker(
         self,
-        engine: AsyncEngine
+        engine: AsyncEngine,
+        query_cache: QueryCache
     ) -> async_sessionmaker[AsyncSession]:
         return async_sessionmaker(
             bind=engine,
             expire_on_commit=False,
             class_=AsyncSession,
+            sync_session_class=QueryCacheSession,
+            info={QUERY_CACHE_KEY: query_cache},
+        )
+
+    @provide(scope=Scope.APP)
+    async def provide_query_cache(
+        self,
+        query_cache_config: QueryCacheConfig
+    ) -> AsyncGenerator[QueryCache, None]:
+        backend: QueryCacheBackend
+        if query_cache_config.backend == QueryCacheBackendType.REDIS:
+            if query_cache_config.redis is None:
+                raise ValueError(
+                    "you have to specify redis config for use redis query cache"
+                )
+            backend = RedisQueryCacheBackend.from_url(
+                query_cache_config.redis.url()
+            )
+        else:
+            backend = MemoryQueryCacheBackend(
+                max_size=query_cache_config.max_size
+            )
+
+        query_cache = QueryCache(
+            backend=backend,
+            default_ttl=query_cache_config.ttl
         )
 
+        yield query_cache
+
+        await query_cache.close()
+
     @provide(scope=Scope.REQUEST)
     async def provide_session(
         self,
@@ -85,19 +207,149 @@ class PersistenceProvider(Provider):
         provides=TransactionManager,
     )
 
+    bulk_writer_provider = provide(
+        SQLAlchemyBulkWriter,
+        scope=Scope.REQUEST,
+        provides=BulkWriter,
+    )
+
+
+class SchedulerProvider(Provider):
+    job_registry_provider = provide(
+        JobRegistry,
+        scope=Scope.APP,
+    )
+
+    @provide(scope=Scope.APP)
+    async def provide_job_runner(
+        self,
+        scheduler_config: SchedulerConfig,
+        session_factory: async_sessionmaker[AsyncSession],
+        registry: JobRegistry
+    ) -> AsyncGenerator[JobRunner, None]:
+        runner = JobRunner(
+            session_factory=session_factory,
+            registry=registry,
+            workers=scheduler_config.workers,
+            batch_size=scheduler_config.batch_size,
+            poll_interval=scheduler_config.poll_interval,
+            horizon=scheduler_config.horizon,
+            heap_size=scheduler_config.heap_size,
+            lease_timeout=scheduler_config.lease_timeout,
+            max_attempts=scheduler_config.max_attempts,
+            retry_delay=scheduler_config.retry_delay
+        )
+
+        yield runner
+
+        await runner.stop()
+
+    job_scheduler_provider = provide(
+        SQLAlchemyJobScheduler,
+        scope=Scope.REQUEST,
+        provides=JobScheduler,
+    )
+
+
+class OutboxProvider(Provider):
+    @provide(scope=Scope.APP)
+    async def provide_outbox_relay(
+        self,
+        outbox_config: OutboxConfig,
+        session_factory: async_sessionmaker[AsyncSession]
+    ) -> AsyncGenerator[OutboxRelay, None]:
+        relay = OutboxRelay(
+            session_factory=session_factory,
+            batch_size=outbox_config.batch_size,
+            poll_interval=outbox_config.poll_interval,
+            rate=outbox_config.rate,
+            chat_interval=outbox_config.chat_interval,
+            lease_timeout=outbox_config.lease_timeout,
+            max_attempts=outbox_config.max_attempts,
+            retry_delay=outbox_config.retry_delay,
+            retention=outbox_config.retention
+        )
+
+        yield relay
+
+        await relay.stop()
+
+    outbox_provider = provide(
+        SQLAlchemyOutbox,
+        scope=Scope.REQUEST,
+        provides=Outbox,
+    )
+
+
+class OffloadProvider(Provider):
+    @provide(scope=Scope.APP)
+    def provide_offloader(
+        self,
+        offload_config: OffloadConfig
+    ) -> Iterable[ExecutorOffloader]:
+        offloader = ExecutorOffloader(
+            thread_workers=offload_config.thread_workers,
+            process_workers=offload_config.process_workers,
+            max_pending=offload_config.max_pending,
+            queue_timeout=offload_config.queue_timeout,
+            timeout=offload_config.timeout
+        )
+
+        yield offloader
+
+        offloader.shutdown()
+
+    offloader_provider = alias(
+        source=ExecutorOffloader,
+        provides=Offloader,
+    )
+
+
+class MediaProvider(Provider):
+    @provide(scope=Scope.APP)
+    def provide_file_id_cache(
+        self,
+        media_config: MediaConfig,
+        session_factory: async_sessionmaker[AsyncSession]
+    ) -> FileIdCache:
+        return FileIdCache(
+            session_factory=session_factory,
+            max_size=media_config.memory_size,
+            chunk_size=media_config.chunk_size
+        )
+
+    @provide(scope=Scope.APP)
+    def provide_media_sender(
+        self,
+        media_config: MediaConfig,
+        file_id_cache: FileIdCache
+    ) -> MediaSender:
+        return CachedMediaSender(
+            cache=file_id_cache if media_config.file_id_cache else None,
+            chunk_size=media_config.chunk_size
+        )
+
 
 def setup_bot_providers() -> list[Provider]:
     providers = [
         BotConfigProvider(),
+        TelegramProvider(),
         PersistenceProvider(),
+        SchedulerProvider(),
+        OutboxProvider(),
+        OffloadProvider(),
+        MediaProvider(),
     ]
 
     return providers
 
 
-def setup_bot_container() -> AsyncContainer:
+def setup_bot_container(config_holder: BotConfigHolder) -> AsyncContainer:
     bot_providers = setup_bot_providers()
 
-    bot_container = make_async_container(*bot_providers)
+    bot_container = make_async_container(
+        *bot_providers,
+        context={BotConfigHolder: config_holder}
+    )
 
     return bot_container
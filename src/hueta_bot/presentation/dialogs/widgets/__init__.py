@@ -1,11 +1,19 @@
 from .cancel import Cancel
 from .pagination_pager import PaginationPager, PaginationMode
+from .keyset_scroll import KeysetScroll, ManagedKeysetScroll
 from .calendar import (
     CustomCalendar,
     MultiselectCalendar,
     RadioCalendar,
     MarkedCalendar
 )
+from .calendar_index import DateIndex, DateRange
+from .locale_data import LocaleData, locale_data
+from .render_cache import (
+    KeyboardRenderCache,
+    RenderCacheInfo,
+    keyboard_render_cache
+)
 from .tab import TabStart, TabSwitchTo, CheckStateMode
 
 
@@ -13,10 +21,19 @@ __all__ = [
     "Cancel",
     "PaginationPager",
     "PaginationMode",
+    "KeysetScroll",
+    "ManagedKeysetScroll",
     "CustomCalendar",
     "MultiselectCalendar",
     "RadioCalendar",
     "MarkedCalendar",
+    "DateIndex",
+    "DateRange",
+    "LocaleData",
+    "locale_data",
+    "KeyboardRenderCache",
+    "RenderCacheInfo",
+    "keyboard_render_cache",
     "TabStart",
     "TabSwitchTo",
     "CheckStateMode"
@@ -1,17 +1,18 @@
+from bisect import bisect_left
 from datetime import date
 from typing import (
     Dict,
+    Hashable,
     TypedDict,
     Sequence,
     Callable,
     Union,
     TypeVar,
-    Any,
     Optional
 )
 
-from babel.dates import get_day_names, get_month_names
 from aiogram_dialog import DialogManager
+from aiogram_dialog.api.internal import RawKeyboard
 from aiogram_dialog.widgets.kbd import (
     Calendar,
     CalendarScope,
@@ -23,10 +24,16 @@ from aiogram_dialog.widgets.kbd.calendar_kbd import (
     CalendarScopeView,
     CalendarYearsView,
     date_from_raw,
+    empty_button,
+    get_today,
     OnDateSelected,
     CalendarUserConfig,
-    CalendarConfig
+    CalendarConfig,
+    CALLBACK_PREFIX_MONTH,
+    THIS_YEAR_TEXT,
+    YEAR_TEXT
 )
+from aiogram.types import InlineKeyboardButton
 from aiogram_dialog.widgets.text import Format, Text
 from aiogram_dialog.widgets.common import ManagedWidget, WhenCondition
 from aiogram_dialog.widgets.widget_event import (
@@ -37,35 +44,58 @@ from aiogram_dialog.widgets.common.items import (
     ItemsGetterVariant
 )
 
+from .calendar_index import DateIndex, ItemIdGetter
+from .locale_data import LocaleData, locale_data as default_locale_data
+from .render_cache import (
+    KeyboardRenderCache,
+    RenderCacheInfo,
+    keyboard_render_cache
+)
+
 
 MARK_DATE_TEXT = Format("{date:%d}")
 UNMARK_DATE_TEXT = Format("✗")
 CHECKED_MARK_DATE_TEXT = Format("[{date:%d}]")
 CHECKED_UNMARK_DATE_TEXT = Format("[✗]")
+MARKED_YEAR_TEXT = Format("{date:%Y} •")
+MARKED_THIS_YEAR_TEXT = Format("[ {date:%Y} • ]")
+ITEMS_COUNT_TEXT = Format(" · {count}")
+
+
+DATE_INDEX_KEY = "__calendar_date_index__"
+ITEM_DATES_KEY = "__calendar_item_dates__"
+ITEMS_FINGERPRINT_KEY = "__calendar_items_fingerprint__"
+CHECKED_DATES_KEY = "__calendar_checked_dates__"
 
 
 T = TypeVar("T")
 TypeFactory = Callable[[str], T]
-ItemIdGetter = Callable[[Any], Union[str, int]]
 ItemsGetter = Callable[[Dict], Sequence]
 
 
 class CalendarData(TypedDict):
     current_scope: str
     current_offset: str
-    checked: list[str]
+    checked: list[int]
 
 
 class RadioCalendarData(TypedDict):
     current_scope: str
     current_offset: str
-    checked: Optional[str] = None
+    checked: Optional[int] = None
+
+
+def checked_to_ordinal(checked: Union[int, str]) -> int:
+    # widget data stored before ordinals were introduced holds ISO strings
+    if isinstance(checked, int):
+        return checked
+    return date.fromisoformat(str(checked)).toordinal()
 
 
 class CheckedDay(Text):
     def __init__(
         self,
-        is_date_checked: Callable[["DialogManager", date], bool],
+        is_date_checked: Callable[[Dict, "DialogManager", date], bool],
         is_date_in_items: Callable[[Dict, date], bool],
     ):
         super().__init__()
@@ -73,7 +103,11 @@ class CheckedDay(Text):
         self.is_date_in_items = is_date_in_items
 
     async def _render_text(self, data, manager: DialogManager) -> str:
-        _is_date_checked = self._is_date_checked(manager, data["date"])
+        _is_date_checked = self._is_date_checked(
+            data["data"],
+            manager,
+            data["date"]
+        )
 
         is_date_in_items = self.is_date_in_items(data["data"], data["date"])
 
@@ -104,22 +138,86 @@ class MarkedDay(Text):
             return await UNMARK_DATE_TEXT.render_text(data, manager)
 
 
+class ItemsCount(Text):
+    def __init__(
+        self,
+        text: Text,
+        counted_text: Text,
+        get_items_count: Callable[[Dict], int],
+    ):
+        super().__init__()
+        self.text = text
+        self.counted_text = counted_text
+        self.get_items_count = get_items_count
+
+    async def _render_text(self, data, manager: DialogManager) -> str:
+        count = self.get_items_count(data)
+        if count:
+            return await self.counted_text.render_text(
+                {**data, "count": count}, manager,
+            )
+        return await self.text.render_text(data, manager)
+
+
 class WeekDay(Text):
+    def __init__(self, locale_data: LocaleData = default_locale_data):
+        super().__init__()
+        self.locale_data = locale_data
+
     async def _render_text(self, data, manager: DialogManager) -> str:
         selected_date: date = data["date"]
         locale = manager.event.from_user.language_code
-        return get_day_names(
-            width="short", context="stand-alone", locale=locale,
-        )[selected_date.weekday()].title()
+        return self.locale_data.get_day_names(
+            locale,
+        )[selected_date.weekday()]
 
 
 class Month(Text):
+    def __init__(self, locale_data: LocaleData = default_locale_data):
+        super().__init__()
+        self.locale_data = locale_data
+
     async def _render_text(self, data, manager: DialogManager) -> str:
         selected_date: date = data["date"]
         locale = manager.event.from_user.language_code
-        return get_month_names(
-            "wide", context="stand-alone", locale=locale,
-        )[selected_date.month].title()
+        return self.locale_data.get_month_names(
+            locale,
+        )[selected_date.month]
+
+
+class ItemsCalendarMonthView(CalendarMonthView):
+    async def _render_month_button(
+        self,
+        month: int,
+        this_month: int,
+        data: dict,
+        offset: date,
+        config: CalendarConfig,
+        manager: DialogManager,
+    ) -> InlineKeyboardButton:
+        # unlike the stock view keep the real year in `date`,
+        # month item counts depend on it
+        if not self._is_month_allowed(config, offset, month):
+            return empty_button()
+
+        month_data = {
+            "month": month,
+            "date": date(offset.year, month, 1),
+            "data": data,
+        }
+        if month == this_month:
+            text = self.this_month_text
+        else:
+            text = self.month_text
+
+        return InlineKeyboardButton(
+            text=await text.render_text(
+                month_data, manager,
+            ),
+            callback_data=self.callback_generator(
+                f"{CALLBACK_PREFIX_MONTH}{month}",
+            ),
+        )
 
 
 class CustomCalendar(Calendar):
@@ -129,6 +227,7 @@ class CustomCalendar(Calendar):
         on_click: Union[OnDateSelected, WidgetEventProcessor, None] = None,
         config: Optional[CalendarConfig] = None,
         when: WhenCondition = None,
+        render_cache: Optional[KeyboardRenderCache] = None,
     ) -> None:
         super().__init__(
             id=id,
@@ -136,6 +235,58 @@ class CustomCalendar(Calendar):
             config=config,
             when=when
         )
+        if render_cache is None:
+            render_cache = keyboard_render_cache
+        self.render_cache = render_cache
+
+    def render_cache_info(self) -> RenderCacheInfo:
+        return self.render_cache.info()
+
+    def _prepare_render_data(
+        self,
+        data: Dict,
+        manager: DialogManager,
+    ) -> Dict:
+        return data
+
+    def _get_render_content(self, data: Dict) -> Hashable:
+        return None
+
+    async def _render_keyboard(
+        self,
+        data: Dict,
+        manager: DialogManager,
+    ) -> RawKeyboard:
+        scope = self.get_scope(manager)
+        offset = self.get_offset(manager)
+        config = self.config.merge(await self._get_user_config(data, manager))
+        today = get_today(config.timezone)
+        if offset is None:
+            offset = today
+            self.set_offset(offset, manager)
+
+        # the cache is shared, the widget itself tells apart calendars that
+        # have the same id in different dialogs
+        data = self._prepare_render_data(data, manager)
+        key = (
+            self,
+            scope,
+            offset,
+            today,
+            config,
+            default_locale_data.normalize(
+                manager.event.from_user.language_code
+            ),
+            self._get_render_content(data),
+        )
+        keyboard = self.render_cache.get(key)
+        if keyboard is None:
+            keyboard = await self.views[scope].render(
+                config, offset, data, manager,
+            )
+            self.render_cache.set(key, keyboard)
+
+        return keyboard
 
     def _init_views(self) -> dict[CalendarScope, CalendarScopeView]:
         return {
@@ -160,7 +311,7 @@ class CustomCalendar(Calendar):
         }
 
 
-class MarkedCalendar(CustomCalendar):
+class ItemsCalendar(CustomCalendar):
     def __init__(
         self,
         id: str,
@@ -168,11 +319,133 @@ class MarkedCalendar(CustomCalendar):
         items: ItemsGetterVariant,
         on_click: Union[OnDateSelected, WidgetEventProcessor, None] = None,
         when: WhenCondition = None,
+        config: Optional[CalendarConfig] = None,
+        items_version: Optional[ItemsGetterVariant] = None,
     ) -> None:
-        super().__init__(id=id, when=when)
+        super().__init__(id=id, when=when, config=config)
         self.item_id_getter = item_id_getter
         self.items_getter = get_items_getter(items)
+        # a version of the items from the getter data lets cached renders
+        # skip the items, without it their dates are hashed on every render
+        self.items_version_getter = (
+            get_items_getter(items_version)
+            if items_version is not None
+            else None
+        )
         self.on_click = ensure_event_processor(on_click)
+
+    def get_date_index(self, data: Dict) -> DateIndex:
+        date_index = data.get(DATE_INDEX_KEY)
+        if date_index is not None:
+            return date_index
+
+        # built on the first lookup of a render, cache hits never need it
+        item_dates = data.get(ITEM_DATES_KEY)
+        if item_dates is None:
+            date_index = DateIndex.from_items(
+                self.items_getter(data),
+                self.item_id_getter
+            )
+        else:
+            date_index = DateIndex.from_item_dates(item_dates)
+        data[DATE_INDEX_KEY] = date_index
+        return date_index
+
+    def _prepare_render_data(
+        self,
+        data: Dict,
+        manager: DialogManager,
+    ) -> Dict:
+        if self.items_version_getter is not None:
+            return {
+                **data,
+                ITEMS_FINGERPRINT_KEY: self.items_version_getter(data)
+            }
+
+        # the cache is shared by every calendar, its keys hold a small
+        # fingerprint instead of the dates themselves
+        item_dates = tuple(
+            self.item_id_getter(item) for item in self.items_getter(data)
+        )
+        return {
+            **data,
+            ITEM_DATES_KEY: item_dates,
+            ITEMS_FINGERPRINT_KEY: (len(item_dates), hash(item_dates))
+        }
+
+    def _get_render_content(self, data: Dict) -> Hashable:
+        checked = data.get(CHECKED_DATES_KEY)
+        if isinstance(checked, frozenset):
+            checked = (len(checked), hash(checked))
+        return data[ITEMS_FINGERPRINT_KEY], checked
+
+    def _is_date_in_items(
+        self,
+        data: Dict,
+        item_date: date
+    ) -> bool:
+        return item_date in self.get_date_index(data)
+
+    def _count_month_items(self, data: Dict) -> int:
+        month_date: date = data["date"]
+        return self.get_date_index(data["data"]).count_month(
+            month_date.year,
+            month_date.month
+        )
+
+    def _count_year_items(self, data: Dict) -> int:
+        return self.get_date_index(data["data"]).count_year(data["year"])
+
+    def _init_months_view(self) -> CalendarScopeView:
+        return ItemsCalendarMonthView(
+            self._item_callback_data,
+            month_text=ItemsCount(
+                Month(),
+                Month() + ITEMS_COUNT_TEXT,
+                self._count_month_items,
+            ),
+            header_text="~~~~~ " + Format("{date:%Y}") + " ~~~~~",
+            this_month_text=ItemsCount(
+                "[" + Month() + "]",
+                "[" + Month() + ITEMS_COUNT_TEXT + "]",
+                self._count_month_items,
+            ),
+        )
+
+    def _init_years_view(self) -> CalendarScopeView:
+        return CalendarYearsView(
+            self._item_callback_data,
+            year_text=ItemsCount(
+                YEAR_TEXT,
+                MARKED_YEAR_TEXT,
+                self._count_year_items,
+            ),
+            this_year_text=ItemsCount(
+                THIS_YEAR_TEXT,
+                MARKED_THIS_YEAR_TEXT,
+                self._count_year_items,
+            ),
+        )
+
+
+class MarkedCalendar(ItemsCalendar):
+    def __init__(
+        self,
+        id: str,
+        item_id_getter: ItemIdGetter,
+        items: ItemsGetterVariant,
+        on_click: Union[OnDateSelected, WidgetEventProcessor, None] = None,
+        when: WhenCondition = None,
+        items_version: Optional[ItemsGetterVariant] = None,
+    ) -> None:
+        super().__init__(
+            id=id,
+            item_id_getter=item_id_getter,
+            items=items,
+            on_click=on_click,
+            when=when,
+            items_version=items_version
+        )
     
     async def reset_checked(
         self,
@@ -201,16 +474,6 @@ class MarkedCalendar(CustomCalendar):
             item_date,
         )
     
-    def _is_date_in_items(
-        self,
-        data: Dict,
-        item_date: date
-    ):
-        return item_date in {
-            self.item_id_getter(item)
-            for item in self.items_getter(data)
-        }
-
     def _init_views(self) -> dict[CalendarScope, CalendarScopeView]:
         return {
             CalendarScope.DAYS: CalendarDaysView(
@@ -226,19 +489,12 @@ class MarkedCalendar(CustomCalendar):
                 next_month_text=Month() + " ⊳",
                 prev_month_text="⊲ " + Month(),
             ),
-            CalendarScope.MONTHS: CalendarMonthView(
-                self._item_callback_data,
-                month_text=Month(),
-                header_text="~~~~~ " + Format("{date:%Y}") + " ~~~~~",
-                this_month_text="[" + Month() + "]",
-            ),
-            CalendarScope.YEARS: CalendarYearsView(
-                self._item_callback_data,
-            ),
+            CalendarScope.MONTHS: self._init_months_view(),
+            CalendarScope.YEARS: self._init_years_view(),
         }
 
 
-class MultiselectCalendar(CustomCalendar):
+class MultiselectCalendar(ItemsCalendar):
     def __init__(
         self,
         id: str,
@@ -246,28 +502,43 @@ class MultiselectCalendar(CustomCalendar):
         items: ItemsGetterVariant,
         on_click: Union[OnDateSelected, WidgetEventProcessor, None] = None,
         when: WhenCondition = None,
+        items_version: Optional[ItemsGetterVariant] = None,
     ) -> None:
-        super().__init__(id=id, when=when)
-        self.item_id_getter = item_id_getter
-        self.items_getter = get_items_getter(items)
-        self.on_click = ensure_event_processor(on_click)
+        super().__init__(
+            id=id,
+            item_id_getter=item_id_getter,
+            items=items,
+            on_click=on_click,
+            when=when,
+            items_version=items_version
+        )
 
     def is_checked(
         self,
         item_id: date,
         manager: DialogManager,
     ) -> bool:
-        data = self.get_checked(manager)
-        return item_id in data
+        data = self._get_checked(manager)
+        ordinal = item_id.toordinal()
+        index = bisect_left(data, ordinal)
+        return index < len(data) and data[index] == ordinal
 
     def get_checked(self, manager: DialogManager) -> list[date]:
         checked = self._get_checked(manager)
-        return [date.fromisoformat(str(item)) for item in checked]
-    
-    def _get_checked(self, manager: DialogManager) -> list[str]:
+        return [date.fromordinal(item) for item in checked]
+
+    def _get_checked(self, manager: DialogManager) -> list[int]:
         calendar_data: CalendarData = self.get_widget_data(manager, {})
-        return calendar_data.get("checked", [])
-    
+        checked = calendar_data.get("checked")
+        if not checked:
+            return []
+
+        if not isinstance(checked[0], int):
+            checked = sorted({checked_to_ordinal(item) for item in checked})
+            calendar_data["checked"] = checked
+
+        return checked
+
     async def reset_checked(
         self,
         manager: DialogManager,
@@ -281,19 +552,20 @@ class MultiselectCalendar(CustomCalendar):
         checked: bool,
         manager: DialogManager,
     ) -> None:
-        item_id_str = str(item_id.isoformat())
-        data: list = self._get_checked(manager)
-        changed = False
-        if item_id_str in data:
-            if not checked and len(data) > 0:
-                data.remove(item_id_str)
-                changed = True
+        data: list[int] = self._get_checked(manager)
+        ordinal = item_id.toordinal()
+        index = bisect_left(data, ordinal)
+        is_checked = index < len(data) and data[index] == ordinal
+
+        if is_checked and not checked:
+            del data[index]
+        elif checked and not is_checked:
+            data.insert(index, ordinal)
         else:
-            if checked:
-                data.append(item_id_str)
-                changed = True
-        if changed:
-            self.set_widget_data(manager, {"checked": data})
+            return
+
+        calendar_data: CalendarData = self.get_widget_data(manager, {})
+        calendar_data["checked"] = data
     
     async def _handle_click_date(
         self,
@@ -313,23 +585,28 @@ class MultiselectCalendar(CustomCalendar):
             date_,
         )
 
-    def _is_date_checked(
+    def _prepare_render_data(
         self,
+        data: Dict,
         manager: DialogManager,
-        item_date: date
-    ):
-        return item_date in self.get_checked(manager)
-    
-    def _is_date_in_items(
+    ) -> Dict:
+        render_data = super()._prepare_render_data(data, manager)
+        render_data[CHECKED_DATES_KEY] = frozenset(
+            self._get_checked(manager)
+        )
+        return render_data
+
+    def _is_date_checked(
         self,
         data: Dict,
+        manager: DialogManager,
         item_date: date
-    ):
-        return item_date in {
-            self.item_id_getter(item)
-            for item in self.items_getter(data)
-        }
-
+    ) -> bool:
+        checked = data.get(CHECKED_DATES_KEY)
+        if checked is None:
+            return self.is_checked(item_date, manager)
+        return item_date.toordinal() in checked
+    
     def _init_views(self) -> dict[CalendarScope, CalendarScopeView]:
         return {
             CalendarScope.DAYS: CalendarDaysView(
@@ -347,15 +624,8 @@ class MultiselectCalendar(CustomCalendar):
                 next_month_text=Month() + " ⊳",
                 prev_month_text="⊲ " + Month(),
             ),
-            CalendarScope.MONTHS: CalendarMonthView(
-                self._item_callback_data,
-                month_text=Month(),
-                header_text="~~~~~ " + Format("{date:%Y}") + " ~~~~~",
-                this_month_text="[" + Month() + "]",
-            ),
-            CalendarScope.YEARS: CalendarYearsView(
-                self._item_callback_data,
-            ),
+            CalendarScope.MONTHS: self._init_months_view(),
+            CalendarScope.YEARS: self._init_years_view(),
         }
 
     def managed(self, manager: DialogManager) -> "ManagedMultiselectCalendar":
@@ -380,7 +650,7 @@ class ManagedMultiselectCalendar(ManagedWidget[MultiselectCalendar]):
         )
 
 
-class RadioCalendar(CustomCalendar):
+class RadioCalendar(ItemsCalendar):
     def __init__(
         self,
         id: str,
@@ -390,11 +660,17 @@ class RadioCalendar(CustomCalendar):
         when: WhenCondition = None,
         user_config: Optional[CalendarUserConfig] = None,
         config: Optional[CalendarConfig] = None,
+        items_version: Optional[ItemsGetterVariant] = None,
     ) -> None:
-        super().__init__(id=id, when=when, config=config)
-        self.item_id_getter = item_id_getter
-        self.items_getter = get_items_getter(items)
-        self.on_click = ensure_event_processor(on_click)
+        super().__init__(
+            id=id,
+            item_id_getter=item_id_getter,
+            items=items,
+            on_click=on_click,
+            when=when,
+            config=config,
+            items_version=items_version
+        )
         self.user_config = user_config
     
     def is_checked(
@@ -415,12 +691,18 @@ class RadioCalendar(CustomCalendar):
 
     def get_checked(self, manager: DialogManager) -> date | None:
         checked = self._get_checked(manager)
-        if checked:
-            return date.fromisoformat(str(checked))
-    
-    def _get_checked(self, manager: DialogManager) -> str | None:
+        if checked is not None:
+            return date.fromordinal(checked)
+
+    def _get_checked(self, manager: DialogManager) -> int | None:
         calendar_data: RadioCalendarData = self.get_widget_data(manager, {})
-        return calendar_data.get("checked", None)
+        checked = calendar_data.get("checked", None)
+        if checked is None or isinstance(checked, int):
+            return checked
+
+        checked = checked_to_ordinal(checked)
+        calendar_data["checked"] = checked
+        return checked
     
     async def reset_checked(
         self,
@@ -434,8 +716,8 @@ class RadioCalendar(CustomCalendar):
         item_id: date,
         manager: DialogManager,
     ) -> None:
-        item_id_str = str(item_id.isoformat())
-        self.set_widget_data(manager, {"checked": item_id_str})
+        calendar_data: RadioCalendarData = self.get_widget_data(manager, {})
+        calendar_data["checked"] = item_id.toordinal()
     
     async def _handle_click_date(
         self,
@@ -454,23 +736,25 @@ class RadioCalendar(CustomCalendar):
             item_date,
         )
 
-    def _is_date_checked(
+    def _prepare_render_data(
         self,
+        data: Dict,
         manager: DialogManager,
-        item_date: date
-    ):
-        return item_date == self.get_checked(manager)
-    
-    def _is_date_in_items(
+    ) -> Dict:
+        render_data = super()._prepare_render_data(data, manager)
+        render_data[CHECKED_DATES_KEY] = self._get_checked(manager)
+        return render_data
+
+    def _is_date_checked(
         self,
         data: Dict,
+        manager: DialogManager,
         item_date: date
-    ):
-        return item_date in {
-            self.item_id_getter(item)
-            for item in self.items_getter(data)
-        }
-
+    ) -> bool:
+        if CHECKED_DATES_KEY not in data:
+            return self.is_checked(item_date, manager)
+        return item_date.toordinal() == data[CHECKED_DATES_KEY]
+    
     def _init_views(self) -> dict[CalendarScope, CalendarScopeView]:
         return {
             CalendarScope.DAYS: CalendarDaysView(
@@ -488,15 +772,8 @@ class RadioCalendar(CustomCalendar):
                 next_month_text=Month() + " ⊳",
                 prev_month_text="⊲ " + Month(),
             ),
-            CalendarScope.MONTHS: CalendarMonthView(
-                self._item_callback_data,
-                month_text=Month(),
-                header_text="~~~~~ " + Format("{date:%Y}") + " ~~~~~",
-                this_month_text="[" + Month() + "]",
-            ),
-            CalendarScope.YEARS: CalendarYearsView(
-                self._item_callback_data,
-            ),
+            CalendarScope.MONTHS: self._init_months_view(),
+            CalendarScope.YEARS: self._init_years_view(),
         }
 
     def managed(self, manager: DialogManager) -> "ManagedRadioCalendar":
@@ -515,7 +792,7 @@ class ManagedRadioCalendar(ManagedWidget[RadioCalendar]):
             self.manager,
         )
 
-    async def set_checked(self, item_id: date, checked: bool) -> None:
+    async def set_checked(self, item_id: date) -> None:
         return await self.widget.set_checked(
-            item_id, checked, self.manager,
+            item_id, self.manager,
         )
\ No newline at end of file
@@ -0,0 +1,108 @@
+from bisect import bisect_right
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, NamedTuple, Union
+
+
+class DateRange(NamedTuple):
+    start: date
+    end: date
+
+
+ItemDate = Union[date, DateRange, tuple[date, date]]
+ItemIdGetter = Callable[[Any], ItemDate]
+
+
+def _to_date(value: date) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _iterate_months(start: date, end: date) -> Iterable[tuple[int, int]]:
+    first = start.year * 12 + start.month - 1
+    last = end.year * 12 + end.month - 1
+    for month_number in range(first, last + 1):
+        yield month_number // 12, month_number % 12 + 1
+
+
+class DateIndex:
+    def __init__(
+        self,
+        dates: Iterable[date] = (),
+        ranges: Iterable[tuple[date, date]] = (),
+    ) -> None:
+        date_counts: Counter[date] = Counter(dates)
+        ranges = [
+            (min(start, end), max(start, end))
+            for start, end in (
+                (_to_date(start), _to_date(end)) for start, end in ranges
+            )
+        ]
+
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+
+        # aggregate distinct dates only, items often share a date
+        self._month_counts: Counter[tuple[int, int]] = Counter()
+        self._year_counts: Counter[int] = Counter()
+        dates_set: set[date] = set()
+        for item_date, count in date_counts.items():
+            item_date = _to_date(item_date)
+            dates_set.add(item_date)
+            self._month_counts[(item_date.year, item_date.month)] += count
+            self._year_counts[item_date.year] += count
+        self._dates: frozenset[date] = frozenset(dates_set)
+        for start, end in ranges:
+            self._month_counts.update(_iterate_months(start, end))
+            self._year_counts.update(range(start.year, end.year + 1))
+
+        intervals = sorted(
+            (start.toordinal(), end.toordinal()) for start, end in ranges
+        )
+        for start, end in intervals:
+            if self._ends and start <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    @classmethod
+    def from_items(
+        cls,
+        items: Iterable[Any],
+        item_id_getter: ItemIdGetter,
+    ) -> "DateIndex":
+        return cls.from_item_dates(item_id_getter(item) for item in items)
+
+    @classmethod
+    def from_item_dates(cls, item_dates: Iterable[ItemDate]) -> "DateIndex":
+        dates: list[date] = []
+        ranges: list[tuple[date, date]] = []
+        for item_date in item_dates:
+            if isinstance(item_date, tuple):
+                ranges.append(item_date)
+            else:
+                dates.append(item_date)
+        return cls(dates=dates, ranges=ranges)
+
+    def __contains__(self, item_date: date) -> bool:
+        item_date = _to_date(item_date)
+        if item_date in self._dates:
+            return True
+
+        if not self._starts:
+            return False
+
+        ordinal = item_date.toordinal()
+        position = bisect_right(self._starts, ordinal) - 1
+        return position >= 0 and self._ends[position] >= ordinal
+
+    def count_month(self, year: int, month: int) -> int:
+        return self._month_counts.get((year, month), 0)
+
+    def count_year(self, year: int) -> int:
+        return self._year_counts.get(year, 0)
+
+    def __bool__(self) -> bool:
+        return bool(self._dates or self._starts)
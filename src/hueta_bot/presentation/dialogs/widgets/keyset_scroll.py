@@ -0,0 +1,196 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from math import ceil
+from typing import Any, Callable, Optional, Sequence, TypedDict
+from uuid import UUID
+
+from aiogram_dialog import DialogManager
+from aiogram_dialog.api.entities import ChatEvent
+from aiogram_dialog.widgets.common import ManagedScroll
+from aiogram_dialog.widgets.common.scroll import (
+    BaseScroll,
+    OnPageChangedVariants
+)
+
+from hueta_bot.application.ports.persistence.page_source import (
+    Cursor,
+    KeysetPageSource
+)
+
+
+CURSOR_TYPE_KEY = "__cursor__"
+
+# datetime goes before date, it is a subclass of it
+CURSOR_TYPES: tuple[
+    tuple[str, type, Callable[[Any], str], Callable[[str], Any]], ...
+] = (
+    ("datetime", datetime, datetime.isoformat, datetime.fromisoformat),
+    ("date", date, date.isoformat, date.fromisoformat),
+    ("time", time, time.isoformat, time.fromisoformat),
+    ("decimal", Decimal, str, Decimal),
+    ("uuid", UUID, str, UUID),
+)
+
+
+def encode_cursor(cursor: Cursor) -> list[Any]:
+    # widget data goes through the storage serializer, key values coming
+    # from the database are kept as json values
+    encoded = []
+    for value in cursor:
+        if value is None or isinstance(value, (str, int, float)):
+            encoded.append(value)
+            continue
+
+        for name, value_type, dump, _ in CURSOR_TYPES:
+            if isinstance(value, value_type):
+                encoded.append({CURSOR_TYPE_KEY: name, "value": dump(value)})
+                break
+        else:
+            raise TypeError(
+                f"Cursor value of type {type(value).__name__} "
+                f"cannot be stored"
+            )
+    return encoded
+
+
+def decode_cursor(cursor: Sequence[Any]) -> list[Any]:
+    loaders = {name: load for name, _, _, load in CURSOR_TYPES}
+    return [
+        loaders[value[CURSOR_TYPE_KEY]](value["value"])
+        if isinstance(value, dict) and CURSOR_TYPE_KEY in value
+        else value
+        for value in cursor
+    ]
+
+
+class KeysetScrollData(TypedDict):
+    page: int
+    pages: int
+    cursors: dict[str, list[Any]]
+
+
+class KeysetScroll(BaseScroll):
+    def __init__(
+        self,
+        id: str,
+        page_size: int = 10,
+        prefetch: bool = False,
+        max_cursors: int = 32,
+        on_page_changed: OnPageChangedVariants = None,
+    ) -> None:
+        super().__init__(id=id, on_page_changed=on_page_changed)
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.max_cursors = max_cursors
+
+    def _get_scroll_data(self, manager: DialogManager) -> KeysetScrollData:
+        data = self.get_widget_data(manager, None)
+        if not isinstance(data, dict):
+            data = {"page": 0, "pages": 0, "cursors": {}}
+            self.set_widget_data(manager, data)
+        return data
+
+    async def get_page_count(self, data: dict, manager: DialogManager) -> int:
+        return self._get_scroll_data(manager)["pages"]
+
+    async def get_page(self, manager: DialogManager) -> int:
+        return self._get_scroll_data(manager)["page"]
+
+    async def set_page(
+        self,
+        event: ChatEvent,
+        page: int,
+        manager: DialogManager,
+    ) -> None:
+        self._get_scroll_data(manager)["page"] = page
+        await self.on_page_changed.process_event(
+            event,
+            self.managed(manager),
+            manager,
+        )
+
+    async def get_page_items(
+        self,
+        source: KeysetPageSource[Any],
+        manager: DialogManager,
+    ) -> Sequence[Any]:
+        scroll_data = self._get_scroll_data(manager)
+        page = scroll_data["page"]
+        cursors = scroll_data["cursors"]
+
+        if page == 0:
+            result = await source.fetch_page(None, self.page_size)
+        elif str(page) in cursors:
+            result = await source.fetch_page(
+                decode_cursor(cursors[str(page)]),
+                self.page_size
+            )
+        else:
+            result = await source.fetch_page_at(page, self.page_size)
+
+        if result.next_cursor is not None:
+            cursors[str(page + 1)] = encode_cursor(result.next_cursor)
+        self._trim_cursors(cursors, page)
+
+        total = await source.estimate_count()
+        if result.next_cursor is None:
+            scroll_data["pages"] = page + 1
+        else:
+            scroll_data["pages"] = max(
+                ceil(total / self.page_size),
+                page + 2
+            )
+
+        if self.prefetch:
+            self._prefetch_neighbours(
+                source,
+                page,
+                result.next_cursor,
+                cursors
+            )
+
+        return result.items
+
+    def _prefetch_neighbours(
+        self,
+        source: KeysetPageSource[Any],
+        page: int,
+        next_cursor: Optional[Cursor],
+        cursors: dict[str, list[Any]],
+    ) -> None:
+        if next_cursor is not None:
+            source.prefetch(next_cursor, self.page_size)
+
+        if page == 1:
+            source.prefetch(None, self.page_size)
+        elif str(page - 1) in cursors:
+            source.prefetch(
+                decode_cursor(cursors[str(page - 1)]),
+                self.page_size
+            )
+
+    def _trim_cursors(
+        self,
+        cursors: dict[str, list[Any]],
+        page: int
+    ) -> None:
+        if len(cursors) <= self.max_cursors:
+            return
+
+        farthest = sorted(
+            cursors,
+            key=lambda cursor_page: abs(int(cursor_page) - page),
+        )[self.max_cursors:]
+        for cursor_page in farthest:
+            del cursors[cursor_page]
+
+    def managed(self, manager: DialogManager) -> "ManagedKeysetScroll":
+        return ManagedKeysetScroll(self, manager)
+
+
+class ManagedKeysetScroll(ManagedScroll):
+    async def get_page_items(
+        self,
+        source: KeysetPageSource[Any],
+    ) -> Sequence[Any]:
+        return await self.widget.get_page_items(source, self.manager)
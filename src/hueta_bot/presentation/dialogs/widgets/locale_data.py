@@ -0,0 +1,111 @@
+import logging
+from typing import Iterable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCALE = "en"
+
+DAY_NAMES_WIDTH = "short"
+MONTH_NAMES_WIDTH = "wide"
+NAMES_CONTEXT = "stand-alone"
+
+
+class LocaleData:
+    def __init__(self, default_locale: str = DEFAULT_LOCALE) -> None:
+        self._identifiers: Optional[frozenset[str]] = None
+        self._normalized: dict[Optional[str], str] = {}
+        self._day_names: dict[tuple[str, str, str], tuple[str, ...]] = {}
+        self._month_names: dict[tuple[str, str, str], tuple[str, ...]] = {}
+        self.default_locale = default_locale
+
+    @property
+    def identifiers(self) -> frozenset[str]:
+        if self._identifiers is None:
+            from babel.localedata import locale_identifiers
+
+            self._identifiers = frozenset(locale_identifiers())
+        return self._identifiers
+
+    def normalize(self, language_code: Optional[str]) -> str:
+        normalized = self._normalized.get(language_code)
+        if normalized is None:
+            normalized = self._normalize(language_code)
+            self._normalized[language_code] = normalized
+        return normalized
+
+    def _normalize(self, language_code: Optional[str]) -> str:
+        if not language_code:
+            return self.default_locale
+
+        parts = language_code.replace("-", "_").split("_")
+        language = parts[0].lower()
+        script = None
+        territory = None
+        for part in parts[1:]:
+            if len(part) == 4 and script is None:
+                script = part.title()
+            elif territory is None:
+                territory = part.upper()
+
+        candidates = [
+            "_".join(filter(None, (language, script, territory))),
+            "_".join(filter(None, (language, script))),
+            "_".join(filter(None, (language, territory))),
+            language,
+        ]
+        for candidate in candidates:
+            if candidate in self.identifiers:
+                return candidate
+
+        logger.debug(
+            "Unknown locale %r, falling back to %r",
+            language_code,
+            self.default_locale
+        )
+        return self.default_locale
+
+    def get_day_names(
+        self,
+        language_code: Optional[str],
+        width: str = DAY_NAMES_WIDTH,
+        context: str = NAMES_CONTEXT,
+    ) -> tuple[str, ...]:
+        key = (self.normalize(language_code), width, context)
+        names = self._day_names.get(key)
+        if names is None:
+            from babel.dates import get_day_names
+
+            day_names = get_day_names(width, context=context, locale=key[0])
+            names = tuple(day_names[day].title() for day in range(7))
+            self._day_names[key] = names
+        return names
+
+    def get_month_names(
+        self,
+        language_code: Optional[str],
+        width: str = MONTH_NAMES_WIDTH,
+        context: str = NAMES_CONTEXT,
+    ) -> tuple[str, ...]:
+        key = (self.normalize(language_code), width, context)
+        names = self._month_names.get(key)
+        if names is None:
+            from babel.dates import get_month_names
+
+            month_names = get_month_names(
+                width, context=context, locale=key[0],
+            )
+            # months are 1-based, keep the table indexable by date.month
+            names = ("", *(
+                month_names[month].title() for month in range(1, 13)
+            ))
+            self._month_names[key] = names
+        return names
+
+    def preload(self, language_codes: Iterable[str]) -> None:
+        for language_code in (self.default_locale, *language_codes):
+            self.get_day_names(language_code)
+            self.get_month_names(language_code)
+
+
+locale_data = LocaleData()
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from aiogram.types import InlineKeyboardButton
 
@@ -13,7 +13,13 @@ from aiogram_dialog.widgets.kbd.pager import (
     PagerData
 )
 from aiogram_dialog.api.internal import RawKeyboard
-from aiogram_dialog.widgets.text import Text
+from aiogram_dialog.widgets.text import Format, Text
+
+
+DEFAULT_FIRST_PAGE_TEXT = Format("« {target_page1}")
+DEFAULT_LAST_PAGE_TEXT = Format("{target_page1} »")
+DEFAULT_PREV_JUMP_TEXT = Format("‹ {target_page1}")
+DEFAULT_NEXT_JUMP_TEXT = Format("{target_page1} ›")
 
 
 class PaginationMode(Enum):
@@ -30,19 +36,33 @@ class PaginationPager(NumberedPager):
         id: str = DEFAULT_PAGER_ID,
         page_text: Text = DEFAULT_PAGE_TEXT,
         current_page_text: Text = DEFAULT_CURRENT_PAGE_TEXT,
-        when: WhenCondition | None = None
+        when: WhenCondition | None = None,
+        show_edges: bool = False,
+        first_page_text: Text = DEFAULT_FIRST_PAGE_TEXT,
+        last_page_text: Text = DEFAULT_LAST_PAGE_TEXT,
+        jump: int = 0,
+        prev_jump_text: Text = DEFAULT_PREV_JUMP_TEXT,
+        next_jump_text: Text = DEFAULT_NEXT_JUMP_TEXT,
     ) -> None:
         super().__init__(scroll, id, page_text, current_page_text, when)
         self.mode = mode
         self.width = width
+        self.show_edges = show_edges
+        self.first_page_text = first_page_text
+        self.last_page_text = last_page_text
+        self.jump = jump
+        self.prev_jump_text = prev_jump_text
+        self.next_jump_text = next_jump_text
 
-    async def _render_page(
+    def _get_page_range(
         self,
         pages: int,
         page: int,
-        keyboard: List[List[InlineKeyboardButton]],
         mode: PaginationMode = PaginationMode.NORMAL,
-    ) -> List[List[InlineKeyboardButton]]:
+    ) -> range:
+        if self.width <= 0:
+            return range(pages)
+
         if mode is PaginationMode.NORMAL:
             start_index = self.width * (page // self.width)
             end_index = min(pages, start_index + self.width)
@@ -53,33 +73,91 @@ class PaginationPager(NumberedPager):
         else:
             raise ValueError(f"Unknown pagination mode: {mode}")
 
-        return keyboard[start_index:end_index]
+        return range(start_index, end_index)
+
+    async def _render_button(
+        self,
+        text_widget: Text,
+        target_page: int,
+        data: Dict,
+        manager: DialogManager,
+    ) -> InlineKeyboardButton:
+        button_data = await self._prepare_page_data(
+            data=data, target_page=target_page,
+        )
+        text = await text_widget.render_text(button_data, manager)
+        return InlineKeyboardButton(
+            text=text,
+            callback_data=self._item_callback_data(target_page),
+        )
 
     async def _render_contents(
         self,
-        pages: int,
         page: int,
+        page_range: range,
         data: Dict,
         manager: DialogManager,
     ) -> RawKeyboard:
         buttons = []
-        for target_page in range(pages):
-            button_data = await self._prepare_page_data(
-                data=data, target_page=target_page,
-            )
+        for target_page in page_range:
             if target_page == page:
                 text_widget = self.current_page_text
             else:
                 text_widget = self.page_text
-            text = await text_widget.render_text(button_data, manager)
             buttons.append(
-                InlineKeyboardButton(
-                    text=text,
-                    callback_data=self._item_callback_data(target_page),
+                await self._render_button(
+                    text_widget, target_page, data, manager,
                 )
             )
         return buttons
 
+    async def _render_navigation(
+        self,
+        pages: int,
+        page: int,
+        page_range: range,
+        data: Dict,
+        manager: DialogManager,
+    ) -> tuple[RawKeyboard, RawKeyboard]:
+        head: List[InlineKeyboardButton] = []
+        tail: List[InlineKeyboardButton] = []
+
+        prev_jump: Optional[int] = None
+        next_jump: Optional[int] = None
+        if self.jump > 0:
+            prev_jump = max(0, page - self.jump)
+            next_jump = min(pages - 1, page + self.jump)
+
+        if self.show_edges and page_range and page_range.start > 0:
+            head.append(
+                await self._render_button(
+                    self.first_page_text, 0, data, manager,
+                )
+            )
+        if prev_jump is not None and prev_jump < page_range.start:
+            if not (self.show_edges and prev_jump == 0):
+                head.append(
+                    await self._render_button(
+                        self.prev_jump_text, prev_jump, data, manager,
+                    )
+                )
+
+        if next_jump is not None and next_jump >= page_range.stop:
+            if not (self.show_edges and next_jump == pages - 1):
+                tail.append(
+                    await self._render_button(
+                        self.next_jump_text, next_jump, data, manager,
+                    )
+                )
+        if self.show_edges and page_range and page_range.stop < pages:
+            tail.append(
+                await self._render_button(
+                    self.last_page_text, pages - 1, data, manager,
+                )
+            )
+
+        return head, tail
+
     async def _render_keyboard(
         self,
         data: PagerData,
@@ -88,17 +166,26 @@ class PaginationPager(NumberedPager):
         pages = data["pages"]
         current_page = data["current_page"]
 
+        page_range = self._get_page_range(
+            pages=pages,
+            page=current_page,
+            mode=self.mode
+        )
         keyboard = await self._render_contents(
-            pages,
             current_page,
+            page_range,
             data,
             manager
         )
-        page = await self._render_page(
-            pages=pages,
-            page=current_page,
-            keyboard=keyboard,
-            mode=self.mode
+        head, tail = await self._render_navigation(
+            pages,
+            current_page,
+            page_range,
+            data,
+            manager
         )
 
-        return [page]
+        navigation = head + tail
+        if navigation:
+            return [keyboard, navigation]
+        return [keyboard]
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from cachetools import LRUCache
+
+from aiogram_dialog.api.internal import RawKeyboard
+
+
+@dataclass(frozen=True)
+class RenderCacheInfo:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+def copy_keyboard(keyboard: RawKeyboard) -> RawKeyboard:
+    # aiogram_dialog patches callback_data of rendered buttons in place
+    return [[button.model_copy() for button in row] for row in keyboard]
+
+
+class KeyboardRenderCache:
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._keyboards: LRUCache[Hashable, RawKeyboard] = LRUCache(
+            maxsize=maxsize
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[RawKeyboard]:
+        keyboard = self._keyboards.get(key)
+        if keyboard is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return copy_keyboard(keyboard)
+
+    def set(self, key: Hashable, keyboard: RawKeyboard) -> None:
+        self._keyboards[key] = copy_keyboard(keyboard)
+
+    def clear(self) -> None:
+        self._keyboards.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> RenderCacheInfo:
+        return RenderCacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self._keyboards),
+            maxsize=int(self._keyboards.maxsize),
+        )
+
+
+keyboard_render_cache = KeyboardRenderCache()
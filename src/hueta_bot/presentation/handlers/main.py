@@ -1,4 +1,8 @@
+import logging
+from typing import Optional
+
 from aiogram import Dispatcher
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import (
     ErrorEvent,
     Message
@@ -7,12 +11,18 @@ from aiogram.filters import (
     ExceptionTypeFilter,
     CommandStart
 )
+from aiogram_dialog import DialogManager
 from aiogram_dialog.api.exceptions import (
     UnknownIntent,
     OutdatedIntent
 )
 
 
+logger = logging.getLogger(__name__)
+
+STALE_DIALOG_TEXT = "This menu is outdated, send /start to begin again"
+
+
 async def handle_start_command(
     message: Message
 ):
@@ -20,10 +30,31 @@ async def handle_start_command(
 
 
 async def handle_aiogram_dialog_error(
-    error_event: ErrorEvent
+    error_event: ErrorEvent,
+    dialog_manager: Optional[DialogManager] = None
 ):
-    # update: Update = error_event.update
-    ...
+    logger.info("Resetting stale dialog: %s", error_event.exception)
+
+    # only the broken stack is dropped, no state is loaded or rendered
+    if dialog_manager is not None:
+        await dialog_manager.reset_stack(remove_keyboard=False)
+
+    callback_query = error_event.update.callback_query
+    if callback_query is None:
+        if error_event.update.message is not None:
+            await handle_start_command(error_event.update.message)
+        return
+
+    await callback_query.answer(STALE_DIALOG_TEXT)
+
+    message = callback_query.message
+    if not isinstance(message, Message):
+        return
+
+    try:
+        await message.edit_reply_markup(reply_markup=None)
+    except TelegramBadRequest:
+        logger.debug("Failed to remove stale keyboard", exc_info=True)
 
 
 def setup(
@@ -1,13 +1,35 @@
+from typing import Optional, Sequence
+
 from aiogram import Bot, Dispatcher
 
+from hueta_bot.infrastructure.capture.update_capture import UpdateCapture
+
 from .telegram_event_logger_middleware import TelegramEventLoggerMiddleware
 from .bot_request_logger_middleware import BotRequestLoggerMiddleware
+from .container_middleware import ContainerMiddleware, setup_container
+from .bot_metrics_middleware import (
+    BotMetricsMiddleware,
+    BotMetricsRegistry,
+    BotRequestMetricsMiddleware
+)
 
 
 def setup_middlewares(
-    bot: Bot,
+    bots: Sequence[Bot],
     dispatcher: Dispatcher,
+    capture: Optional[UpdateCapture] = None,
+    metrics: Optional[BotMetricsRegistry] = None,
 ) -> None:
-    bot.session.middleware(BotRequestLoggerMiddleware())
-    dispatcher.update.middleware(TelegramEventLoggerMiddleware())
+    # bots may share a session, its middlewares see the calls of all of them
+    sessions = {id(bot.session): bot.session for bot in bots}
+    for session in sessions.values():
+        session.middleware(BotRequestLoggerMiddleware())
+        if metrics is not None:
+            session.middleware(BotRequestMetricsMiddleware(metrics))
+
+    if metrics is not None:
+        dispatcher.update.outer_middleware(BotMetricsMiddleware(metrics))
+    dispatcher.update.middleware(
+        TelegramEventLoggerMiddleware(capture=capture)
+    )
     dispatcher.errors.middleware(TelegramEventLoggerMiddleware())
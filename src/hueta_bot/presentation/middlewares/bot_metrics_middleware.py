@@ -0,0 +1,108 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType
+)
+from aiogram.methods import GetUpdates, TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import TelegramObject
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BotMetrics:
+    updates: int = 0
+    failed_updates: int = 0
+    handling_time: float = 0.0
+    max_handling_time: float = 0.0
+    requests: int = 0
+    failed_requests: int = 0
+
+
+class BotMetricsRegistry:
+    def __init__(self, names: Optional[Dict[int, str]] = None) -> None:
+        self.names = names or {}
+        self._metrics: Dict[int, BotMetrics] = {}
+
+    def get(self, bot_id: int) -> BotMetrics:
+        metrics = self._metrics.get(bot_id)
+        if metrics is None:
+            metrics = self._metrics[bot_id] = BotMetrics()
+        return metrics
+
+    def metrics(self) -> Dict[str, BotMetrics]:
+        return {
+            self.names.get(bot_id, str(bot_id)): BotMetrics(**vars(metrics))
+            for bot_id, metrics in self._metrics.items()
+        }
+
+    def log_metrics(self) -> None:
+        for name, metrics in self.metrics().items():
+            logger.info(
+                "Bot %s: %d updates, %d failed, handling %.3fs avg "
+                "%.3fs max, %d requests, %d failed",
+                name,
+                metrics.updates,
+                metrics.failed_updates,
+                metrics.handling_time / max(metrics.updates, 1),
+                metrics.max_handling_time,
+                metrics.requests,
+                metrics.failed_requests
+            )
+
+
+class BotMetricsMiddleware(BaseMiddleware):
+    def __init__(self, registry: BotMetricsRegistry) -> None:
+        self.registry = registry
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        metrics = self.registry.get(data["bot"].id)
+        metrics.updates += 1
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            metrics.failed_updates += 1
+            raise
+        finally:
+            handling_time = time.perf_counter() - started
+            metrics.handling_time += handling_time
+            metrics.max_handling_time = max(
+                metrics.max_handling_time,
+                handling_time
+            )
+
+
+class BotRequestMetricsMiddleware(BaseRequestMiddleware):
+    def __init__(self, registry: BotMetricsRegistry) -> None:
+        self.registry = registry
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        # long polling requests would drown the bot api calls
+        if isinstance(method, GetUpdates):
+            return await make_request(bot, method)
+
+        metrics = self.registry.get(bot.id)
+        metrics.requests += 1
+        try:
+            return await make_request(bot, method)
+        except Exception:
+            metrics.failed_requests += 1
+            raise
@@ -0,0 +1,91 @@
+from inspect import signature
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    get_type_hints
+)
+
+from aiogram import BaseMiddleware, Bot, Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject
+from dishka import AsyncContainer
+from dishka.integrations.aiogram import CONTAINER_NAME, inject
+from dishka.integrations.base import (
+    default_parse_dependency,
+    is_dishka_injected
+)
+
+
+def has_dependencies(callback: Callable[..., Any]) -> bool:
+    hints = get_type_hints(callback, include_extras=True)
+    return any(
+        default_parse_dependency(param, hints.get(name, Any)) is not None
+        for name, param in signature(callback).parameters.items()
+    )
+
+
+class ContainerMiddleware(BaseMiddleware):
+    # a request scope is opened only for handlers that take dependencies,
+    # dialog button presses and other plain handlers skip it
+    def __init__(self, container: AsyncContainer) -> None:
+        self.container = container
+        self._needs_container: Dict[int, bool] = {}
+
+    def prepare(self, handler: HandlerObject) -> bool:
+        needs_container = self._needs_container.get(id(handler))
+        if needs_container is not None:
+            return needs_container
+
+        callback = handler.callback
+        if is_dishka_injected(callback):
+            needs_container = True
+        elif has_dependencies(callback):
+            # the injection wrapper is built once, not on the first update
+            injected = HandlerObject(
+                callback=inject(callback),
+                filters=handler.filters,
+                flags=handler.flags
+            )
+            handler.callback = injected.callback
+            handler.params = injected.params
+            handler.varkw = injected.varkw
+            handler.awaitable = injected.awaitable
+            needs_container = True
+        else:
+            needs_container = CONTAINER_NAME in handler.params
+
+        self._needs_container[id(handler)] = needs_container
+        return needs_container
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        # handlers registered after setup are prepared on their first call
+        if not self.prepare(data["handler"]):
+            return await handler(event, data)
+
+        context = {TelegramObject: event, Bot: data["bot"]}
+        async with self.container(context) as container:
+            data[CONTAINER_NAME] = container
+            return await handler(event, data)
+
+
+def setup_container(container: AsyncContainer, router: Router) -> None:
+    middleware = ContainerMiddleware(container)
+
+    # routing of the update itself needs no container
+    for sub_router in router.chain_tail:
+        for observer in sub_router.observers.values():
+            if observer.event_name == "update":
+                continue
+            for handler in observer.handlers:
+                middleware.prepare(handler)
+
+    for observer in router.observers.values():
+        if observer.event_name != "update":
+            observer.middleware(middleware)
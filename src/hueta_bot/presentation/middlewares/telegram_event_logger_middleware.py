@@ -1,17 +1,22 @@
 import logging
-from typing import Any, Awaitable, Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject
+from aiogram.types import TelegramObject, Update
 from aiogram.utils.serialization import (
     deserialize_telegram_object_to_python
 )
 
+from hueta_bot.infrastructure.capture.update_capture import UpdateCapture
+
 
 logger = logging.getLogger(__name__)
 
 
 class TelegramEventLoggerMiddleware(BaseMiddleware):
+    def __init__(self, capture: Optional[UpdateCapture] = None) -> None:
+        self.capture = capture
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -23,4 +28,11 @@ class TelegramEventLoggerMiddleware(BaseMiddleware):
             deserialize_telegram_object_to_python(event)
         )
 
+        if self.capture is not None and isinstance(event, Update):
+            self.capture.write(event.model_dump(
+                mode="json",
+                exclude_none=True,
+                by_alias=True
+            ))
+
         return await handler(event, data)
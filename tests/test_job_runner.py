@@ -0,0 +1,194 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from hueta_bot.infrastructure.persistence.tables import (
+    JobStatus,
+    metadata,
+    scheduled_jobs_table,
+    utcnow
+)
+from hueta_bot.infrastructure.scheduler.job_runner import (
+    JobRegistry,
+    JobRunner
+)
+
+
+table = scheduled_jobs_table
+
+
+def run_with_runner(tmp_path, test, **kwargs):
+    async def main():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'jobs.sqlite3'}"
+        )
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(metadata.create_all)
+            session_factory = async_sessionmaker(engine)
+            runner = JobRunner(session_factory, JobRegistry(), **kwargs)
+            await test(runner, session_factory)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+async def add_jobs(session_factory, count):
+    run_at = utcnow() - timedelta(seconds=1)
+    async with session_factory() as session:
+        await session.execute(insert(table), [
+            {
+                "id": f"job-{index}",
+                "name": "test",
+                "payload": {},
+                "run_at": run_at + timedelta(milliseconds=index),
+                "status": JobStatus.PENDING.value,
+                "attempts": 0
+            }
+            for index in range(count)
+        ])
+        await session.commit()
+
+
+async def get_rows(session_factory):
+    async with session_factory() as session:
+        rows = (await session.execute(
+            select(table).order_by(table.c.id)
+        )).mappings().all()
+    return {row["id"]: row for row in rows}
+
+
+def test_claim_takes_jobs_for_idle_workers_only(tmp_path):
+    async def test(runner, session_factory):
+        await add_jobs(session_factory, 5)
+
+        claimed = await runner._claim(utcnow())
+
+        assert [item.job.id for item in claimed] == ["job-0", "job-1"]
+        assert all(item.job.attempts == 1 for item in claimed)
+        rows = await get_rows(session_factory)
+        assert rows["job-0"]["status"] == JobStatus.RUNNING.value
+        assert rows["job-0"]["claim_token"] == claimed[0].claim_token
+        assert rows["job-2"]["status"] == JobStatus.PENDING.value
+
+    run_with_runner(tmp_path, test, workers=2)
+
+
+def test_claim_skips_rows_claimed_by_another_runner(tmp_path):
+    async def test(runner, session_factory):
+        await add_jobs(session_factory, 3)
+        async with session_factory() as session:
+            await session.execute(
+                update(table)
+                .where(table.c.id == "job-0")
+                .values(status=JobStatus.RUNNING.value, claim_token="other")
+            )
+            await session.commit()
+
+        claimed = await runner._claim(utcnow())
+
+        assert [item.job.id for item in claimed] == ["job-1", "job-2"]
+
+    run_with_runner(tmp_path, test)
+
+
+def test_start_refreshes_the_lease(tmp_path):
+    async def test(runner, session_factory):
+        await add_jobs(session_factory, 1)
+        claimed, = await runner._claim(utcnow())
+        # the job waited in the runner for most of the claim lease
+        async with session_factory() as session:
+            await session.execute(
+                update(table).values(
+                    locked_until=utcnow() + timedelta(seconds=1)
+                )
+            )
+            await session.commit()
+
+        locked_until = await runner._start(claimed)
+
+        rows = await get_rows(session_factory)
+        assert locked_until is not None
+        assert rows["job-0"]["locked_until"] == locked_until
+        assert locked_until > utcnow() + timedelta(seconds=250)
+
+    run_with_runner(tmp_path, test, lease_timeout=300.0)
+
+
+def test_recover_releases_expired_leases(tmp_path):
+    async def test(runner, session_factory):
+        await add_jobs(session_factory, 2)
+        await runner._claim(utcnow())
+        async with session_factory() as session:
+            await session.execute(
+                update(table)
+                .where(table.c.id == "job-0")
+                .values(locked_until=utcnow() - timedelta(seconds=1))
+            )
+            await session.commit()
+
+        assert await runner.recover() == 1
+
+        rows = await get_rows(session_factory)
+        assert rows["job-0"]["status"] == JobStatus.PENDING.value
+        assert rows["job-0"]["claim_token"] is None
+        assert rows["job-1"]["status"] == JobStatus.RUNNING.value
+
+    run_with_runner(tmp_path, test)
+
+
+def test_finish_removes_own_claim_only(tmp_path):
+    async def test(runner, session_factory):
+        await add_jobs(session_factory, 2)
+        first, second = await runner._claim(utcnow())
+
+        await runner._finish(first)
+        rows = await get_rows(session_factory)
+        assert "job-0" not in rows
+
+        # the lease expired and another runner claimed the job again
+        async with session_factory() as session:
+            await session.execute(
+                update(table)
+                .where(table.c.id == "job-1")
+                .values(claim_token="other")
+            )
+            await session.commit()
+
+        await runner._finish(second, JobStatus.FAILED)
+        await runner._retry(second)
+
+        row = (await get_rows(session_factory))["job-1"]
+        assert row["status"] == JobStatus.RUNNING.value
+        assert row["claim_token"] == "other"
+
+    run_with_runner(tmp_path, test)
+
+
+def test_lost_claim_is_not_run(tmp_path):
+    calls = []
+
+    async def handler(job):
+        calls.append(job.id)
+
+    async def test(runner, session_factory):
+        runner.registry.register("test", handler)
+        await add_jobs(session_factory, 1)
+        claimed, = await runner._claim(utcnow())
+        async with session_factory() as session:
+            await session.execute(
+                update(table)
+                .where(table.c.id == "job-0")
+                .values(claim_token="other")
+            )
+            await session.commit()
+
+        await runner._execute(claimed)
+
+        assert calls == []
+        assert "job-0" in await get_rows(session_factory)
+
+    run_with_runner(tmp_path, test)
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from hueta_bot.application.common.memoize import get_memo, memoize
+
+
+class GetName:
+    def __init__(self, user_id=1):
+        self.user_id = user_id
+
+    @memoize(ttl=60.0, user=lambda interactor: interactor.user_id)
+    async def __call__(self, data=None):
+        calls.append((self.user_id, data))
+        index = len(calls)
+        await gate.wait()
+        return f"{self.user_id}:{data}:{index}"
+
+
+calls = []
+gate = asyncio.Event()
+
+
+def run(test):
+    async def main():
+        global gate
+        gate = asyncio.Event()
+        await test(get_memo(GetName()))
+
+    calls.clear()
+    memo = get_memo(GetName())
+    memo.clear()
+    memo.hits = memo.misses = memo.coalesced = 0
+    asyncio.run(main())
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_counts_hits_and_misses():
+    async def test(memo):
+        gate.set()
+
+        first = await GetName()("a")
+        second = await GetName()("a")
+        other = await GetName(2)("a")
+
+        assert first == second == "1:a:1"
+        assert other == "2:a:2"
+        assert (memo.hits, memo.misses, memo.coalesced) == (1, 2, 0)
+
+    run(test)
+
+
+def test_concurrent_calls_share_one_execution():
+    async def test(memo):
+        tasks = [asyncio.create_task(GetName()("a")) for _ in range(3)]
+        await settle()
+        gate.set()
+
+        assert await asyncio.gather(*tasks) == ["1:a:1"] * 3
+        assert calls == [(1, "a")]
+        assert (memo.hits, memo.misses, memo.coalesced) == (0, 1, 2)
+
+    run(test)
+
+
+def test_waiter_leads_when_leader_is_cancelled():
+    async def test(memo):
+        leader = asyncio.create_task(GetName()("a"))
+        await settle()
+        waiter = asyncio.create_task(GetName()("a"))
+        await settle()
+
+        leader.cancel()
+        await settle()
+        gate.set()
+
+        assert await waiter == "1:a:2"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert calls == [(1, "a"), (1, "a")]
+        assert await GetName()("a") == "1:a:2"
+
+    run(test)
+
+
+@pytest.mark.parametrize("invalidate", [
+    lambda memo: memo.invalidate("a", user=1),
+    lambda memo: memo.invalidate_user(1),
+])
+def test_invalidation_during_call_is_not_lost(invalidate):
+    async def test(memo):
+        stale = asyncio.create_task(GetName()("a"))
+        await settle()
+
+        invalidate(memo)
+        fresh = asyncio.create_task(GetName()("a"))
+        await settle()
+        gate.set()
+
+        # the call started after the invalidation does not join the stale one
+        assert await stale == "1:a:1"
+        assert await fresh == "1:a:2"
+        assert memo.coalesced == 0
+        # only the result of the call started after the write is stored
+        assert await GetName()("a") == "1:a:2"
+        assert memo.hits == 1
+
+    run(test)
@@ -0,0 +1,144 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from hueta_bot.infrastructure.outbox.outbox_relay import OutboxRelay
+from hueta_bot.infrastructure.persistence.tables import (
+    OutboxStatus,
+    metadata,
+    outbox_messages_table,
+    utcnow
+)
+
+
+table = outbox_messages_table
+
+
+class FakeBot:
+    id = 42
+
+    def __init__(self):
+        self.sent = []
+
+    async def __call__(self, method):
+        self.sent.append(method.text)
+
+
+def run_with_relay(tmp_path, test, **kwargs):
+    async def main():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'outbox.sqlite3'}"
+        )
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(metadata.create_all)
+            session_factory = async_sessionmaker(engine)
+            await test(OutboxRelay(session_factory, **kwargs), session_factory)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+async def add_messages(session_factory, count):
+    now = utcnow() - timedelta(seconds=1)
+    async with session_factory() as session:
+        await session.execute(insert(table), [
+            {
+                "id": f"message-{index}",
+                "dedupe_key": f"message-{index}",
+                "chat_id": "1",
+                "bot_id": FakeBot.id,
+                "method": "sendMessage",
+                "payload": {"chat_id": 1, "text": str(index)},
+                "created_at": now + timedelta(milliseconds=index),
+                "available_at": now,
+                "status": OutboxStatus.PENDING.value,
+                "attempts": 0
+            }
+            for index in range(count)
+        ])
+        await session.commit()
+
+
+async def get_rows(session_factory):
+    async with session_factory() as session:
+        rows = (await session.execute(
+            select(table).order_by(table.c.created_at)
+        )).mappings().all()
+    return {row["id"]: row for row in rows}
+
+
+async def expire_leases(session_factory):
+    async with session_factory() as session:
+        await session.execute(
+            update(table).values(locked_until=utcnow() - timedelta(seconds=1))
+        )
+        await session.commit()
+
+
+def test_claim_returns_claimed_rows_only(tmp_path):
+    async def test(relay, session_factory):
+        await add_messages(session_factory, 2)
+
+        first = await relay._claim()
+        second = await relay._claim()
+
+        assert [row["id"] for row in first] == ["message-0", "message-1"]
+        assert all(row["attempts"] == 1 for row in first)
+        assert second == []
+
+    run_with_relay(tmp_path, test)
+
+
+def test_stale_relay_does_not_touch_reclaimed_rows(tmp_path):
+    async def test(relay, session_factory):
+        await add_messages(session_factory, 2)
+        stale = await relay._claim()
+        await expire_leases(session_factory)
+        other = OutboxRelay(session_factory)
+        claimed = await other._claim()
+
+        await relay._mark(stale[0], OutboxStatus.SENT)
+        await relay._retry(stale[1])
+        assert not await relay._extend_lease(stale)
+
+        rows = await get_rows(session_factory)
+        for row in claimed:
+            assert rows[row["id"]]["status"] == OutboxStatus.SENDING.value
+            assert rows[row["id"]]["claim_token"] == row["claim_token"]
+
+    run_with_relay(tmp_path, test)
+
+
+def test_long_chat_keeps_its_lease(tmp_path):
+    async def test(relay, session_factory):
+        bot = FakeBot()
+        await add_messages(session_factory, 4)
+        rows = await relay._claim()
+        other = OutboxRelay(session_factory)
+        reclaimed = []
+
+        async def poll():
+            while len(bot.sent) < 4:
+                reclaimed.extend(await other._claim())
+                await asyncio.sleep(0.02)
+
+        # four messages one per 0.1s take longer than the 0.2s lease
+        await asyncio.gather(relay._send_chat(bot, "1", rows), poll())
+
+        assert bot.sent == ["0", "1", "2", "3"]
+        assert reclaimed == []
+        rows = await get_rows(session_factory)
+        assert all(
+            row["status"] == OutboxStatus.SENT.value for row in rows.values()
+        )
+
+    run_with_relay(
+        tmp_path,
+        test,
+        lease_timeout=0.2,
+        chat_interval=0.1
+    )
@@ -0,0 +1,83 @@
+import asyncio
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine
+)
+
+from hueta_bot.infrastructure.persistence.query_cache import (
+    QUERY_CACHE_KEY,
+    MemoryQueryCacheBackend,
+    QueryCache,
+    QueryCacheSession
+)
+
+
+metadata = MetaData()
+cached_table = Table(
+    "query_cache_items",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(32), nullable=False),
+)
+
+
+def run_with_cache(tmp_path, test):
+    async def main():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'cache.sqlite3'}"
+        )
+        query_cache = QueryCache(MemoryQueryCacheBackend())
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(metadata.create_all)
+            session_factory = async_sessionmaker(
+                bind=engine,
+                class_=AsyncSession,
+                sync_session_class=QueryCacheSession,
+                info={QUERY_CACHE_KEY: query_cache}
+            )
+            await test(query_cache, session_factory)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+async def get_names(query_cache, session_factory):
+    async with session_factory() as session:
+        return await query_cache.scalars(
+            session,
+            select(cached_table.c.name).order_by(cached_table.c.id)
+        )
+
+
+def test_direct_commit_invalidates_cached_queries(tmp_path):
+    async def test(query_cache, session_factory):
+        assert await get_names(query_cache, session_factory) == []
+
+        # written without the transaction manager, like the relay does
+        async with session_factory() as session:
+            await session.execute(insert(cached_table).values(name="first"))
+            await session.commit()
+
+        assert await get_names(query_cache, session_factory) == ["first"]
+
+    run_with_cache(tmp_path, test)
+
+
+def test_rollback_keeps_cached_queries(tmp_path):
+    async def test(query_cache, session_factory):
+        assert await get_names(query_cache, session_factory) == []
+
+        async with session_factory() as session:
+            await session.execute(insert(cached_table).values(name="first"))
+            await session.rollback()
+            await session.commit()
+
+        assert query_cache.backend._generations == {}
+        assert await get_names(query_cache, session_factory) == []
+
+    run_with_cache(tmp_path, test)
@@ -0,0 +1,90 @@
+from hueta_bot.infrastructure.capture.update_capture import UpdateAnonymizer
+
+
+USER = {"id": 111, "is_bot": False, "first_name": "Alice", "username": "a"}
+OTHER_USER = {"id": 222, "is_bot": False, "first_name": "Bob"}
+BOT = {"id": 333, "is_bot": True, "first_name": "Bot", "username": "bot"}
+CHAT = {"id": -1001, "type": "supergroup", "title": "Group"}
+CHANNEL = {"id": -1002, "type": "channel", "title": "Channel"}
+REAL_IDS = {111, 222, 333, -1001, -1002}
+
+
+def collect_ids(value, ids=None):
+    if ids is None:
+        ids = set()
+    if isinstance(value, list):
+        for item in value:
+            collect_ids(item, ids)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key in ("id", "user_id", "chat_id") and isinstance(item, int):
+                ids.add(item)
+            collect_ids(item, ids)
+    return ids
+
+
+def test_every_user_and_chat_id_is_pseudonymised():
+    update = {
+        "update_id": 1,
+        "message": {
+            "message_id": 10,
+            "date": 1700000000,
+            "from": USER,
+            "chat": CHAT,
+            "sender_chat": CHANNEL,
+            "forward_from": OTHER_USER,
+            "forward_from_chat": CHANNEL,
+            "forward_origin": {
+                "type": "user",
+                "date": 1700000000,
+                "sender_user": OTHER_USER,
+            },
+            "via_bot": BOT,
+            "new_chat_members": [OTHER_USER, BOT],
+            "left_chat_member": USER,
+            "reply_to_message": {
+                "message_id": 9,
+                "date": 1700000000,
+                "chat": CHAT,
+                "from": OTHER_USER,
+            },
+        },
+    }
+
+    anonymized = UpdateAnonymizer(salt="test").anonymize(update)
+
+    message = anonymized["message"]
+    assert collect_ids(anonymized).isdisjoint(REAL_IDS)
+    assert message["message_id"] == 10
+    assert message["forward_from"]["first_name"] == "x"
+    assert message["chat"]["id"] < 0
+    assert message["from"]["id"] > 0
+
+
+def test_pseudonyms_are_stable_per_id():
+    anonymizer = UpdateAnonymizer(salt="test")
+    update = {
+        "update_id": 1,
+        "chat_member": {
+            "chat": CHAT,
+            "from": USER,
+            "date": 1700000000,
+            "old_chat_member": {"status": "left", "user": USER},
+            "new_chat_member": {"status": "member", "user": USER},
+        },
+        "chat_join_request": {
+            "chat": CHAT,
+            "from": USER,
+            "user_chat_id": 111,
+            "date": 1700000000,
+        },
+    }
+
+    anonymized = anonymizer.anonymize(update)
+
+    member = anonymized["chat_member"]
+    pseudonym = anonymizer.pseudonym(111)
+    assert member["from"]["id"] == pseudonym
+    assert member["new_chat_member"]["user"]["id"] == pseudonym
+    assert anonymized["chat_join_request"]["user_chat_id"] == pseudonym
+    assert collect_ids(anonymized).isdisjoint(REAL_IDS)